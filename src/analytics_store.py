@@ -0,0 +1,324 @@
+"""
+analytics_store.py - Columnar Export of Chat and Feedback History
+
+Answering fleet-wide questions (all users, all subjects) from the chat
+files means parsing every JSON file and building lists of dicts. This
+module exports the messages once into a columnar table of NumPy arrays
+and answers the common aggregations with vectorized operations, which
+stay in the millisecond range for millions of messages.
+
+It is an offline reporting tool (the CLI below and benchmarks.py
+analytics); the app does not use it. A refresh scans every user's chat
+files, which is too much for a page rerun, and the Feedback page only
+needs one learner's daily counts, which chat_store keeps up to date
+(feedback_counts).
+
+Columns (one row per message):
+    ts           int64   wall-clock epoch seconds of the message timestamp
+    day          int32   chat day (days since 1970-01-01, from the chat's date key)
+    source       int32   chat file the row came from (index into sources)
+    user         int32   categorical, index into users (user directory name)
+    subject      int32   categorical, index into subjects
+    role         int8    index into ROLES ("other" for any unknown role)
+    length       int32   characters of content
+    thumbs_up    int8
+    thumbs_down  int8
+
+Storage (profiles/analytics/):
+    messages.npz     the columns plus the category arrays
+    manifest.json    fingerprint (version, mtime, size) of every exported chat file
+
+refresh() is incremental: only chat files whose fingerprint changed are
+re-read; their old rows are dropped and replaced, everything else is kept.
+
+Usage:
+    python src/analytics_store.py                      (refresh, then fleet-wide report)
+    python src/analytics_store.py --user default --subject Statistics
+
+    from analytics_store import refresh, per_day, per_subject, per_hour
+    table, stats = refresh()
+    print(per_subject(table))
+
+Last updated: January 2026
+"""
+
+import argparse
+import glob
+import os
+import sys
+import time
+from datetime import date
+from typing import NamedTuple
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import numpy as np
+
+from shared_state import locked, read_json, version, write_json
+from study_sessions import parse_timestamps
+from user_storage import PROFILES_DIR, USERS_DIR
+
+ANALYTICS_DIR = os.path.join(PROFILES_DIR, "analytics")
+TABLE_FILE = os.path.join(ANALYTICS_DIR, "messages.npz")
+MANIFEST_FILE = os.path.join(ANALYTICS_DIR, "manifest.json")
+
+ROLES = ("user", "assistant", "system", "other")
+_OTHER_ROLE = ROLES.index("other")
+
+COLUMNS = {
+    "ts": np.int64,
+    "day": np.int32,
+    "source": np.int32,
+    "user": np.int32,
+    "subject": np.int32,
+    "role": np.int8,
+    "length": np.int32,
+    "thumbs_up": np.int8,
+    "thumbs_down": np.int8,
+}
+
+_EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+class MessageTable(NamedTuple):
+    columns: dict        # name -> np.ndarray, all of the same length
+    users: list          # category values, indexed by the "user" column
+    subjects: list
+    sources: list        # chat file paths relative to USERS_DIR
+
+    def __len__(self):
+        return len(self.columns["ts"])
+
+
+def empty_table():
+    return MessageTable({name: np.zeros(0, dtype) for name, dtype in COLUMNS.items()}, [], [], [])
+
+
+# ============================================================
+# STORAGE
+# ============================================================
+
+def load_table(path=TABLE_FILE):
+    """Load the exported table (empty if nothing was exported yet)."""
+    if not os.path.exists(path):
+        return empty_table()
+    with np.load(path) as data:
+        return MessageTable(
+            {name: data[name] for name in COLUMNS},
+            data["users"].tolist(), data["subjects"].tolist(), data["sources"].tolist(),
+        )
+
+
+def save_table(table, path=TABLE_FILE):
+    """Write the table atomically (uncompressed, so loading is a plain read)."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + ".tmp.npz"
+    np.savez(
+        tmp_path,
+        users=np.array(table.users, dtype=str), subjects=np.array(table.subjects, dtype=str),
+        sources=np.array(table.sources, dtype=str), **table.columns,
+    )
+    os.replace(tmp_path, path)
+
+
+# ============================================================
+# EXPORT
+# ============================================================
+
+def chat_sources(users_dir=USERS_DIR):
+    """{relative path: (user directory name, subject)} for every chat file."""
+    sources = {}
+    for path in glob.glob(os.path.join(users_dir, "*", "*", "*", "chat_history", "*.json")):
+        rel = os.path.relpath(path, users_dir)
+        parts = rel.split(os.sep)
+        sources[rel] = (parts[2], os.path.splitext(parts[-1])[0])
+    return sources
+
+
+def _fingerprint(path):
+    stat = os.stat(path)
+    return [version(path), stat.st_mtime_ns, stat.st_size]
+
+
+def _export_chat(path, source, user, subject):
+    """Rows of one chat file as a dict of column lists (ts already an array)."""
+    chat, _ = read_json(path, default={})
+    rows = {name: [] for name in COLUMNS}
+    timestamps = []
+    for key, messages in chat.items():
+        if not isinstance(messages, list):
+            continue
+        try:
+            day = date.fromisoformat(key).toordinal() - _EPOCH_ORDINAL
+        except ValueError:
+            continue
+        for message in messages:
+            if not isinstance(message, dict):
+                continue
+            feedback = message.get("feedback") or {}
+            role = message.get("role")
+            timestamp = message.get("timestamp")
+            timestamps.append(timestamp if isinstance(timestamp, str) else "")
+            rows["day"].append(day)
+            rows["role"].append(ROLES.index(role) if role in ROLES else _OTHER_ROLE)
+            rows["length"].append(len(str(message.get("content", ""))))
+            rows["thumbs_up"].append(feedback.get("thumbs_up", 0))
+            rows["thumbs_down"].append(feedback.get("thumbs_down", 0))
+    # Parsed in one vectorized call; unparseable timestamps fall back to the day's start
+    seconds = parse_timestamps(timestamps)
+    rows["ts"] = np.where(seconds >= 0, seconds, np.array(rows["day"], dtype=np.int64) * 86400)
+    count = len(rows["ts"])
+    rows["source"] = [source] * count
+    rows["user"] = [user] * count
+    rows["subject"] = [subject] * count
+    return rows
+
+
+class _Categories:
+    """Category list plus a value -> code index, extended as new values appear."""
+
+    def __init__(self, values):
+        self.values = list(values)
+        self.codes = {value: code for code, value in enumerate(self.values)}
+
+    def code(self, value):
+        if value not in self.codes:
+            self.codes[value] = len(self.values)
+            self.values.append(value)
+        return self.codes[value]
+
+
+def refresh(users_dir=USERS_DIR, table_file=TABLE_FILE, manifest_file=MANIFEST_FILE):
+    """
+    Bring the exported table up to date with the chat files.
+
+    Returns:
+        tuple: (MessageTable, stats) - stats has "sources_exported",
+            "sources_removed", "rows" and "seconds"
+    """
+    start = time.perf_counter()
+    with locked(table_file):     # one exporter at a time, across replicas
+        table = load_table(table_file)
+        manifest, _ = read_json(manifest_file, default={})
+        current = chat_sources(users_dir)
+
+        fingerprints = {rel: _fingerprint(os.path.join(users_dir, rel)) for rel in current}
+        changed = [rel for rel in current if manifest.get(rel) != fingerprints[rel]]
+        removed = [rel for rel in manifest if rel not in current]
+        stats = {"sources_exported": len(changed), "sources_removed": len(removed)}
+
+        if changed or removed:
+            users, subjects, sources = (_Categories(table.users), _Categories(table.subjects),
+                                        _Categories(table.sources))
+            stale = [sources.codes[rel] for rel in changed + removed if rel in sources.codes]
+            keep = ~np.isin(table.columns["source"], stale)
+            parts = {name: [column[keep]] for name, column in table.columns.items()}
+
+            for rel in changed:
+                user, subject = current[rel]
+                rows = _export_chat(os.path.join(users_dir, rel), sources.code(rel),
+                                    users.code(user), subjects.code(subject))
+                for name, dtype in COLUMNS.items():
+                    parts[name].append(np.array(rows[name], dtype=dtype))
+
+            table = MessageTable({name: np.concatenate(parts[name]) for name in COLUMNS},
+                                 users.values, subjects.values, sources.values)
+            save_table(table, table_file)
+            write_json(manifest_file, {rel: fingerprints[rel] for rel in current}, indent=None)
+
+    stats["rows"] = len(table)
+    stats["seconds"] = round(time.perf_counter() - start, 3)
+    return table, stats
+
+
+# ============================================================
+# AGGREGATIONS (vectorized)
+# ============================================================
+
+def select(table, user=None, subject=None):
+    """Boolean row mask for one user and/or subject (all rows if both are None)."""
+    mask = np.ones(len(table), dtype=bool)
+    for column, values, value in (("user", table.users, user), ("subject", table.subjects, subject)):
+        if value is not None:
+            code = values.index(value) if value in values else -1
+            mask &= table.columns[column] == code
+    return mask
+
+
+def _masked(table, mask):
+    if mask is None:
+        return table.columns
+    return {name: column[mask] for name, column in table.columns.items()}
+
+
+def _sums(codes, columns, size):
+    """Messages, user messages, characters and feedback per code (0..size-1)."""
+    def total(weights):
+        return np.bincount(codes, weights=weights, minlength=size).astype(np.int64)
+    return {
+        "Messages": np.bincount(codes, minlength=size),
+        "User messages": total(columns["role"] == 0),
+        "Characters": total(columns["length"]),
+        "Thumbs Up": total(columns["thumbs_up"]),
+        "Thumbs Down": total(columns["thumbs_down"]),
+    }
+
+
+def per_day(table, mask=None):
+    """One row per chat day."""
+    import pandas as pd
+    columns = _masked(table, mask)
+    if not len(columns["day"]):
+        return pd.DataFrame({"Date": np.zeros(0, "datetime64[D]"), **_sums(np.zeros(0, np.int64), columns, 0)})
+    # Days form a dense range, so counting by offset avoids sorting
+    first = int(columns["day"].min())
+    codes = (columns["day"] - first).astype(np.int64)
+    frame = pd.DataFrame({"Date": np.arange(first, first + codes.max() + 1).astype("datetime64[D]"),
+                          **_sums(codes, columns, int(codes.max()) + 1)})
+    return frame[frame["Messages"] > 0].reset_index(drop=True)
+
+
+def per_subject(table, mask=None):
+    """One row per subject that has messages, busiest first."""
+    import pandas as pd
+    columns = _masked(table, mask)
+    sums = _sums(columns["subject"].astype(np.int64), columns, len(table.subjects))
+    frame = pd.DataFrame({"Subject": table.subjects, **sums})
+    return frame[frame["Messages"] > 0].sort_values("Messages", ascending=False, ignore_index=True)
+
+
+def per_hour(table, mask=None):
+    """24 rows: activity by hour of day (local wall-clock time of the messages)."""
+    import pandas as pd
+    columns = _masked(table, mask)
+    hours = (columns["ts"] // 3600 % 24).astype(np.int64)
+    return pd.DataFrame({"Hour": np.arange(24), **_sums(hours, columns, 24)})
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Export chat history to the columnar store and report on it")
+    parser.add_argument("--user", help="Only this user (directory name under profiles/users)")
+    parser.add_argument("--subject", help="Only this subject")
+    args = parser.parse_args()
+
+    table, stats = refresh()
+    print(f"Exported {stats['sources_exported']} changed chat file(s), removed {stats['sources_removed']}; "
+          f"{stats['rows']:,} messages in {stats['seconds']} s")
+
+    import pandas  # noqa: F401 - imported before timing the aggregations
+    mask = select(table, user=args.user, subject=args.subject)
+    start = time.perf_counter()
+    reports = {"Per subject": per_subject(table, mask), "Per day": per_day(table, mask).tail(14),
+               "Per hour of day": per_hour(table, mask)}
+    seconds = time.perf_counter() - start
+    for title, frame in reports.items():
+        print(f"\n{title}:\n{frame.to_string(index=False)}")
+    print(f"\nAggregations: {seconds * 1000:.1f} ms over {int(mask.sum()):,} messages")
+
+
+if __name__ == "__main__":
+    main()
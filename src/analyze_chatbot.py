@@ -1,251 +1,157 @@
 import os
 import streamlit as st
-import json
-from datetime import datetime
-import pandas as pd
-import matplotlib.pyplot as plt
-from openai import OpenAI
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-
-CHAT_FOLDER = "profiles/chat_history"
-PROGRESS_FOLDER = "profiles/progress_tracker"
-
-def load_chat(subject):
-    file_path = os.path.join(CHAT_FOLDER, f"{subject}.json")
-    if not os.path.exists(file_path):
-        return {}
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {}
-
-def load_progress(subject):
-    path = os.path.join(PROGRESS_FOLDER, f"{subject}.json")
-
-    # If file does not exist, create an empty one
-    if not os.path.exists(path):
-        os.makedirs(PROGRESS_FOLDER, exist_ok=True)
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump({}, f, indent=2)
-        return {}
-
-    # Load existing file
-    try:
-        with open(path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except json.JSONDecodeError:
-        # If file is corrupted, reset safely
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump({}, f, indent=2)
-        return {}
-
-    
-
-def save_progress(subject, date, entry):
-    os.makedirs(PROGRESS_FOLDER, exist_ok=True)
-    path = os.path.join(PROGRESS_FOLDER, f"{subject}.json")
-
-    if os.path.exists(path):
-        with open(path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except:
-                data = {}
-    else:
-        data = {}
-
-    # Save ONE object per date (overwrite allowed)
-    data[date] = entry
-
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-
-
-def analyze_feedback(subject):
-    data = load_chat(subject)
-    daily_feedback = []
-
-    for date, messages in data.items():
-        # Skip non-list entries (like feedback summaries)
-        if not isinstance(messages, list):
-            continue
-
-        thumbs_up = sum(m.get("feedback", {}).get("thumbs_up", 0) for m in messages)
-        thumbs_down = sum(m.get("feedback", {}).get("thumbs_down", 0) for m in messages)
-        daily_feedback.append({
-            "Date": date,
-            "Thumbs Up": thumbs_up,
-            "Thumbs Down": thumbs_down
-        })
-
-    return pd.DataFrame(daily_feedback).sort_values("Date", ascending=False)
-
-def build_chat_text(chat_data, date):
-    """
-    Convert chat history of a given date into a readable text
-    for LLM analysis.
-    """
-    messages = chat_data.get(date, [])
-    lines = []
-
-    for msg in messages:
-        role = msg.get("role", "")
-        content = msg.get("content", "")
-        timestamp = msg.get("timestamp", "")
-
-        if role == "user":
-            lines.append(f"[{timestamp}] User: {content}")
-        elif role == "assistant":
-            lines.append(f"[{timestamp}] Assistant: {content}")
-
-    return "\n".join(lines)
-
+from chat_store import feedback_counts, load_chat
+from study_analysis import analyze_day_cached, analyze_days, unanalyzed_days
+from study_sessions import day_sessions, format_minutes
+from user_storage import chat_dir, current_user_id
+
+
+def analyze_feedback(subject, user_id=None):
+    """Daily thumbs up/down of a subject, read from the per-day counters (one row per chat day)."""
+    import pandas as pd  # loaded on first use, not at app startup
+
+    daily_feedback = [
+        {"Date": date, "Thumbs Up": counts["thumbs_up"], "Thumbs Down": counts["thumbs_down"]}
+        for date, counts in feedback_counts(subject, user_id).items()
+    ]
+    return pd.DataFrame(daily_feedback, columns=["Date", "Thumbs Up", "Thumbs Down"]).sort_values(
+        "Date", ascending=False
+    )
 
 # ---------------- Streamlit UI ----------------
-st.title("📊 Chatbot Feedback Analysis")
+def render_feedback():
+    """Render the feedback analysis page (called by app.py on every rerun)."""
+    st.title("📊 Chatbot Feedback Analysis")
 
-# List subjects
-subjects = [f.replace(".json", "") for f in os.listdir(CHAT_FOLDER) if f.endswith(".json")]
-subject = st.selectbox("Select Subject", subjects, width=300)
+    # Resolved here: the analysis threads have no session to look the user up in
+    user_id = current_user_id()
 
-df = analyze_feedback(subject)
+    # List subjects
+    subjects = [f.replace(".json", "") for f in os.listdir(chat_dir(user_id)) if f.endswith(".json")]
+    if not subjects:
+        st.info("No chats yet. Chat with Persona first to see feedback here.")
+        return
+    subject = st.selectbox("Select Subject", subjects, width=300)
 
-if df.empty:
-    st.info("No feedback data found for this subject yet.")
-else:
-# ---------------- Plot ----------------
-    st.subheader("Daily Feedback Chart")
-    fig, ax = plt.subplots(figsize=(4, 2))
+    df = analyze_feedback(subject, user_id)
 
-    bar_width = 0.4
+    if df.empty:
+        st.info("No feedback data found for this subject yet.")
+    else:
+    # ---------------- Plot ----------------
+        st.subheader("Daily Feedback Chart")
+        import matplotlib.pyplot as plt  # heavy; only loaded when there is data to plot
 
-    ax.bar(df["Date"], df["Thumbs Up"], color="#4CAF50", label="👍 Thumbs Up", width=bar_width)
-    ax.bar(df["Date"], df["Thumbs Down"], bottom=df["Thumbs Up"], color="#F44336", label="👎 Thumbs Down", width=bar_width)
+        fig, ax = plt.subplots(figsize=(4, 2))
 
-    ax.set_ylabel("Count", fontsize=5)
-    ax.set_xlabel("Date", fontsize=5)
-    ax.set_title(f"Daily Feedback for Subject: '{subject}'", fontsize=7)
-    ax.legend(fontsize=9)
-    ax.tick_params(axis='x', labelrotation=45, labelsize=9)
-    ax.tick_params(axis='y', labelsize=9)
+        bar_width = 0.4
 
-    st.pyplot(fig)
+        ax.bar(df["Date"], df["Thumbs Up"], color="#4CAF50", label="👍 Thumbs Up", width=bar_width)
+        ax.bar(df["Date"], df["Thumbs Down"], bottom=df["Thumbs Up"], color="#F44336", label="👎 Thumbs Down", width=bar_width)
 
+        ax.set_ylabel("Count", fontsize=5)
+        ax.set_xlabel("Date", fontsize=5)
+        ax.set_title(f"Daily Feedback for Subject: '{subject}'", fontsize=7)
+        ax.legend(fontsize=9)
+        ax.tick_params(axis='x', labelrotation=45, labelsize=9)
+        ax.tick_params(axis='y', labelsize=9)
 
-# ---------------- Study Behavior Analysis ----------------
-st.divider()
-st.subheader("📘 Study Behavior Analysis")
+        st.pyplot(fig)
 
-chat_data = load_chat(subject)
 
-# Available dates (only real chat days)
-available_dates = [
-    d for d, msgs in chat_data.items()
-    if isinstance(msgs, list) and len(msgs) > 0
-]
+    # ---------------- Study Behavior Analysis ----------------
+    st.divider()
+    st.subheader("📘 Study Behavior Analysis")
 
-if not available_dates:
-    st.info("No chat history available for study behavior analysis.")
-else:
-    selected_date = st.selectbox(
-        "Select Date",
-        sorted(available_dates, reverse=True),
-        width=300
-    )
+    chat_data = load_chat(subject, user_id)
 
-    if st.button("Analyze Study Behavior"):
-        chat_text = build_chat_text(chat_data, selected_date)
+    # Available dates (only real chat days)
+    available_dates = [
+        d for d, msgs in chat_data.items()
+        if isinstance(msgs, list) and len(msgs) > 0
+    ]
 
-        if not chat_text.strip():
-            st.warning("No chat content found for this date.")
-        else:
+    if not available_dates:
+        st.info("No chat history available for study behavior analysis.")
+    else:
+        selected_date = st.selectbox(
+            "Select Date",
+            sorted(available_dates, reverse=True),
+            width=300
+        )
+
+        # Measured locally from the message timestamps (no LLM call)
+        sessions = day_sessions(chat_data[selected_date])
+        col_time, col_sessions, col_longest = st.columns(3)
+        col_time.metric("⏱️ Active study time", format_minutes(sessions["active_minutes"]))
+        col_sessions.metric("📚 Study sessions", sessions["sessions"])
+        col_longest.metric("🎯 Longest focus block", format_minutes(sessions["longest_session_minutes"]))
+
+        col_one, col_all = st.columns(2)
+        analyze_one = col_one.button("Analyze Study Behavior")
+        pending = unanalyzed_days(subject, chat_data, user_id)
+        # Constant label: the widget id depends on it, so a changing count would drop the click
+        analyze_all = col_all.button(
+            "Analyze all unanalyzed days", disabled=not pending,
+            help="Days whose conversation was already analyzed are served from the cache"
+        )
+        col_all.caption(f"{len(pending)} day(s) not analyzed yet")
+
+        if analyze_one:
             with st.spinner("Analyzing study behavior..."):
-                
-                prompt = f"""
-You are an educational analyst AI.
-
-Below is a full chat conversation between a student and a tutor
-for ONE study session on {selected_date}.
-
-Each message includes a timestamp in ISO format.
-
-Your tasks:
-1. Analyze the student's study behavior in 2-4 concise sentences. You are talking to the student directly, so use "you" and "your".
-2. Estimate the approximate total time the student actively spent studying this subject.
-
-Return ONLY valid JSON.
-Do NOT include markdown.
-Do NOT include explanations.
-Do NOT include extra text.
-
-The JSON must follow EXACTLY this schema:
-
-{{
-  "date": "<YYYY-MM-DD>",
-  "summary": "<concise summary>",
-  "topics_covered": "<comma-separated topics>",
-  "estimated_study_time": "<time in minutes or hours>",
-  "confidence_level": "<number out of 10>",
-  "satisfaction_level": "<number out of 10>",
-  "mood": "<short description>",
-  "improvements": "<specific suggestions>"
-}}
-
-Conversation:
-{chat_text}
-"""
-
                 try:
-                    response = client.chat.completions.create(
-                        model="gpt-4o-mini",
-                        messages=[
-                            {"role": "system", "content": "You analyze study behavior."},
-                            {"role": "user", "content": prompt}
-                        ],
-                        temperature=0.4,
-                    )
-
-                    analysis_text = response.choices[0].message.content.strip()
-                    try:
-                        analysis_json = json.loads(analysis_text)
-                    except json.JSONDecodeError:
-                        st.error("LLM did not return valid JSON")
-                        st.text(analysis_text)
-                        st.stop()
-
-                    st.markdown("### 🧠 Study Behavior Summary")
-
-                    st.markdown(
-                        f"""
-                        <div style="padding:14px; border-radius:8px; background-color:#f5f5f5;">
-                        <b>Summary:</b> {analysis_json["summary"]}<br><br>
-                        <b>Main topics covered:</b> {analysis_json["topics_covered"]}<br>
-                        <b>Estimated study time:</b> {analysis_json["estimated_study_time"]}<br>
-                        <b>Confidence level:</b> {analysis_json["confidence_level"]}<br>
-                        <b>Satisfaction level:</b> {analysis_json["satisfaction_level"]}<br>
-                        <b>Mood:</b> {analysis_json["mood"]}<br><br>
-                        <b>What can be improved:</b> {analysis_json["improvements"]}
-                        </div>
-                        """,
-                        unsafe_allow_html=True
-                    )
-
-
-                    # Save analysis to progress tracker
-                    save_progress(
-                        subject,
-                        analysis_json["date"],
-                        {
-                            "Topics covered": analysis_json["topics_covered"],
-                            "Time spent on the subject": analysis_json["estimated_study_time"],
-                            "Mood": analysis_json["mood"],
-                            "Satisfaction level": analysis_json["satisfaction_level"]
-                        }
-                    )
-
+                    analysis_json, repair_stats, mode = analyze_day_cached(subject, chat_data, selected_date, user_id)
+                except ValueError as e:
+                    st.warning(str(e))
+                    st.stop()
                 except Exception as e:
                     st.error(f"Failed to analyze study behavior: {e}")
+                    st.stop()
+
+            if mode == "cached":
+                st.caption("⚡ This day did not change since its last analysis (served from cache)")
+            elif mode == "incremental":
+                st.caption("🔁 Only the messages since the last analysis were sent (previous summary reused)")
+            if repair_stats:
+                saved = repair_stats["tokens_saved_est"]
+                st.caption(
+                    f"🔧 Re-requested {repair_stats['fields_requested']} missing field(s) only"
+                    + (f" (~{saved:,} tokens saved vs. a full retry)" if saved else "")
+                )
+
+            st.markdown("### 🧠 Study Behavior Summary")
+            render_analysis(analysis_json)
+
+        if analyze_all:
+            # Days run concurrently; each result is saved and shown as soon as it is done
+            progress = st.progress(0.0, text=f"Analyzing {len(pending)} day(s)...")
+            for done, (date, analysis_json, error) in enumerate(analyze_days(subject, chat_data, pending, user_id), 1):
+                progress.progress(done / len(pending), text=f"Analyzed {done}/{len(pending)} day(s)")
+                if error:
+                    st.error(f"{date}: failed to analyze study behavior: {error}")
+                    continue
+                with st.expander(f"🧠 {date}", expanded=len(pending) == 1):
+                    render_analysis(analysis_json)
+            st.success("✅ Progress tracker updated")
+
+
+def render_analysis(analysis_json):
+    st.markdown(
+        f"""
+        <div style="padding:14px; border-radius:8px; background-color:#f5f5f5;">
+        <b>Summary:</b> {analysis_json["summary"]}<br><br>
+        <b>Main topics covered:</b> {analysis_json["topics_covered"]}<br>
+        <b>Study time:</b> {analysis_json["estimated_study_time"]} in {analysis_json["sessions"]} session(s),
+        longest focus block {format_minutes(analysis_json["longest_session_minutes"])}<br>
+        <b>Confidence level:</b> {analysis_json["confidence_level"]}<br>
+        <b>Satisfaction level:</b> {analysis_json["satisfaction_level"]}<br>
+        <b>Mood:</b> {analysis_json["mood"]}<br><br>
+        <b>What can be improved:</b> {analysis_json["improvements"]}
+        </div>
+        """,
+        unsafe_allow_html=True
+    )
 
 
+if __name__ == "__main__":
+    render_feedback()
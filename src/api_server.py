@@ -0,0 +1,256 @@
+"""
+api_server.py - Headless HTTP Service for Chat, Extraction and Analysis
+
+The Streamlit app serves one learner per browser session and reruns the
+whole script on every click. This service exposes the same core logic
+(chat_store, extract_preferences, study_analysis) over HTTP so other
+front ends and load tests can use it, with many concurrent users per
+process:
+
+    GET  /health
+    POST /users/{user_id}/chat/{subject}/messages        {"message", "stream", "date"}
+    GET  /users/{user_id}/chat/{subject}
+    POST /users/{user_id}/chat/{subject}/feedback        {"date", "index", "thumbs_up"}
+    POST /users/{user_id}/profile/extract                {"responses", "use_cache"}
+    GET  /users/{user_id}/profile
+    PUT  /users/{user_id}/profile/{section}              {"value"}
+    POST /users/{user_id}/analysis/{subject}/{date}
+    POST /users/{user_id}/analysis/{subject}                 (all unanalyzed days)
+    GET  /users/{user_id}/sessions                           (study time per day, no LLM)
+
+Handlers are async; the blocking core calls (LLM requests, file I/O) run in
+worker threads, so one slow request never blocks the event loop. With
+"stream": true a chat reply is sent as plain text while the model writes
+it and is stored once complete.
+
+Run it (needs the optional fastapi/uvicorn requirements):
+
+    python src/api_server.py --port 8000
+    PERSONA_FAKE_LLM=1 python src/api_server.py        (offline, see fake_llm.py)
+
+Last updated: January 2026
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+from typing import Optional
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+from starlette.concurrency import iterate_in_threadpool
+
+import chat_store
+import study_analysis
+import study_sessions
+from extract_preferences import extract_profile_silently
+from profile_validator import validate_profile
+from shared_state import update_json
+from user_profile_schema import USER_PROFILE_SCHEMA
+from user_storage import extracted_prefs_file, responses_file
+from utils import write_json_atomic
+
+PROFILE_SECTIONS = set(USER_PROFILE_SCHEMA["learning_profile"]) | {"summary"}
+
+app = FastAPI(title="Persona AI", version="1.0")
+
+
+# ============================================================
+# REQUEST BODIES
+# ============================================================
+
+class MessageRequest(BaseModel):
+    message: str
+    stream: bool = False
+    date: Optional[str] = None
+
+
+class FeedbackRequest(BaseModel):
+    date: str
+    index: int
+    thumbs_up: bool
+
+
+class ExtractRequest(BaseModel):
+    responses: Optional[dict] = None
+    use_cache: bool = True
+
+
+class SectionUpdate(BaseModel):
+    value: object
+
+
+# ============================================================
+# HELPERS
+# ============================================================
+
+def _check_subject(subject):
+    if not chat_store.is_valid_subject(subject):
+        raise HTTPException(status_code=400, detail=f"Invalid subject: {subject!r}")
+
+
+def _require_profile(profile):
+    if profile is None:
+        raise HTTPException(status_code=404, detail="No profile yet; run /profile/extract first")
+    return profile
+
+
+def _save_section(user_id, section, value):
+    """Validate one edited section and write it into the user's profile."""
+    if section not in PROFILE_SECTIONS:
+        raise HTTPException(status_code=404, detail=f"Unknown section: {section!r}")
+    _require_profile(chat_store.read_user_profile(user_id))
+
+    validated, invalid = validate_profile({"learning_profile": {section: value}})
+    invalid = [f for f in invalid if f == section or f.startswith(f"{section}.")]
+    if invalid:
+        raise HTTPException(status_code=422, detail={"invalid_fields": invalid})
+
+    # Merged under the file's lock, so edits of other sections are kept
+    def update(profile):
+        profile.setdefault("learning_profile", {})[section] = validated["learning_profile"][section]
+        return profile
+    profile, _ = update_json(extracted_prefs_file(user_id), update, default={}, indent=4)
+    return profile
+
+
+# ============================================================
+# ROUTES
+# ============================================================
+
+@app.get("/health")
+async def health():
+    return {"status": "ok"}
+
+
+@app.get("/users/{user_id}/chat/{subject}")
+async def get_chat(user_id: str, subject: str):
+    _check_subject(subject)
+    return await asyncio.to_thread(chat_store.load_chat, subject, user_id)
+
+
+@app.post("/users/{user_id}/chat/{subject}/messages")
+async def send_message(user_id: str, subject: str, body: MessageRequest):
+    _check_subject(subject)
+    if not body.message.strip():
+        raise HTTPException(status_code=400, detail="Empty message")
+
+    profile = await asyncio.to_thread(chat_store.read_user_profile, user_id)
+    user_message = chat_store.new_message("user", body.message)
+    date = body.date or user_message["timestamp"][:10]
+    await asyncio.to_thread(chat_store.append_message, subject, user_message, date, user_id)
+    chat = await asyncio.to_thread(chat_store.load_chat, subject, user_id)
+    history = chat.get(date, [])
+
+    if not body.stream:
+        reply = await asyncio.to_thread(chat_store.generate_reply, profile, subject, history)
+        message = chat_store.new_message("assistant", reply)
+        index = await asyncio.to_thread(chat_store.append_message, subject, message, date, user_id)
+        return {"date": date, "index": index, "message": message}
+
+    async def relay():
+        parts = []
+        try:
+            async for piece in iterate_in_threadpool(chat_store.stream_reply(profile, subject, history)):
+                parts.append(piece)
+                yield piece
+        finally:
+            # Store whatever was produced, also if the client disconnected
+            if parts:
+                message = chat_store.new_message("assistant", "".join(parts))
+                await asyncio.to_thread(chat_store.append_message, subject, message, date, user_id)
+
+    return StreamingResponse(relay(), media_type="text/plain; charset=utf-8")
+
+
+@app.post("/users/{user_id}/chat/{subject}/feedback")
+async def send_feedback(user_id: str, subject: str, body: FeedbackRequest):
+    _check_subject(subject)
+    try:
+        message = await asyncio.to_thread(
+            chat_store.set_feedback, subject, body.date, body.index, body.thumbs_up, user_id
+        )
+    except IndexError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    return {"message": message}
+
+
+@app.post("/users/{user_id}/profile/extract")
+async def extract_profile(user_id: str, body: ExtractRequest):
+    if body.responses is not None:
+        await asyncio.to_thread(write_json_atomic, responses_file(user_id), body.responses)
+    elif not os.path.exists(responses_file(user_id)):
+        raise HTTPException(status_code=404, detail="No interview responses for this user")
+
+    try:
+        profile = await asyncio.to_thread(
+            extract_profile_silently, body.responses, body.use_cache, user_id, None, True
+        )
+    except Exception as e:
+        raise HTTPException(status_code=502, detail=f"Extraction failed: {e}")
+    return _require_profile(profile)
+
+
+@app.get("/users/{user_id}/profile")
+async def get_profile(user_id: str):
+    return _require_profile(await asyncio.to_thread(chat_store.read_user_profile, user_id))
+
+
+@app.put("/users/{user_id}/profile/{section}")
+async def update_profile_section(user_id: str, section: str, body: SectionUpdate):
+    return await asyncio.to_thread(_save_section, user_id, section, body.value)
+
+
+@app.post("/users/{user_id}/analysis/{subject}/{date}")
+async def analyze_day(user_id: str, subject: str, date: str):
+    _check_subject(subject)
+    chat = await asyncio.to_thread(chat_store.load_chat, subject, user_id)
+    try:
+        analysis, repair_stats, mode = await asyncio.to_thread(
+            study_analysis.analyze_day_cached, subject, chat, date, user_id
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=422, detail=str(e))
+    return {"analysis": analysis, "field_repair": repair_stats, "mode": mode}
+
+
+@app.post("/users/{user_id}/analysis/{subject}")
+async def analyze_unanalyzed_days(user_id: str, subject: str):
+    """Analyze every day whose conversation has no cached analysis yet (concurrently)."""
+    _check_subject(subject)
+    chat = await asyncio.to_thread(chat_store.load_chat, subject, user_id)
+
+    def run():
+        dates = study_analysis.unanalyzed_days(subject, chat, user_id)
+        return [
+            {"date": date, "analysis": analysis, "error": str(error) if error else None}
+            for date, analysis, error in study_analysis.analyze_days(subject, chat, dates, user_id)
+        ]
+    return {"results": await asyncio.to_thread(run)}
+
+
+@app.get("/users/{user_id}/sessions")
+async def get_sessions(user_id: str):
+    return await asyncio.to_thread(study_sessions.user_sessions, user_id)
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Persona AI HTTP service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    import uvicorn
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
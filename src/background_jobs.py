@@ -0,0 +1,280 @@
+"""
+background_jobs.py - Background Profile Extraction
+
+Profile extraction takes several seconds of LLM time. Instead of starting it
+when the user opens the AI Learning Profile tab, interview.py submits it here
+as soon as the closing script is shown. By the time the user has read the
+closing text and clicked "Generate", the profile is usually already written.
+
+While the interview is still running, every completed section also submits
+a partial extraction of the fields whose linked questions are now all
+answered. Results accumulate in a per-user staging profile; the final job
+only reconciles the remaining fields and writes the summary. It is queued
+once the user's section jobs are done, so it never occupies a worker
+while waiting for them.
+
+Jobs live in a process-wide registry (this module is imported once and
+survives Streamlit reruns), keyed by user id. Submitting the same responses
+again while a job is running or finished returns the existing job.
+
+Usage:
+    import background_jobs
+
+    background_jobs.submit_section_extraction(responses) # interview.py, per section
+    background_jobs.submit_extraction(responses)        # interview.py, at the end
+    job = background_jobs.get_job()                     # app.py profile tab
+    result = background_jobs.wait_for_job(job)
+
+Last updated: January 2026
+"""
+
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import extraction_cache
+from deterministic_extractor import extract_structured_fields, field_links
+
+MAX_WORKERS = 2
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="extraction")
+_JOBS = {}
+_STAGING = {}   # user_id -> {(section, field): (answers digest, value)}
+_PENDING = {}   # user_id -> [futures of running section extractions]
+_LOCK = threading.Lock()
+
+
+# ============================================================
+# JOB REGISTRY
+# ============================================================
+
+def _run_extraction(job, responses, use_cache):
+    from extract_preferences import extract_profile_silently
+
+    try:
+        staged = staged_fields(responses, job["user_id"])
+        job["fields_staged"] = sum(len(f) for f in staged.values())
+
+        def on_section(section, value):
+            if job["first_section_at"] is None:
+                job["first_section_at"] = time.time()
+            job["sections"][section] = value
+
+        return extract_profile_silently(responses, use_cache=use_cache, user_id=job["user_id"],
+                                        staged=staged, on_section=on_section)
+    finally:
+        job["finished_at"] = time.time()
+
+
+def _when_all_done(futures, callback):
+    """Call callback() once every future has finished (right away if there are none)."""
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def one_done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback()
+
+    if not futures:
+        callback()
+    for future in futures:
+        future.add_done_callback(one_done)
+
+
+def _copy_outcome(source, target):
+    error = source.exception()
+    if error is not None:
+        target.set_exception(error)
+    else:
+        target.set_result(source.result())
+
+
+def _start_after_sections(job, responses, use_cache, pending):
+    """
+    Return a future for the job that runs once the pending section extractions are done.
+
+    The job is only submitted then, so it never holds an executor worker
+    while waiting for sections (which need those workers themselves).
+    """
+    outer = Future()
+
+    def start():
+        inner = _EXECUTOR.submit(_run_extraction, job, responses, use_cache)
+        inner.add_done_callback(lambda done: _copy_outcome(done, outer))
+
+    _when_all_done(pending, start)
+    return outer
+
+
+def submit_extraction(responses, user_id=extraction_cache.DEFAULT_USER, use_cache=True, force=False):
+    """
+    Start extracting a profile in the background.
+
+    Args:
+        responses: Dictionary of interview responses
+        user_id: Owner of the job
+        use_cache: Whether the extraction cache may be used
+        force: Start a new job even if one exists for these responses
+
+    Returns:
+        dict: The job record (new, or the existing one for identical responses)
+    """
+    key = extraction_cache.make_cache_key(responses, "job", "")
+    with _LOCK:
+        job = _JOBS.get(user_id)
+        if not force and job and job["key"] == key and not job_failed(job):
+            return job
+
+        job = {
+            "user_id": user_id,
+            "key": key,
+            "submitted_at": time.time(),
+            "finished_at": None,
+            "waited_seconds": None,
+            "fields_staged": 0,
+            "sections": {},             # streamed sections, filled while running
+            "first_section_at": None,
+        }
+        # The user's section extractions were queued earlier; their staged fields are reused
+        pending = _PENDING.pop(user_id, [])
+        job["future"] = _start_after_sections(job, dict(responses), use_cache, pending)
+        _JOBS[user_id] = job
+        return job
+
+
+def get_job(user_id=extraction_cache.DEFAULT_USER):
+    """Return the user's latest extraction job, or None."""
+    return _JOBS.get(user_id)
+
+
+def job_status(job):
+    """Return "none", "running", "done" or "failed"."""
+    if job is None:
+        return "none"
+    if not job["future"].done():
+        return "running"
+    return "failed" if job_failed(job) else "done"
+
+
+def job_failed(job):
+    future = job["future"]
+    return future.done() and (future.exception() is not None or not future.result())
+
+
+def iter_sections(job, poll_seconds=0.1):
+    """
+    Yield the job's streamed sections each time a new one arrives.
+
+    Returns when the job has finished; the caller then gets the final
+    profile from wait_for_job.
+    """
+    start = time.time()
+    shown = 0
+    while True:
+        done = job["future"].done()
+        sections = dict(job["sections"])
+        if len(sections) != shown:
+            shown = len(sections)
+            yield sections
+        if done:
+            break
+        time.sleep(poll_seconds)
+    if job["waited_seconds"] is None:
+        job["waited_seconds"] = time.time() - start
+
+
+def wait_for_job(job):
+    """
+    Block until the job finishes and record how long the caller waited.
+
+    Returns:
+        dict: The extracted profile, or None if the job failed
+    """
+    start = time.time()
+    try:
+        result = job["future"].result()
+    except Exception as e:
+        print(f"Background extraction failed: {str(e)}")
+        result = None
+    if job["waited_seconds"] is None:
+        job["waited_seconds"] = time.time() - start
+    return result
+
+
+# ============================================================
+# PER-SECTION STAGING
+# ============================================================
+
+def _answers_digest(responses, keys):
+    return extraction_cache.make_cache_key({k: responses.get(k) for k in keys}, "stage", "")
+
+
+def _ready_fields(responses, user_id):
+    """Fields whose linked answers are all in and not yet staged with these answers."""
+    resolved, unresolved = extract_structured_fields(responses)
+    staging = _STAGING.get(user_id, {})
+    ready = {}
+    for field_id in unresolved:
+        keys = field_links().get(field_id, ())
+        if not keys or any(k not in responses for k in keys):
+            continue
+        digest = _answers_digest(responses, keys)
+        staged = staging.get(field_id)
+        if staged is None or staged[0] != digest:
+            ready[field_id] = digest
+    return ready, resolved
+
+
+def _run_section_extraction(user_id, responses, ready, resolved):
+    from extract_preferences import extract_fields
+
+    extracted = extract_fields(responses, list(ready), context=resolved)
+    with _LOCK:
+        staging = _STAGING.setdefault(user_id, {})
+        for section, fields in extracted.items():
+            for field, value in fields.items():
+                staging[(section, field)] = (ready[(section, field)], value)
+    return extracted
+
+
+def submit_section_extraction(responses, user_id=extraction_cache.DEFAULT_USER):
+    """
+    Stage the fields that became extractable with the answers given so far.
+
+    Called when an interview section is completed. Fields are re-extracted
+    only if one of their linked answers changed since they were staged.
+    Nothing is submitted outside hybrid mode, where the final extraction
+    ignores staged fields.
+
+    Returns:
+        int: Number of fields submitted
+    """
+    from extract_preferences import EXTRACTION_MODE
+
+    if EXTRACTION_MODE != "hybrid":
+        return 0
+    ready, resolved = _ready_fields(responses, user_id)
+    if not ready:
+        return 0
+    future = _EXECUTOR.submit(_run_section_extraction, user_id, dict(responses), ready, resolved)
+    with _LOCK:
+        _PENDING.setdefault(user_id, []).append(future)
+    return len(ready)
+
+
+def staged_fields(responses, user_id=extraction_cache.DEFAULT_USER):
+    """
+    Return staged values that still match the current answers.
+
+    Returns:
+        dict: {section: {field: value}}
+    """
+    links = field_links()
+    staged = {}
+    for (section, field), (digest, value) in list(_STAGING.get(user_id, {}).items()):
+        if _answers_digest(responses, links.get((section, field), ())) == digest:
+            staged.setdefault(section, {})[field] = value
+    return staged
@@ -0,0 +1,257 @@
+"""
+batch_extract.py - Headless Batch Profile Extraction
+
+Extracts learning profiles for many interview response files at once,
+e.g. when onboarding a whole course.
+
+Input is either:
+    - a directory of *.json files (one responses dict per file, user id = file name)
+    - a .jsonl file, one user per line: {"user_id": "...", "responses": {...}}
+      (a bare responses dict is also accepted; its user id is "line-<n>")
+
+Extractions run in a process pool with bounded concurrency. Every finished
+user is appended to a checkpoint manifest (manifest.jsonl in the output
+directory), so a crashed or interrupted run resumes where it stopped:
+users whose input did not change and whose profile exists are skipped.
+Unreadable inputs and repeated user ids (after making them file-name safe)
+are recorded as failures; only the first entry of a user id is extracted.
+
+Usage:
+    python src/batch_extract.py path/to/responses_dir --workers 8
+    python src/batch_extract.py course.jsonl --output-dir profiles/batch
+
+Last updated: January 2026
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from extraction_cache import canonical_json, make_cache_key
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_OUTPUT_DIR = os.path.join(BASE_DIR, "profiles", "batch")
+MANIFEST_NAME = "manifest.jsonl"
+
+
+# ============================================================
+# INPUT
+# ============================================================
+
+def safe_user_id(user_id):
+    """Make a user id usable as a file name."""
+    return re.sub(r"[^\w.-]+", "_", str(user_id)).strip("._") or "user"
+
+
+def iter_inputs(path):
+    """
+    Yield (user_id, responses) pairs from a directory or a JSONL file.
+
+    Unreadable entries are yielded with responses=None so they show up
+    as failures in the summary instead of being skipped silently.
+    """
+    if os.path.isdir(path):
+        for name in sorted(os.listdir(path)):
+            if not name.endswith(".json"):
+                continue
+            user_id = safe_user_id(os.path.splitext(name)[0])
+            try:
+                with open(os.path.join(path, name), "r", encoding="utf-8") as f:
+                    yield user_id, json.load(f)
+            except (json.JSONDecodeError, OSError):
+                yield user_id, None
+        return
+
+    with open(path, "r", encoding="utf-8") as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield f"line-{line_no}", None
+                continue
+            if isinstance(record, dict) and "responses" in record:
+                yield safe_user_id(record.get("user_id", f"line-{line_no}")), record["responses"]
+            else:
+                yield f"line-{line_no}", record
+
+
+# ============================================================
+# CHECKPOINT MANIFEST
+# ============================================================
+
+def input_hash(responses):
+    return make_cache_key(responses, "batch", "input")
+
+
+def load_manifest(manifest_path):
+    """Return {user_id: last manifest record} from an existing run."""
+    done = {}
+    if not os.path.exists(manifest_path):
+        return done
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A crash can leave a half-written last line
+                continue
+            done[record["user_id"]] = record
+    return done
+
+
+def append_manifest(manifest_file, record):
+    manifest_file.write(canonical_json(record) + "\n")
+    manifest_file.flush()
+    os.fsync(manifest_file.fileno())
+
+
+# ============================================================
+# WORKER
+# ============================================================
+
+def extract_one(user_id, responses, output_file, use_cache):
+    """Run one extraction inside a worker process."""
+    start = time.perf_counter()
+    try:
+        from extract_preferences import extract_profile_silently
+
+        profile = extract_profile_silently(
+            responses, use_cache=use_cache, user_id=user_id,
+            output_file=output_file, raise_errors=True,
+        )
+        error = None if profile else "extraction returned no profile"
+    except Exception as e:
+        error = f"{type(e).__name__}: {e}"
+    return user_id, error, time.perf_counter() - start
+
+
+# ============================================================
+# BATCH RUN
+# ============================================================
+
+def run_batch(input_path, output_dir=DEFAULT_OUTPUT_DIR, workers=4, use_cache=True):
+    """
+    Extract profiles for every user in input_path.
+
+    Returns:
+        dict: Summary with counts, throughput and failures
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, MANIFEST_NAME)
+    previous = load_manifest(manifest_path)
+
+    summary = {"ok": 0, "failed": 0, "skipped": 0, "latencies": [], "failures": {}}
+    start = time.perf_counter()
+    max_in_flight = workers * 2
+
+    with open(manifest_path, "a", encoding="utf-8") as manifest_file, \
+            ProcessPoolExecutor(max_workers=workers) as pool:
+        in_flight = {}
+        seen = set()
+
+        def record(user_id, digest, error, seconds=0.0):
+            status = "failed" if error else "ok"
+            summary[status] += 1
+            if error:
+                summary["failures"][user_id] = error
+            append_manifest(manifest_file, {
+                "user_id": user_id, "input_hash": digest, "status": status,
+                "seconds": round(seconds, 2), "error": error,
+                "timestamp": datetime.now().isoformat(),
+            })
+            print(f"[{status:>6}] {user_id} ({seconds:.1f}s){' - ' + error if error else ''}")
+
+        def collect():
+            finished, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in finished:
+                digest = in_flight.pop(future)
+                user_id, error, seconds = future.result()
+                summary["latencies"].append(seconds)
+                record(user_id, digest, error, seconds)
+
+        for user_id, responses in iter_inputs(input_path):
+            output_file = os.path.join(output_dir, f"{user_id}.json")
+
+            if user_id in seen:
+                # Same output file and manifest entry as the first one, which it
+                # would overwrite; reported, but not written to the manifest
+                error = "user id appears more than once in the input"
+                summary["failed"] += 1
+                summary["failures"][f"{user_id} (duplicate)"] = error
+                print(f"[failed] {user_id} - {error}")
+                continue
+            seen.add(user_id)
+
+            if responses is None:
+                record(user_id, None, "unreadable input")
+                continue
+
+            digest = input_hash(responses)
+            last = previous.get(user_id)
+            if last and last["status"] == "ok" and last["input_hash"] == digest and os.path.exists(output_file):
+                summary["skipped"] += 1
+                continue
+
+            # Bounded concurrency: never queue more than max_in_flight jobs
+            while len(in_flight) >= max_in_flight:
+                collect()
+            future = pool.submit(extract_one, user_id, responses, output_file, use_cache)
+            in_flight[future] = digest
+
+        while in_flight:
+            collect()
+
+    summary["elapsed"] = time.perf_counter() - start
+    return summary
+
+
+def print_summary(summary):
+    processed = summary["ok"] + summary["failed"]
+    elapsed = summary["elapsed"]
+    latencies = sorted(summary["latencies"])
+
+    print("\n" + "=" * 60)
+    print("BATCH EXTRACTION SUMMARY")
+    print("=" * 60)
+    print(f"Processed: {processed}  (ok {summary['ok']}, failed {summary['failed']})")
+    print(f"Skipped (already done): {summary['skipped']}")
+    print(f"Elapsed: {elapsed:.1f}s")
+    if processed and elapsed:
+        print(f"Throughput: {processed / elapsed * 60:.1f} profiles/min")
+    if latencies:
+        p50 = latencies[len(latencies) // 2]
+        p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+        print(f"Latency per profile: p50 {p50:.1f}s, p95 {p95:.1f}s")
+    if summary["failures"]:
+        print("\nFailures:")
+        for user_id, error in sorted(summary["failures"].items()):
+            print(f"  - {user_id}: {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract learning profiles for many users")
+    parser.add_argument("input", help="Directory of responses *.json files or a .jsonl file")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT_DIR, help="Where profiles and the manifest go")
+    parser.add_argument("--workers", type=int, default=4, help="Number of worker processes")
+    parser.add_argument("--no-cache", action="store_true", help="Ignore cached extractions")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.input):
+        parser.error(f"input not found: {args.input}")
+
+    summary = run_batch(args.input, args.output_dir, max(1, args.workers), use_cache=not args.no_cache)
+    print_summary(summary)
+    sys.exit(1 if summary["failed"] else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,822 @@
+"""
+benchmarks.py - Micro-Benchmarks for Persona AI
+
+Small, dependency-free timing checks for the hot paths that run without
+the LLM. Run them from the project root:
+
+    python src/benchmarks.py validator
+    python src/benchmarks.py prompt
+    python src/benchmarks.py typing
+    python src/benchmarks.py pages      (needs the app's dependencies and git history)
+    python src/benchmarks.py startup    (compares against docs/startup_baseline.json)
+    python src/benchmarks.py reruns     (needs the app's dependencies and a generated profile)
+    python src/benchmarks.py replicas   (N processes on one data directory; fails on lost updates)
+    python src/benchmarks.py feedback   (feedback counters vs a full recount; fails if inconsistent)
+    python src/benchmarks.py analytics  (needs numpy/pandas)
+    python src/benchmarks.py sessions   (needs numpy; fails if it disagrees with a plain-Python loop)
+    python src/benchmarks.py incremental  (offline fake LLM; fails if re-analysis is not incremental)
+    python src/benchmarks.py api        (needs fastapi; every endpoint, offline with the fake LLM)
+    python src/benchmarks.py all
+
+Each benchmark prints one line per measurement so results can be compared
+between commits.
+
+Last updated: January 2026
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+BASE_DIR = os.path.dirname(SRC_DIR)
+STARTUP_BASELINE_FILE = os.path.join(BASE_DIR, "docs", "startup_baseline.json")
+
+# A measurement regresses if it is this much slower than the baseline (and by more than 20 ms).
+# Cold starts on a shared machine drift by about a third between runs; an eagerly
+# imported pandas, matplotlib or openai adds 400+ ms and stays well above this.
+REGRESSION_FACTOR = 1.5
+REGRESSION_MIN_MS = 20.0
+
+
+def _report(label, count, seconds):
+    per_item_us = seconds / count * 1e6 if count else 0.0
+    rate = count / seconds if seconds else float("inf")
+    print(f"{label:<40} {count:>8} items  {seconds * 1000:>9.1f} ms  "
+          f"{per_item_us:>9.1f} µs/item  {rate:>12,.0f} items/s")
+
+
+def sample_profile():
+    """A profile with typical LLM near-misses (casing, spacing, '7/10', lists)."""
+    return {
+        "learning_profile": {
+            "background": {"academic_program": "Informatics", "semester": "5th",
+                           "current_focus": ["Databases", "Statistics"], "goals": "Pass all exams", "age": "22"},
+            "learning_preferences": {
+                "explanation_preference": "Step by step", "examples_preference": "examples first",
+                "example_type": ["real world", "diagrams"], "example_quantity": "multiple",
+                "detail_level": "8/10", "guidance_preference": "Balanced", "focus_style": "focus",
+                "uses_analogies": "yes", "presentation_style": "visual", "practice_problems": True,
+                "code_examples": "if necessary", "pacing": "moderate", "learner_type": "example driven",
+                "repetition_preference": "spaced repetition"},
+            "communication_style": {"tone": "Conversational", "feedback_style": "supportive direct",
+                                    "response_depth": "detailed", "question_engagement": "Yes",
+                                    "summaries_after_explanation": True},
+            "emotional_patterns": {"stress_response": "pause", "overwhelm_support": "step by step",
+                                   "confidence_level": 11, "mood_sharing_comfort": "6",
+                                   "help_seeking_comfort": 7.4, "motivation_drivers": "Progress",
+                                   "common_blockers": "Confusion", "learning_challenges": "Focus"},
+            "study_behavior": {"study_rhythm": "mixed", "focus_duration": "45 minutes",
+                               "attention_span": "6", "recovery_strategy": "short break",
+                               "mistake_handling": "immediate fix"},
+            "summary": "A steady, example-driven learner.",
+        }
+    }
+
+
+def bench_validator(count=10000):
+    """Validate `count` profiles in one batch with the compiled validator."""
+    from profile_validator import ProfileValidator, validate_many
+
+    start = time.perf_counter()
+    ProfileValidator()
+    _report("validator: compile schema", 1, time.perf_counter() - start)
+
+    profiles = [sample_profile() for _ in range(count)]
+    start = time.perf_counter()
+    validate_many(profiles)
+    _report("validator: validate_many", count, time.perf_counter() - start)
+
+
+def sample_responses(variant=0):
+    """Interview responses shaped like interviewResponse.json (one answer per question)."""
+    with open(os.path.join(BASE_DIR, "docs", "interviewQuestions.json"), "r", encoding="utf-8") as f:
+        questions = json.load(f)
+    responses = {}
+    for section, items in questions.items():
+        if section in ("OPENING SCRIPT", "CLOSING SCRIPT"):
+            continue
+        for i, q in enumerate(items):
+            if q["type"] == "mcq":
+                options = q.get("options", ["N/A"])
+                responses[f"{section}-{i}"] = options[variant % len(options)]
+            elif q["type"] == "rating":
+                responses[f"{section}-{i}"] = variant % (q["scale"] + 1)
+            else:
+                responses[f"{section}-{i}"] = f"Free-text answer {variant} to: {q['question']}"
+    return responses
+
+
+def bench_prompt(count=10000):
+    """Assemble the full extraction prompt for `count` users."""
+    from prompt_templates import extraction_template, _template_text, _RESPONSES_SLOT
+    from user_profile_schema import USER_PROFILE_SCHEMA
+
+    users = [sample_responses(i) for i in range(count)]
+
+    start = time.perf_counter()
+    for responses in users:
+        # What build_extraction_prompt did before precompiling
+        text = _template_text(json.dumps(USER_PROFILE_SCHEMA, indent=2))
+        text.replace(_RESPONSES_SLOT, json.dumps(responses, indent=2))
+    _report("prompt: re-render every call", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    extraction_template.cache_clear()
+    template = extraction_template()
+    _report("prompt: compile template", 1, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for responses in users:
+        template.render(responses)
+    _report("prompt: precompiled render", count, time.perf_counter() - start)
+
+
+def bench_typing(speed=0.03):
+    """Server-side cost of showing the opening/closing scripts with the typing effect."""
+    from utils import typing_html
+
+    with open(os.path.join(BASE_DIR, "docs", "interviewQuestions.json"), "r", encoding="utf-8") as f:
+        questions = json.load(f)
+
+    for name in ("OPENING SCRIPT", "CLOSING SCRIPT"):
+        text = questions[name]["script"]
+        start = time.perf_counter()
+        markup = typing_html(text, speed)
+        _report(f"typing: {name.lower()} (client-side)", 1, time.perf_counter() - start)
+        print(f"{'':<40} 1 message, {len(markup):,} bytes; the per-character effect sent "
+              f"{len(text)} messages and slept {len(text) * speed:.1f}s")
+
+
+# page -> (module, render function); the profile page is rendered by app.py itself
+PAGES = {
+    "interview": ("interview", "render_interview"),
+    "profile": (None, "profile_page"),
+    "chatbot": ("generate_content", "generate_content"),
+    "feedback": ("analyze_chatbot", "render_feedback"),
+}
+
+
+_RERUN_SNIPPET = """
+import os, sys, time
+sys.path.insert(0, os.path.dirname({app!r}))   # as `streamlit run` does
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.session_state["user_id"] = "default"
+at.session_state["page"] = {page!r}
+at.run()
+start = time.perf_counter()
+for _ in range({reruns}):
+    at.run()
+print((time.perf_counter() - start) / {reruns} * 1000)
+"""
+
+
+def _export_tree(rev, dest):
+    """Write the files of a git revision to dest (False if git is unavailable)."""
+    import io
+    import tarfile
+    try:
+        archive = subprocess.run(["git", "archive", rev], capture_output=True, cwd=BASE_DIR, check=True).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return False
+    with tarfile.open(fileobj=io.BytesIO(archive)) as tar:
+        tar.extractall(dest)
+    return True
+
+
+def bench_pages(reruns=20):
+    """
+    Average rerun time of each page (app.py under AppTest, so rendering is
+    included) before and after app.py stopped re-executing the page modules
+    with importlib on every rerun.
+
+    "before" is the source just before the commit that removed
+    spec.loader.exec_module from app.py, "after" that commit, "current" the
+    working tree. The old app.py creates an OpenAI client on import, so a
+    dummy key is set; no page calls the LLM on a plain rerun.
+    """
+    import tempfile
+    try:
+        import streamlit  # noqa: F401 - needed by every snippet
+    except ImportError:
+        print("pages: unavailable (streamlit not installed)")
+        return
+    found = subprocess.run(["git", "log", "-1", "--format=%H", "-S", "spec.loader.exec_module", "--", "src/app.py"],
+                           capture_output=True, text=True, cwd=BASE_DIR)
+    change = found.stdout.strip()
+
+    env = {**os.environ, "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY") or "sk-benchmark", "PERSONA_FAKE_LLM": "1"}
+    with tempfile.TemporaryDirectory() as tmp:
+        trees = {}
+        for label, rev in (("before", f"{change}^"), ("after", change)):
+            dest = os.path.join(tmp, label)
+            if change and _export_tree(rev, dest):
+                trees[label] = dest
+            else:
+                print(f"pages: {label} unavailable (needs git history)")
+        trees["current"] = BASE_DIR
+
+        for page in PAGES:
+            for label, root in trees.items():
+                code = _RERUN_SNIPPET.format(app=os.path.join(root, "src", "app.py"), page=page, reruns=reruns)
+                result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True,
+                                        cwd=root, env=env)
+                try:
+                    ms = float(result.stdout.strip().splitlines()[-1])
+                    print(f"{'pages: ' + page + ' rerun (' + label + ')':<40} {ms:>9.1f} ms")
+                except (ValueError, IndexError):
+                    print(f"{'pages: ' + page + ' rerun (' + label + ')':<40} failed")
+
+
+# Third-party packages first, then the app's own modules
+STARTUP_MODULES = [
+    "streamlit", "openai", "dotenv", "pandas", "matplotlib.pyplot",
+    "utils", "question_index", "background_jobs", "extract_preferences",
+    "interview", "generate_content", "analyze_chatbot",
+]
+
+_IMPORT_SNIPPET = """
+import sys, time
+sys.path.insert(0, {src!r})
+start = time.perf_counter()
+import {module}
+print((time.perf_counter() - start) * 1000)
+"""
+
+_RENDER_SNIPPET = """
+import os, sys, time
+sys.path.insert(0, os.path.dirname({app!r}))   # as `streamlit run` does
+from streamlit.testing.v1 import AppTest
+start = time.perf_counter()
+at = AppTest.from_file({app!r}, default_timeout=120)
+at.session_state["user_id"] = "default"
+at.session_state["page"] = {page!r}
+at.run()
+elapsed = (time.perf_counter() - start) * 1000
+# app.py shows page failures as st.error; an error page is not a render time
+failures = [e.value for e in at.exception] + [e.value for e in at.error]
+if failures:
+    sys.exit(f"page failed: {{failures[0]}}")
+print(elapsed)
+"""
+
+
+def _run_timed(code):
+    """Run a snippet in a fresh interpreter (cold imports); return its printed ms or None."""
+    result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=BASE_DIR)
+    if result.returncode != 0:
+        return None
+    try:
+        return float(result.stdout.strip().splitlines()[-1])
+    except (ValueError, IndexError):
+        return None
+
+
+def _fastest_timed(code, samples):
+    """
+    Fastest of several _run_timed runs; None if any failed.
+
+    Load on the machine only ever adds time, so the minimum is the most
+    repeatable number (a median still moves with background load).
+    """
+    times = [_run_timed(code) for _ in range(samples)]
+    if None in times:
+        return None
+    return min(times)
+
+
+def bench_startup(update_baseline=False, samples=5):
+    """
+    Cold import time per module and time to first render per page.
+
+    Every measurement is the fastest of `samples` fresh interpreters. Results
+    are compared with docs/startup_baseline.json (a missing baseline counts
+    as a failure); --update-baseline stores them as the new baseline.
+
+    Returns:
+        list: Names of measurements that regressed
+    """
+    results = {}
+    for module in STARTUP_MODULES:
+        results[f"import {module}"] = _fastest_timed(_IMPORT_SNIPPET.format(src=SRC_DIR, module=module), samples)
+    app_path = os.path.join(SRC_DIR, "app.py")
+    for page in PAGES:
+        results[f"first render {page}"] = _fastest_timed(_RENDER_SNIPPET.format(app=app_path, page=page), samples)
+
+    baseline = {}
+    regressions = []
+    if os.path.exists(STARTUP_BASELINE_FILE):
+        with open(STARTUP_BASELINE_FILE, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    elif not update_baseline:
+        # Without a baseline nothing could ever regress
+        print(f"startup: ⚠️ no baseline at {STARTUP_BASELINE_FILE}; run with --update-baseline")
+        regressions.append("baseline missing")
+
+    for name, ms in results.items():
+        if ms is None:
+            print(f"startup: {name:<38} unavailable (not installed or failed)")
+            if name in baseline:
+                # It worked when the baseline was taken
+                regressions.append(name)
+            continue
+        before = baseline.get(name)
+        note = ""
+        if before:
+            note = f"  baseline {before:>8.1f} ms"
+            if ms > before * REGRESSION_FACTOR and ms - before > REGRESSION_MIN_MS:
+                note += "  ⚠️ REGRESSION"
+                regressions.append(name)
+        print(f"startup: {name:<38} {ms:>9.1f} ms{note}")
+
+    if update_baseline:
+        from utils import write_json_atomic
+        write_json_atomic(STARTUP_BASELINE_FILE, {k: round(v, 1) for k, v in results.items() if v is not None})
+        print(f"Baseline written to {STARTUP_BASELINE_FILE}")
+    return regressions
+
+
+def bench_reruns(clicks=5):
+    """
+    Rerun cost per interaction on the AI Learning Profile tab.
+
+    Clicks each section's Edit and Cancel buttons (no file writes) and
+    compares the full app run (what every click cost before the sections
+    became fragments) with a section fragment's own run time (what a click
+    costs now). Timings come from the app's own instrumentation (fragments.py).
+    """
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("reruns: unavailable (streamlit not installed)")
+        return
+    from user_storage import DEFAULT_USER, extracted_prefs_file
+    if not os.path.exists(extracted_prefs_file(DEFAULT_USER)):
+        print("reruns: unavailable (generate a profile for the default user first)")
+        return
+    from profile_renderer import profile_layout
+
+    at = AppTest.from_file(os.path.join(SRC_DIR, "app.py"), default_timeout=120)
+    at.session_state["user_id"] = DEFAULT_USER
+    at.session_state["page"] = "profile"
+    at.session_state["selected_profile_tab"] = 1
+    at.run()
+    for _ in range(clicks):
+        for section in profile_layout():
+            at.button(key=f"edit_{section.name}_btn").click().run()
+            at.button(key=f"cancel_{section.name}").click().run()
+
+    for label, samples in sorted(at.session_state["rerun_timings"].items()):
+        if label in ("full run profile", "fragment render_profile_section"):
+            print(f"{'reruns: ' + label:<48} {sum(samples) / len(samples) * 1000:>9.2f} ms avg")
+
+
+def bench_feedback(days=200, messages_per_day=40, clicks=50):
+    """
+    Feedback chart aggregate: rescanning every message vs the per-day counters.
+
+    Builds a synthetic chat, clicks random 👍/👎 (including flips), then
+    checks the counters against a full recount, and that a corrupted
+    counters file is detected and rebuilt.
+
+    Returns:
+        list: Descriptions of inconsistencies (empty if none)
+    """
+    import random
+    import shutil
+    from datetime import date as day, timedelta
+    import chat_store
+    from shared_state import write_json
+    from user_storage import user_dir
+
+    user_id = f"bench-feedback-{os.getpid()}"
+    chat = {}
+    for d in range(days):
+        date = (day(2025, 1, 1) + timedelta(days=d)).isoformat()
+        chat[date] = [chat_store.new_message("user" if i % 2 == 0 else "assistant", f"message {i}")
+                      for i in range(messages_per_day)]
+    write_json(chat_store.chat_file("Bench", user_id), chat, indent=2)
+    chat_store.rebuild_feedback_counts("Bench", user_id)
+
+    rng = random.Random(7)
+    dates = list(chat)
+    start = time.perf_counter()
+    for _ in range(clicks):
+        date = rng.choice(dates)
+        chat_store.set_feedback("Bench", date, rng.randrange(1, messages_per_day, 2), rng.random() < 0.6,
+                                user_id=user_id)
+    _report("feedback: click (chat + counters)", clicks, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    for _ in range(20):
+        chat_store.count_feedback(chat_store.load_chat("Bench", user_id))
+    _report(f"feedback: rescan {days * messages_per_day} messages", 20, time.perf_counter() - start)
+    start = time.perf_counter()
+    for _ in range(20):
+        chat_store.feedback_counts("Bench", user_id)
+    _report(f"feedback: read {days} day counters", 20, time.perf_counter() - start)
+
+    failures = []
+    wrong = chat_store.check_feedback_counts("Bench", user_id)
+    if wrong:
+        failures.append(f"{len(wrong)} days disagree with a recount")
+    write_json(chat_store.feedback_counts_file("Bench", user_id), {dates[0]: {"thumbs_up": 999}})
+    if not chat_store.check_feedback_counts("Bench", user_id) or chat_store.check_feedback_counts("Bench", user_id):
+        failures.append("a corrupted counters file was not detected and rebuilt")
+    shutil.rmtree(user_dir(user_id), ignore_errors=True)
+
+    for failure in failures:
+        print(f"feedback: ⚠️ INCONSISTENT  {failure}")
+    if not failures:
+        print("feedback: counters match a full recount")
+    return failures
+
+
+def bench_analytics(rows=2_000_000):
+    """
+    Vectorized aggregations over the columnar chat export (analytics_store).
+
+    Uses a synthetic table (rows messages, 1000 users, 20 subjects, a year
+    of days) so no chat files are needed.
+    """
+    try:
+        import numpy as np
+        import pandas  # noqa: F401 - used by the aggregations
+    except ImportError:
+        print("analytics: unavailable (numpy/pandas not installed)")
+        return
+    import tempfile
+    import analytics_store as store
+
+    rng = np.random.default_rng(7)
+    day = rng.integers(20089, 20089 + 365, rows).astype(np.int32)
+    columns = {
+        "ts": day.astype(np.int64) * 86400 + rng.integers(0, 86400, rows),
+        "day": day,
+        "source": rng.integers(0, 20000, rows).astype(np.int32),
+        "user": rng.integers(0, 1000, rows).astype(np.int32),
+        "subject": rng.integers(0, 20, rows).astype(np.int32),
+        "role": (np.arange(rows) % 2).astype(np.int8),
+        "length": rng.integers(10, 2000, rows).astype(np.int32),
+        "thumbs_up": (rng.random(rows) < 0.3).astype(np.int8),
+        "thumbs_down": (rng.random(rows) < 0.1).astype(np.int8),
+    }
+    table = store.MessageTable(columns, [f"user{i}" for i in range(1000)],
+                               [f"subject{i}" for i in range(20)], [f"s{i}" for i in range(20000)])
+
+    for name, run in (
+        ("per day", lambda: store.per_day(table)),
+        ("per subject", lambda: store.per_subject(table)),
+        ("per hour", lambda: store.per_hour(table)),
+        ("one user, per day", lambda: store.per_day(table, store.select(table, user="user7"))),
+    ):
+        start = time.perf_counter()
+        run()
+        _report(f"analytics: {name}", rows, time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "messages.npz")
+        start = time.perf_counter()
+        store.save_table(table, path)
+        store.load_table(path)
+        _report("analytics: save + load table", rows, time.perf_counter() - start)
+
+
+def _reference_sessions(messages, gap_minutes, reading_minutes):
+    """Plain-Python sessionization of one day, to check the vectorized one against."""
+    from study_sessions import epoch_seconds
+    times = sorted(epoch_seconds(m["timestamp"]) for m in messages)
+    lengths = []
+    for previous, current in zip([None] + times, times):
+        if previous is None or current - previous > gap_minutes * 60:
+            lengths.append([current, current])
+        lengths[-1][1] = current
+    lengths = [end - start + reading_minutes * 60 for start, end in lengths]
+    return {"active_minutes": round(sum(lengths) / 60), "sessions": len(lengths),
+            "longest_session_minutes": round(max(lengths) / 60)}
+
+
+def bench_sessions(subjects=5, days=365, messages_per_day=40):
+    """
+    Study time from message timestamps (study_sessions) over a synthetic
+    year of chats: the vectorized pass vs a plain-Python loop per day.
+
+    Returns:
+        list: Days where the two disagree (empty if none)
+    """
+    try:
+        import numpy  # noqa: F401 - used by study_sessions
+    except ImportError:
+        print("sessions: unavailable (numpy not installed)")
+        return []
+    import random
+    from datetime import datetime, timedelta
+    from study_sessions import READING_MINUTES, SESSION_GAP_MINUTES, sessions_by_chat
+
+    rng = random.Random(7)
+    chats = {}
+    for subject in range(subjects):
+        chat = chats[f"subject{subject}"] = {}
+        for d in range(days):
+            moment = datetime(2025, 1, 1, 8) + timedelta(days=d, minutes=rng.randrange(600))
+            messages = []
+            for _ in range(messages_per_day):
+                # Mostly quick turns, sometimes a break longer than the session gap;
+                # sub-second parts like the ones datetime.now().isoformat() writes
+                moment += timedelta(seconds=rng.choice([20, 60, 180, 600, 2400, 5400]),
+                                    microseconds=rng.randrange(1_000_000))
+                messages.append({"role": "user", "content": "", "timestamp": moment.isoformat()})
+            rng.shuffle(messages)     # order in the file must not matter
+            chat[moment.date().isoformat()] = messages
+    count = subjects * days * messages_per_day
+
+    start = time.perf_counter()
+    vectorized = sessions_by_chat(chats)
+    _report("sessions: vectorized, whole history", count, time.perf_counter() - start)
+
+    start = time.perf_counter()
+    reference = {subject: {date: _reference_sessions(messages, SESSION_GAP_MINUTES, READING_MINUTES)
+                           for date, messages in chat.items()}
+                 for subject, chat in chats.items()}
+    _report("sessions: python loop per day", count, time.perf_counter() - start)
+
+    failures = [f"{subject} {date}: {stats} != {reference[subject][date]}"
+                for subject, days_stats in vectorized.items()
+                for date, stats in days_stats.items() if stats != reference[subject][date]]
+    edge = sessions_by_chat({"edge": {
+        "2026-01-01": [{"timestamp": "2026-01-01T10:00:00"}],
+        "2026-01-02": [{"timestamp": "2026-01-02T10:00:00"}, {"timestamp": "2026-01-02T10:30:00"},
+                       {"timestamp": "not a time"}],
+        "2026-01-03": [],
+    }})["edge"]
+    if edge != {"2026-01-01": {"active_minutes": READING_MINUTES, "sessions": 1,
+                               "longest_session_minutes": READING_MINUTES},
+                "2026-01-02": {"active_minutes": 30 + READING_MINUTES, "sessions": 1,
+                               "longest_session_minutes": 30 + READING_MINUTES}}:
+        failures.append(f"edge cases: {edge}")
+
+    for failure in failures[:10]:
+        print(f"sessions: ⚠️ MISMATCH  {failure}")
+    if not failures:
+        print("sessions: vectorized results match the reference")
+    return failures
+
+
+def bench_incremental(messages=300, new_messages=6):
+    """
+    Incremental study analysis (offline, with the fake LLM): prompt size of
+    re-analyzing a grown day in full vs sending the previous analysis plus
+    the new messages.
+
+    Checks that an unchanged day is served from the cache, a grown day is
+    updated incrementally, the progress entry carries the watermark, and
+    an edited earlier message forces a full analysis.
+
+    Returns:
+        list: Descriptions of the failed checks (empty if none)
+    """
+    import shutil
+    os.environ["PERSONA_FAKE_LLM"] = "1"   # before the first client is created
+    import chat_store
+    import study_analysis as sa
+    from shared_state import write_json
+    from study_sessions import day_sessions
+    from user_storage import user_dir
+    from utils import estimate_tokens
+
+    user_id = f"bench-incremental-{os.getpid()}"
+    date = "2026-01-15"
+
+    def turn(i):
+        role = "user" if i % 2 == 0 else "assistant"
+        content = (f"Question {i}: how does a confidence interval change with the sample size?" if role == "user"
+                   else f"Answer {i}: " + "With a larger sample the standard error shrinks, so the interval narrows. " * 4)
+        return {**chat_store.new_message(role, content), "timestamp": f"{date}T10:{i // 60 % 60:02d}:{i % 60:02d}"}
+
+    chat = {date: [turn(i) for i in range(messages)]}
+    write_json(chat_store.chat_file("Bench", user_id), chat)
+    failures = []
+
+    _, _, mode = sa.analyze_day_cached("Bench", chat, date, user_id)
+    _, _, again = sa.analyze_day_cached("Bench", chat, date, user_id)
+    if (mode, again) != ("full", "cached"):
+        failures.append(f"first run {mode}, second run {again} (expected full, cached)")
+
+    previous = sa.compact_state(sa._cache_entry("Bench", date, user_id)["analysis"])
+    chat[date] += [turn(messages + i) for i in range(new_messages)]
+    sessions = day_sessions(chat[date])
+    full_tokens = estimate_tokens(sa.build_analysis_prompt(date, sa.build_chat_text(chat, date), sessions))
+    new_text = sa.build_chat_text({date: chat[date][messages:]}, date)
+    update_tokens = estimate_tokens(sa.build_update_prompt(date, previous, new_text, sessions))
+    print(f"{'incremental: full re-analysis prompt':<40} {full_tokens:>8} tokens  ({messages + new_messages} messages)")
+    print(f"{'incremental: update prompt':<40} {update_tokens:>8} tokens  ({new_messages} new messages)")
+
+    _, _, mode = sa.analyze_day_cached("Bench", chat, date, user_id)
+    if mode != "incremental":
+        failures.append(f"grown day analyzed {mode}, expected incremental")
+    entry = sa.load_progress("Bench", user_id).get(date, {})
+    if entry.get("Analyzed messages") != messages + new_messages or not entry.get("Summary"):
+        failures.append(f"progress entry lacks the watermark or summary: {entry}")
+
+    chat[date][0] = {**chat[date][0], "content": "edited"}
+    _, _, mode = sa.analyze_day_cached("Bench", chat, date, user_id)
+    if mode != "full":
+        failures.append(f"edited day analyzed {mode}, expected full")
+    shutil.rmtree(user_dir(user_id), ignore_errors=True)
+
+    for failure in failures:
+        print(f"incremental: ⚠️ FAILED  {failure}")
+    if not failures:
+        print(f"incremental: update prompt is {update_tokens / full_tokens:.0%} of a full re-analysis")
+    return failures
+
+
+def bench_api():
+    """
+    Smoke test of every HTTP endpoint (api_server) through FastAPI's
+    TestClient, offline with the fake LLM: chat (plain and streamed),
+    feedback, profile extraction and section edits, analyses and sessions.
+
+    Returns:
+        list: Endpoints that answered with an unexpected status or payload
+    """
+    try:
+        from fastapi.testclient import TestClient
+    except ImportError:
+        print("api: unavailable (fastapi not installed)")
+        return []
+    import shutil
+    os.environ["PERSONA_FAKE_LLM"] = "1"   # before the first client is created
+    import api_server
+    from user_storage import user_dir
+
+    user_id = f"bench-api-{os.getpid()}"
+    base = f"/users/{user_id}"
+    client = TestClient(api_server.app)
+    failures = []
+
+    def call(method, path, expected_status=200, check=None, **kwargs):
+        start = time.perf_counter()
+        response = client.request(method, base + path if path.startswith("/") else path, **kwargs)
+        seconds = time.perf_counter() - start
+        ok = response.status_code == expected_status
+        try:
+            body = response.json()
+        except ValueError:
+            body = response.text
+        if ok and check is not None and not check(body):
+            ok = False
+        label = f"{method} {path}"
+        print(f"{'api: ' + label:<60} {response.status_code}  {seconds * 1000:>7.1f} ms{'' if ok else '  ⚠️ FAILED'}")
+        if not ok:
+            failures.append(f"{label}: {response.status_code} {str(body)[:200]}")
+        return body
+
+    date = "2026-01-15"
+    call("GET", "health", check=lambda b: b == {"status": "ok"})
+    call("GET", "/profile", expected_status=404)
+    profile = call("POST", "/profile/extract", json={"responses": sample_responses(), "use_cache": False},
+                   check=lambda b: isinstance(b.get("learning_profile"), dict) and b["learning_profile"].get("summary"))
+    call("GET", "/profile", check=lambda b: b == profile)
+    background = (profile.get("learning_profile") or {}).get("background", {})
+    call("PUT", "/profile/background", json={"value": {**background, "semester": "6th"}},
+         check=lambda b: b["learning_profile"]["background"]["semester"] == 6)
+    call("PUT", "/profile/background", expected_status=422, json={"value": "not a section"})
+    call("PUT", "/profile/nonexistent", expected_status=404, json={"value": {}})
+
+    reply = call("POST", "/chat/Statistics/messages", json={"message": "What is a p-value?", "date": date},
+                 check=lambda b: b["message"]["role"] == "assistant" and b["message"]["content"])
+    response = client.post(f"{base}/chat/Statistics/messages",
+                           json={"message": "And a confidence interval?", "date": date, "stream": True})
+    streamed = response.text
+    print(f"{'api: POST /chat/Statistics/messages (stream)':<60} {response.status_code}")
+    if response.status_code != 200 or not streamed:
+        failures.append(f"streamed message: {response.status_code} {streamed[:200]!r}")
+    chat = call("GET", "/chat/Statistics", check=lambda b: len(b.get(date, [])) == 4)
+    if chat.get(date) and chat[date][-1]["content"] != streamed:
+        failures.append("streamed reply was not stored as sent")
+    call("POST", "/chat/Statistics/feedback", json={"date": date, "index": reply["index"], "thumbs_up": True},
+         check=lambda b: b["message"]["feedback"]["thumbs_up"] == 1)
+    call("POST", "/chat/Statistics/feedback", expected_status=404, json={"date": date, "index": 0, "thumbs_up": True})
+    call("GET", "/chat/.hidden", expected_status=400)
+
+    call("POST", f"/analysis/Statistics/{date}", check=lambda b: b["mode"] == "full" and b["analysis"]["summary"])
+    call("POST", f"/analysis/Statistics/{date}", check=lambda b: b["mode"] == "cached")
+    call("POST", "/analysis/Statistics", check=lambda b: b == {"results": []})
+    call("POST", "/analysis/Statistics/2020-01-01", expected_status=422)
+    call("GET", "/sessions", check=lambda b: b["Statistics"][date]["sessions"] >= 1)
+    shutil.rmtree(user_dir(user_id), ignore_errors=True)
+
+    for failure in failures:
+        print(f"api: ⚠️ {failure}")
+    if not failures:
+        print("api: every endpoint answered as expected")
+    return failures
+
+
+def _replica_worker(args):
+    """One app replica: append chat messages, rate them and save progress entries."""
+    replica, writes, user_id, date = args
+    import chat_store
+    import study_analysis
+    for i in range(writes):
+        message = chat_store.new_message("assistant", f"replica {replica} message {i}")
+        index = chat_store.append_message("Replicas", message, date=date, user_id=user_id)
+        chat_store.set_feedback("Replicas", date, index, True, user_id=user_id)
+        study_analysis.save_progress("Replicas", f"{replica}-{i}", {"Mood": "ok"}, user_id=user_id)
+
+
+def bench_replicas(replicas=4, writes=50):
+    """
+    Acceptance check for running several app replicas on one data directory.
+
+    Starts `replicas` processes that write concurrently to the same user's
+    chat and progress files, then checks that no update was lost (every
+    message present and rated, every progress entry present) and that the
+    chat's version counter counted every write.
+
+    Returns:
+        list: Descriptions of the lost updates (empty if none)
+    """
+    import multiprocessing
+    import shutil
+    import chat_store
+    import study_analysis
+    from shared_state import version
+    from user_storage import user_dir
+
+    user_id = f"bench-replicas-{os.getpid()}"
+    date = "2026-01-01"
+    start = time.perf_counter()
+    with multiprocessing.get_context("spawn").Pool(replicas) as pool:
+        pool.map(_replica_worker, [(r, writes, user_id, date) for r in range(replicas)])
+    seconds = time.perf_counter() - start
+
+    messages = chat_store.load_chat("Replicas", user_id).get(date, [])
+    expected = {f"replica {r} message {i}" for r in range(replicas) for i in range(writes)}
+    failures = []
+    if {m["content"] for m in messages} != expected or len(messages) != len(expected):
+        failures.append(f"chat: {len(messages)} of {len(expected)} messages")
+    unrated = sum(1 for m in messages if m["feedback"].get("thumbs_up") != 1)
+    if unrated:
+        failures.append(f"feedback: {unrated} ratings lost")
+    progress = study_analysis.load_progress("Replicas", user_id)
+    if len(progress) != len(expected):
+        failures.append(f"progress: {len(progress)} of {len(expected)} entries")
+    chat_version = version(chat_store.chat_file("Replicas", user_id))
+    if chat_version != 2 * len(expected):
+        failures.append(f"version: {chat_version}, expected {2 * len(expected)}")
+    shutil.rmtree(user_dir(user_id), ignore_errors=True)
+
+    _report(f"replicas: {replicas} x {writes * 3} writes", replicas * writes * 3, seconds)
+    for failure in failures:
+        print(f"replicas: ⚠️ LOST UPDATES  {failure}")
+    if not failures:
+        print(f"replicas: no lost updates ({len(expected)} messages, version {chat_version})")
+    return failures
+
+
+BENCHMARKS = {
+    "validator": bench_validator,
+    "prompt": bench_prompt,
+    "typing": bench_typing,
+    "pages": bench_pages,
+    "startup": bench_startup,
+    "reruns": bench_reruns,
+    "replicas": bench_replicas,
+    "feedback": bench_feedback,
+    "analytics": bench_analytics,
+    "sessions": bench_sessions,
+    "incremental": bench_incremental,
+    "api": bench_api,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Persona AI micro-benchmarks")
+    parser.add_argument("name", choices=sorted(BENCHMARKS) + ["all"], help="Benchmark to run")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="startup: store the results as the new baseline")
+    args = parser.parse_args()
+
+    names = sorted(BENCHMARKS) if args.name == "all" else [args.name]
+    regressions = []
+    for name in names:
+        if name == "startup":
+            regressions += bench_startup(update_baseline=args.update_baseline)
+        elif name in ("replicas", "feedback", "sessions", "incremental", "api"):
+            regressions += BENCHMARKS[name]()
+        else:
+            BENCHMARKS[name]()
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+chat_store.py - Chat History, Profile Loading and Replies (no Streamlit)
+
+The chat logic shared by the Streamlit chat page (generate_content.py) and
+the HTTP service (api_server.py):
+
+    - per-user, per-subject chat files (one list of messages per day)
+    - thumbs up/down feedback on assistant messages, with per-day counters
+      kept up to date on every click (feedback_counts)
+    - the personalized system prompt and the LLM reply, whole or streamed
+
+Writes to one chat file go through shared_state, which serializes them
+across threads and processes and bumps the file's version counter, so
+concurrent requests and app replicas do not lose messages and can tell when
+a cached chat is stale (chat_version).
+
+Usage:
+    from chat_store import load_chat, append_message, generate_reply
+
+Last updated: January 2026
+"""
+
+import json
+import os
+from datetime import datetime
+
+from shared_state import locked, read_json, update_json, version, write_json
+from utils import get_openai_client, safe_json_loads
+from user_storage import chat_dir, extracted_prefs_file, feedback_counts_dir, responses_file
+
+MODEL = "gpt-4o-mini"
+SUBJECTS_KEY = "SECTION 1 — Personal Background-1"
+FEEDBACK_KEYS = ("thumbs_up", "thumbs_down")
+
+
+# ============================================================
+# PROFILE / SUBJECTS
+# ============================================================
+
+def read_user_profile(user_id=None):
+    """
+    Return the user's extracted profile, or None if there is none yet.
+
+    Raises:
+        json.JSONDecodeError if the file is corrupted
+    """
+    path = extracted_prefs_file(user_id)
+    if not os.path.exists(path) or os.path.getsize(path) == 0:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        content = f.read()
+    return safe_json_loads(content) if content.strip() else None
+
+
+def read_subjects(user_id=None):
+    """Subjects the user named in the interview; ["general"] if none."""
+    path = responses_file(user_id)
+    if not os.path.exists(path):
+        return ["general"]
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    topics = data.get(SUBJECTS_KEY, "")
+    return [t.strip() for t in topics.split(",")] if topics else ["general"]
+
+
+# ============================================================
+# CHAT FILES
+# ============================================================
+
+def is_valid_subject(subject):
+    """Subjects become file names, so they must not contain path parts."""
+    return bool(subject) and subject.strip() == subject and not subject.startswith(".") \
+        and "/" not in subject and "\\" not in subject
+
+
+def chat_file(subject, user_id=None):
+    return os.path.join(chat_dir(user_id), f"{subject}.json")
+
+
+def load_chat(subject, user_id=None):
+    """Return {date: [messages]} for a subject ({} if there is no chat yet)."""
+    path = chat_file(subject, user_id)
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return {}
+
+
+def chat_version(subject, user_id=None):
+    """Counter bumped by every write to the subject's chat (by any process)."""
+    return version(chat_file(subject, user_id))
+
+
+def _update_chat(subject, user_id, update):
+    """Read-modify-write one chat file under its lock; returns update's result."""
+    result, _ = update_json(chat_file(subject, user_id), update, default={})
+    return result
+
+
+def new_message(role, content):
+    return {
+        "role": role,
+        "content": content,
+        "timestamp": datetime.now().isoformat(),
+        "feedback": {"thumbs_up": 0, "thumbs_down": 0} if role == "assistant" else {},
+    }
+
+
+def append_message(subject, message, date=None, user_id=None):
+    """
+    Append a message to the day's chat.
+
+    Returns:
+        int: Index of the message within that day
+    """
+    date = date or datetime.now().strftime("%Y-%m-%d")
+
+    def update(data):
+        if date not in data:
+            _bump_counts(subject, user_id, data, date, {})    # new day: zero counters
+        data.setdefault(date, []).append(message)
+        return len(data[date]) - 1
+    return _update_chat(subject, user_id, update)
+
+
+def set_feedback(subject, date, msg_index, thumbs_up, user_id=None):
+    """
+    Record 👍 (thumbs_up=True) or 👎 on an assistant message.
+
+    Returns:
+        dict: The updated message
+
+    Raises:
+        IndexError if there is no assistant message at that position
+    """
+    def update(data):
+        messages = data.get(date, [])
+        if not 0 <= msg_index < len(messages) or messages[msg_index].get("role") != "assistant":
+            raise IndexError(f"No assistant message {msg_index} on {date}")
+        message = messages[msg_index]
+        old = message.get("feedback") or {}
+        new = {"thumbs_up": 1 if thumbs_up else 0, "thumbs_down": 0 if thumbs_up else 1}
+        delta = {k: new[k] - old.get(k, 0) for k in FEEDBACK_KEYS if new[k] != old.get(k, 0)}
+        if delta:
+            # Counters are updated while the chat lock is held, so they move
+            # in step with the messages (a flip is -1 on one side, +1 on the other)
+            _bump_counts(subject, user_id, data, date, delta)
+        message["feedback"] = new
+        return message
+    return _update_chat(subject, user_id, update)
+
+
+# ============================================================
+# FEEDBACK COUNTERS
+# ============================================================
+# {date: {"thumbs_up": n, "thumbs_down": n}} per subject, one entry per chat
+# day, so the feedback chart reads O(days) instead of every message.
+
+def feedback_counts_file(subject, user_id=None):
+    return os.path.join(feedback_counts_dir(user_id), f"{subject}.json")
+
+
+def count_feedback(chat):
+    """Counters computed from the raw chat history (the slow, authoritative way)."""
+    return {
+        date: {k: sum(m.get("feedback", {}).get(k, 0) for m in messages) for k in FEEDBACK_KEYS}
+        for date, messages in chat.items()
+        if isinstance(messages, list)
+    }
+
+
+def _bump_counts(subject, user_id, chat, date, delta):
+    """
+    Add delta to one day's counters. Called with the chat lock held and the
+    chat as it was *before* the change, which seeds a missing counters file.
+    """
+    path = feedback_counts_file(subject, user_id)
+    seed = {} if os.path.exists(path) else count_feedback(chat)
+
+    def update(counts):
+        day = counts.setdefault(date, {k: 0 for k in FEEDBACK_KEYS})
+        for k, amount in delta.items():
+            day[k] = day.get(k, 0) + amount
+    update_json(path, update, default=seed)
+
+
+def feedback_counts(subject, user_id=None):
+    """Per-day feedback counters of a subject (built from history the first time)."""
+    path = feedback_counts_file(subject, user_id)
+    if not os.path.exists(path):
+        return rebuild_feedback_counts(subject, user_id)
+    counts, _ = read_json(path, default={})
+    return counts
+
+
+def rebuild_feedback_counts(subject, user_id=None):
+    """Recount the subject's feedback from its chat history and store the counters."""
+    with locked(chat_file(subject, user_id)):
+        counts = count_feedback(load_chat(subject, user_id))
+        write_json(feedback_counts_file(subject, user_id), counts, indent=2)
+    return counts
+
+
+def check_feedback_counts(subject, user_id=None, repair=True):
+    """
+    Compare the stored counters with a recount of the chat history.
+
+    Args:
+        repair: Rebuild the counters when they disagree
+
+    Returns:
+        list: Dates whose counters were wrong (empty if consistent)
+    """
+    zero = {k: 0 for k in FEEDBACK_KEYS}
+    with locked(chat_file(subject, user_id)):
+        expected = count_feedback(load_chat(subject, user_id))
+        stored, _ = read_json(feedback_counts_file(subject, user_id), default={})
+        wrong = sorted(
+            date for date in set(expected) | set(stored)
+            if expected.get(date, zero) != {k: stored.get(date, {}).get(k, 0) for k in FEEDBACK_KEYS}
+        )
+        if wrong and repair:
+            write_json(feedback_counts_file(subject, user_id), expected, indent=2)
+    return wrong
+
+
+# ============================================================
+# REPLIES
+# ============================================================
+
+def build_system_prompt(profile, subject):
+    return f"""
+        You are Persona AI, a personalized assistant.
+
+        Here is the user's profile data extracted from an interview:
+        {json.dumps(profile, indent=2)}
+
+        The topic we are dealing with is "{subject}".
+
+        Always use this information to tailor your responses.
+        Respond in a tone that the user prefers.
+        Generate the content according to their learning preferences.
+        """
+
+
+def _llm_messages(profile, subject, history):
+    """System prompt plus the day's messages (role and content only)."""
+    return [{"role": "system", "content": build_system_prompt(profile, subject)}] + [
+        {"role": m["role"], "content": m["content"]} for m in history if m.get("role") in ("user", "assistant")
+    ]
+
+
+def generate_reply(profile, subject, history):
+    """Return the assistant's reply to the conversation so far."""
+    response = get_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=_llm_messages(profile, subject, history),
+        temperature=0.7,
+    )
+    return response.choices[0].message.content
+
+
+def stream_reply(profile, subject, history):
+    """Yield the assistant's reply piece by piece as the model produces it."""
+    stream = get_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=_llm_messages(profile, subject, history),
+        temperature=0.7,
+        stream=True,
+    )
+    for chunk in stream:
+        if chunk.choices and chunk.choices[0].delta.content:
+            yield chunk.choices[0].delta.content
@@ -0,0 +1,307 @@
+"""
+deterministic_extractor.py - Rule-Based Extraction of Structured Answers
+
+Many profile fields come straight from structured interview answers:
+the A-vs-B comparison MCQs, the 0-10 rating sliders and questions like
+"For examples, you prefer: Multiple / One strong". These do not need an LLM.
+
+This module compiles the linked_questions metadata in preference_parameters.py
+against the interview questions (question_index) into a flat list of rules:
+
+    (schema section, field, response key, mapper)
+
+The rules and the other per-question tables are compiled once per version
+of the question index, so editing docs/interviewQuestions.json rebuilds
+them together with the index the interview navigates with. Applying the
+rules to a responses dict is a single loop and runs in microseconds. Only the fields that stay unresolved (free-text fields,
+conflicting or missing answers) are left for the LLM.
+
+Usage:
+    from deterministic_extractor import extract_structured_fields, llm_responses
+
+    resolved, unresolved = extract_structured_fields(responses)
+
+Last updated: January 2026
+"""
+
+import re
+from functools import lru_cache
+
+from preference_parameters import FIELDS_BY_SECTION
+from question_index import get_question_index
+
+STRUCTURED_TYPES = ("mcq", "rating")
+
+_RANGE_HINT = re.compile(r"(\d+)\s*-\s*(\d+)\s*=\s*([\w-]+)")
+
+
+# ============================================================
+# QUESTION MATCHING
+# ============================================================
+
+def _section_number(section_name):
+    """'SECTION 4 — Comparison ...' and 'Section 4 – Comparison' both give 4."""
+    match = re.search(r"\d+", section_name)
+    return int(match.group()) if match else None
+
+
+def _normalize_question(text):
+    """
+    Reduce a linked question to a prefix that matches the real question text.
+
+    Linked questions are often shortened with "..." or annotated with a
+    trailing "(A vs B)" note, so both are stripped.
+    """
+    text = text.strip().rstrip(".…").strip()
+    text = re.sub(r"\s*\([^()]*\)$", "", text)
+    return text.lower()
+
+
+def find_response_keys(index, linked):
+    """
+    Find the response keys ("<section>-<index>") a linked question refers to.
+
+    Args:
+        index: QuestionIndex from question_index
+
+    Returns:
+        list of (response_key, question dict) tuples
+    """
+    wanted_section = _section_number(linked.get("section", ""))
+    wanted_text = _normalize_question(linked.get("question", ""))
+    matches = []
+
+    for s, section_name in enumerate(index.sections):
+        if _section_number(section_name) != wanted_section:
+            continue
+        for idx, q in enumerate(index.section_questions(s)):
+            if q.get("question", "").strip().lower().startswith(wanted_text):
+                matches.append((index.response_key(s, idx), q))
+    return matches
+
+
+# ============================================================
+# MAPPERS
+# ============================================================
+
+def _parse_range_hint(hint):
+    """'0-3 = explorer, 4-6 = balanced' -> [(0, 3, 'explorer'), (4, 6, 'balanced')]"""
+    return [(int(lo), int(hi), value) for lo, hi, value in _RANGE_HINT.findall(hint or "")]
+
+
+def _option_mapper(value_map):
+    # Longest prefix first, so "One strong" wins over a shorter overlapping key
+    prefixes = sorted(value_map.items(), key=lambda kv: len(kv[0]), reverse=True)
+
+    def mapper(answer):
+        if not isinstance(answer, str):
+            return None
+        for prefix, value in prefixes:
+            if answer.startswith(prefix):
+                return value
+        return None
+    return mapper
+
+
+def _range_mapper(ranges):
+    def mapper(answer):
+        if not isinstance(answer, (int, float)) or isinstance(answer, bool):
+            return None
+        for lo, hi, value in ranges:
+            if lo <= answer <= hi:
+                return value
+        return None
+    return mapper
+
+
+def _scale_mapper(answer):
+    if not isinstance(answer, (int, float)) or isinstance(answer, bool):
+        return None
+    return max(1, min(10, int(round(answer))))
+
+
+def _build_mapper(field_spec, linked, question):
+    """Pick the mapper for one (field, structured question) pair, or None."""
+    if question["type"] == "mcq" and linked.get("value_map"):
+        return _option_mapper(linked["value_map"])
+
+    if question["type"] == "rating":
+        ranges = _parse_range_hint(linked.get("extraction_hint"))
+        if ranges:
+            return _range_mapper(ranges)
+        # A rating on a scale field is a direct reading unless a hint says otherwise
+        if field_spec.get("type") == "scale" and not linked.get("extraction_hint"):
+            return _scale_mapper
+    return None
+
+
+# ============================================================
+# COMPILED RULES
+# ============================================================
+
+# Each table is cached per QuestionIndex object; question_index hands out a
+# new one when the questions file changes, which rebuilds the tables.
+
+def compile_rules():
+    """
+    Compile linked_questions + interview questions into a tuple of rules.
+
+    Returns:
+        tuple of (section, field, response_key, mapper)
+    """
+    return _compile_rules(get_question_index())
+
+
+@lru_cache(maxsize=1)
+def _compile_rules(index):
+    rules = []
+    for section, fields in FIELDS_BY_SECTION.items():
+        for field, spec in fields.items():
+            for linked in spec.get("linked_questions", []):
+                for response_key, question in find_response_keys(index, linked):
+                    if question.get("type") not in STRUCTURED_TYPES:
+                        continue
+                    mapper = _build_mapper(spec, linked, question)
+                    if mapper is not None:
+                        rules.append((section, field, response_key, mapper))
+    return tuple(rules)
+
+
+def question_types():
+    """Map every response key to its question type ("text", "mcq", "rating")."""
+    return _question_types(get_question_index())
+
+
+@lru_cache(maxsize=1)
+def _question_types(index):
+    return {key: index.questions[i].get("type", "text") for key, i in index.keys.items()}
+
+
+def field_links():
+    """
+    Map every (section, field) to the response keys of all its linked questions.
+
+    Unlike compile_rules this includes free-text questions; it is used to send
+    only the relevant answers when a single field has to be re-extracted.
+    """
+    return _field_links(get_question_index())
+
+
+@lru_cache(maxsize=1)
+def _field_links(index):
+    links = {}
+    for section, fields in FIELDS_BY_SECTION.items():
+        for field, spec in fields.items():
+            keys = []
+            for linked in spec.get("linked_questions", []):
+                for response_key, _ in find_response_keys(index, linked):
+                    if response_key not in keys:
+                        keys.append(response_key)
+            links[(section, field)] = tuple(keys)
+    return links
+
+
+def question_fields():
+    """Map every response key to the (section, field) pairs it feeds."""
+    return _question_fields(get_question_index())
+
+
+@lru_cache(maxsize=1)
+def _question_fields(index):
+    mapping = {}
+    for field_id, keys in _field_links(index).items():
+        for key in keys:
+            mapping.setdefault(key, set()).add(field_id)
+    return {key: frozenset(fields) for key, fields in mapping.items()}
+
+
+def all_fields():
+    """Every (section, field) pair of the schema, in schema order."""
+    return [(section, field) for section, fields in FIELDS_BY_SECTION.items() for field in fields]
+
+
+# ============================================================
+# EXTRACTION
+# ============================================================
+
+def extract_structured_fields(responses):
+    """
+    Fill every field that structured answers determine unambiguously.
+
+    A field is resolved when at least one of its structured questions maps to
+    a value and all mapped answers agree. Conflicting answers leave the field
+    to the LLM.
+
+    Args:
+        responses: Dictionary of interview responses
+
+    Returns:
+        tuple: (resolved, unresolved)
+            resolved: {section: {field: value}}
+            unresolved: list of (section, field) still needing the LLM
+    """
+    candidates = {}
+    for section, field, response_key, mapper in compile_rules():
+        value = mapper(responses.get(response_key))
+        if value is not None:
+            candidates.setdefault((section, field), set()).add(value)
+
+    resolved = {}
+    for (section, field), values in candidates.items():
+        if len(values) == 1:
+            resolved.setdefault(section, {})[field] = next(iter(values))
+
+    unresolved = [
+        (section, field) for section, field in all_fields()
+        if field not in resolved.get(section, {})
+    ]
+    return resolved, unresolved
+
+
+def llm_responses(responses, resolved):
+    """
+    Keep only the answers the LLM still needs.
+
+    Free-text answers are always kept. A structured answer is dropped only
+    if every rule reading it belongs to a field that is already resolved.
+
+    Args:
+        responses: Dictionary of interview responses
+        resolved: First value returned by extract_structured_fields
+
+    Returns:
+        dict: Subset of responses for the LLM prompt
+    """
+    consumed = {}
+    for section, field, response_key, _ in compile_rules():
+        is_resolved = field in resolved.get(section, {})
+        consumed[response_key] = consumed.get(response_key, True) and is_resolved
+
+    types = question_types()
+    return {
+        k: v for k, v in responses.items()
+        if types.get(k, "text") == "text" or not consumed.get(k, False)
+    }
+
+
+def skippable_questions(responses):
+    """
+    Unanswered questions that can no longer change the profile.
+
+    A field counts as settled once extract_structured_fields resolves it from
+    the structured answers given so far (at least one mapped answer, no
+    conflicts). A question is skippable when every field it feeds is settled.
+    Questions that feed no field, or any free-text-only field, are always asked.
+
+    Args:
+        responses: Answers given so far
+
+    Returns:
+        set: Response keys that may be skipped
+    """
+    resolved, _ = extract_structured_fields(responses)
+    settled = {(section, field) for section, fields in resolved.items() for field in fields}
+    return {
+        key for key, fields in question_fields().items()
+        if key not in responses and fields <= settled
+    }
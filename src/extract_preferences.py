@@ -12,23 +12,30 @@ Usage:
 Last updated: December 2025
 """
 
-import streamlit as st
-import pandas as pd
 import json
 import os
-from openai import OpenAI
-from dotenv import load_dotenv
+import time
 
 from user_profile_schema import USER_PROFILE_SCHEMA
-from utils import extract_text, safe_json_loads, format_bool
+from preference_parameters import FIELDS_BY_SECTION
+from deterministic_extractor import extract_structured_fields, llm_responses, field_links, compile_rules, all_fields
+from json_repair import loads_with_repair
+from streaming_json import SectionStreamParser
+from profile_validator import validate_profile, build_response_format
+from prompt_templates import extraction_template
+from utils import extract_text, format_bool, estimate_tokens, load_env, get_openai_client
+from shared_state import write_json
+import extraction_cache
+from user_storage import current_user_id, responses_file, extracted_prefs_file
 
-load_dotenv()
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+load_env()
 
-# ----------------- Paths -----------------
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
-RESPONSES_FILE = os.path.join(BASE_DIR, "profiles", "interviewResponse.json")
-OUTPUT_FILE = os.path.join(BASE_DIR, "profiles", "extractedPreferences.json")
+# ----------------- Model / Prompt -----------------
+MODEL = "gpt-4o-mini"
+
+# "hybrid": structured answers are mapped locally, the LLM only sees free text
+# "full":   the original single prompt with every answer and every field
+EXTRACTION_MODE = os.getenv("EXTRACTION_MODE", "hybrid")
 
 
 # ============================================================
@@ -40,6 +47,7 @@ def show_progress_bar(label, value, max_value=10):
     Display a progress bar inline with label.
     Format: Label    [████████░░]  7/10
     """
+    import streamlit as st  # UI only; importing the extraction core must not load Streamlit
     if value is None or not isinstance(value, (int, float)):
         st.markdown(f"**{label}:** N/A")
         return
@@ -75,6 +83,8 @@ def create_styled_table(data_dict):
 
         rows.append({"": clean_key, " ": clean_value})
 
+    import pandas as pd  # only needed for the standalone table view
+
     df = pd.DataFrame(rows)
     return df
 
@@ -83,6 +93,7 @@ def display_table(data_dict):
     """
     Display a table with consistent styling.
     """
+    import streamlit as st
     df = create_styled_table(data_dict)
     if df is not None:
         st.dataframe(
@@ -97,6 +108,7 @@ def display_profile_tables(profile):
     Displays the extracted learning profile as nicely formatted tables.
     Updated for 37-field schema.
     """
+    import streamlit as st
     if "learning_profile" in profile:
         data = profile["learning_profile"]
     else:
@@ -209,239 +221,448 @@ def build_extraction_prompt(responses):
     """
     Builds a detailed prompt that helps the LLM extract preferences.
     Updated for 37-field schema with all extraction rules.
-    """
-    prompt = f"""You are an expert educational psychologist analyzing a student's interview responses to build their personalized learning profile.
 
-## YOUR TASK
-Carefully read all interview responses and extract the student's learning preferences into the JSON schema provided below. You must interpret open-ended answers intelligently and infer the best matching values.
-
-## TARGET SCHEMA
-```json
-{json.dumps(USER_PROFILE_SCHEMA, indent=2)}
-```
-
-## EXTRACTION RULES
-
-### SECTION 1: BACKGROUND (5 fields)
-Extract directly from interview responses:
-- **academic_program**: Student's degree/program
-- **semester**: Current semester number (integer)
-- **current_focus**: Current subjects they're studying
-- **goals**: Their academic goals for the semester
-- **age**: Student's age (optional, may be null)
-
-### SECTION 2: LEARNING PREFERENCES (14 fields)
+    The static text is precompiled once (see prompt_templates); only the
+    responses are serialized per call.
+    """
+    return extraction_template().render(responses)
 
-**explanation_preference:** 
-- "step-by-step" = wants detailed, sequential explanations
-- "high-level" = prefers overview/big picture first
-- "mixed" = depends on topic or wants both
 
-**examples_preference:**
-- "examples-first" = learns better seeing examples before theory
-- "theory-first" = wants concepts explained before examples
-- "mixed" = likes both approaches
+def _field_rule_text(field, spec):
+    """Render the extraction rule for one field from preference_parameters."""
+    if spec.get("value_meanings"):
+        lines = [f"**{field}:**"]
+        lines += [f'- "{value}" = {meaning}' for value, meaning in spec["value_meanings"].items()]
+        return "\n".join(lines)
+    if spec["type"] == "scale":
+        return f"**{field}:** Scale 1-10 - {spec['description']}"
+    if spec["type"] == "boolean":
+        return f"**{field}:** true, false or \"sometimes\" - {spec['description']}"
+    return f"**{field}:** {spec['type'].title()} - {spec['description']}"
 
-**example_type:**
-- "real-world" = practical, relatable scenarios
-- "mathematical" = formal, numerical examples
-- "code-based" = programming examples
-- "analogies" = metaphors and comparisons
-- "diagrams" = visual representations
-- "mixed" = multiple types depending on topic
 
-**example_quantity:**
-- "multiple" = prefers seeing several examples
-- "one-strong" = prefers one well-explained comprehensive example
+def build_partial_extraction_prompt(responses, unresolved, resolved):
+    """
+    Builds a reduced prompt for the fields the rule engine could not fill.
 
-**detail_level:** Scale 1-10 (1=brief, 10=very detailed)
+    Args:
+        responses: Only the answers the LLM still needs (see llm_responses)
+        unresolved: List of (section, field) pairs to extract
+        resolved: {section: {field: value}} already filled locally
 
-**guidance_preference:**
-- "structured" = wants clear guidance and direction
-- "independent" = prefers to explore on their own
-- "balanced" = mix of both
+    Returns:
+        str: The prompt text
+    """
+    schema_sections = USER_PROFILE_SCHEMA["learning_profile"]
+    target = {}
+    rules = []
+    for section, field in unresolved:
+        spec = schema_sections[section][field]
+        target.setdefault(section, {})[field] = " | ".join(spec) if isinstance(spec, list) else spec
+        rules.append(_field_rule_text(field, FIELDS_BY_SECTION[section][field]))
+    target["summary"] = "string"
 
-**focus_style:**
-- "explorer" = enjoys exploring tangents and related topics
-- "focused" = prefers staying on track with main objective
-- "balanced" = mix depending on context
+    rules_text = "\n\n".join(rules)
 
-**uses_analogies:** Boolean - whether analogies help them learn
+    # Compact JSON: indentation alone is a large share of the full prompt
 
-**presentation_style:**
-- "visual" = prefers diagrams, charts, visual aids
-- "verbal" = prefers text-based, written explanations
-- "mixed" = comfortable with both
+    prompt = f"""You are an expert educational psychologist analyzing a student's interview responses to build their personalized learning profile.
 
-**practice_problems:** Boolean - whether they want practice problems included
+## YOUR TASK
+Some profile fields were already filled from the student's multiple-choice and rating answers. Read the interview responses below and extract ONLY the fields in the target schema. You must interpret open-ended answers intelligently and infer the best matching values.
 
-**code_examples:**
-- "yes" = always wants code examples
-- "if-necessary" = only when relevant
-- "no" = prefers conceptual explanations
+## ALREADY DETERMINED (context only - do not return these)
+```json
+{json.dumps(resolved, ensure_ascii=False)}
+```
 
-**pacing:**
-- "fast" = quick pace, hit key points
-- "moderate" = balanced pace
-- "slow-thorough" = take time, ensure deep understanding
+## TARGET SCHEMA
+```json
+{json.dumps({"learning_profile": target}, ensure_ascii=False)}
+```
 
-**learner_type:**
-- "analytical" = breaks down problems logically, wants to understand 'why'
-- "intuitive" = grasps concepts quickly, comfortable with ambiguity
-- "example-driven" = learns best through concrete examples
-- "pattern-based" = looks for patterns and connections
-- "sequential" = prefers linear, step-by-step progression
+## EXTRACTION RULES
 
-**repetition_preference:**
-- "spaced-repetition" = review at intervals over time
-- "repeated-summaries" = multiple summaries in one session
-- "minimal-repetition" = understand once, move on
+{rules_text}
 
-### SECTION 3: COMMUNICATION STYLE (5 fields)
+### For SCALE fields (1-10):
+- Extract the number if explicitly given in the response
+- If described qualitatively, estimate appropriately:
+  - "very low/never/minimal" = 1-3
+  - "moderate/sometimes/average" = 4-6
+  - "high/often/very" = 7-9
+  - "extremely/always" = 10
 
-**tone:**
-- "formal" = academic, professional style
-- "conversational" = friendly, casual style
+### For the SUMMARY field:
+Write a 2-3 sentence paragraph that captures the student's overall learning personality, using both the responses and the already determined fields. Include their key strengths, preferences, and areas where they need support.
 
-**feedback_style:**
-- "supportive-gentle" = encouraging, soft corrections with praise
-- "supportive-direct" = kind but clear about what's wrong
-- "direct-critical" = straightforward, no sugarcoating
+## INTERVIEW RESPONSES TO ANALYZE
+```json
+{json.dumps(responses, indent=1, ensure_ascii=False)}
+```
 
-**response_depth:**
-- "quick" = brief, to-the-point answers
-- "detailed" = thorough, comprehensive explanations
+## IMPORTANT NOTES
+- If information for a field is not available, use "N/A" for strings, null for numbers, or your best educated guess based on other responses
+- Look for patterns across multiple answers that point to the same preference
 
-**question_engagement:** Boolean - whether AI should ask questions back
+## OUTPUT FORMAT
+Return ONLY valid JSON that matches the target schema structure. No markdown code fences, no explanations, just the JSON object.
+"""
+    return prompt
 
-**summaries_after_explanation:** Boolean - whether they want summaries after explanations
 
-### SECTION 4: EMOTIONAL PATTERNS (8 fields)
+def extraction_prompt_version():
+    """
+    Cache version of an extraction: the full template's version, extended
+    with the static text of the hybrid and field-repair prompts (rendered
+    with empty inputs), so editing any of them invalidates cached profiles.
+    """
+    skeletons = (
+        build_partial_extraction_prompt({}, [], {}),
+        build_field_repair_prompt({"learning_profile": {}}, [], {}, include_summary=True),
+    )
+    return f"{extraction_template(extra_texts=skeletons).version}-{EXTRACTION_MODE}"
 
-**stress_response:**
-- "push-through" = keeps working despite stress
-- "pause" = takes breaks to reset
-- "avoid" = tends to avoid stressful tasks
-- "depends" = varies by situation
 
-**overwhelm_support:**
-- "encouragement" = needs emotional support
-- "step-by-step" = needs tasks broken down
-- "break" = needs to step away
+def merge_resolved_fields(profile, resolved):
+    """Write locally resolved fields into an LLM profile (local values win)."""
+    data = profile.setdefault("learning_profile", {})
+    for section, fields in resolved.items():
+        if not isinstance(data.get(section), dict):
+            data[section] = {}
+        data[section].update(fields)
+    return profile
 
-**confidence_level:** Scale 1-10 (1=not confident, 10=very confident)
 
-**mood_sharing_comfort:** Scale 1-10 (1=very uncomfortable, 10=very comfortable sharing mood)
+def build_field_repair_prompt(profile, fields, responses, include_summary):
+    """
+    Builds a small follow-up prompt that re-extracts only invalid fields.
 
-**help_seeking_comfort:** Scale 1-10 (1=very uncomfortable, 10=very comfortable asking for help)
+    Args:
+        profile: Validated profile (valid fields are given as context)
+        fields: List of (section, field) pairs to extract again
+        responses: Full interview responses (only linked answers are sent)
+        include_summary: Whether the summary must be written again
 
-**motivation_drivers:** String - what motivates them (summarize in 1-2 sentences)
+    Returns:
+        str: The prompt text
+    """
+    schema_sections = USER_PROFILE_SCHEMA["learning_profile"]
+    links = field_links()
+    target = {}
+    rules = []
+    keys = []
+    for section, field in fields:
+        spec = schema_sections[section][field]
+        target.setdefault(section, {})[field] = " | ".join(spec) if isinstance(spec, list) else spec
+        rules.append(_field_rule_text(field, FIELDS_BY_SECTION[section][field]))
+        keys += [k for k in links.get((section, field), ()) if k not in keys]
+    if include_summary:
+        target["summary"] = "string - 2-3 sentences on the student's overall learning personality"
+
+    relevant = {k: responses[k] for k in keys if k in responses}
+    rules_text = "\n\n".join(rules)
+
+    return f"""You are completing a student's learning profile. The fields below still need values (not yet extracted, or invalid in a previous extraction). Fill ONLY these fields.
+
+## CURRENT PROFILE (context)
+```json
+{json.dumps(profile, ensure_ascii=False)}
+```
 
-**common_blockers:** String - what blocks their progress (summarize in 1-2 sentences)
+## FIELDS TO FILL
+```json
+{json.dumps({"learning_profile": target}, ensure_ascii=False)}
+```
 
-**learning_challenges:** String - specific challenges they face (summarize in 1-2 sentences)
+{rules_text}
 
-### SECTION 5: STUDY BEHAVIOR (5 fields)
+## RELEVANT INTERVIEW RESPONSES
+```json
+{json.dumps(relevant, indent=1, ensure_ascii=False)}
+```
 
-**study_rhythm:**
-- "regular" = consistent study throughout semester
-- "cramming" = intensive study near deadlines
-- "mixed" = combination of both
+## OUTPUT FORMAT
+Return ONLY valid JSON with the fields above, inside "learning_profile". No markdown code fences, no explanations.
+"""
 
-**focus_duration:** String - how long they can focus (e.g., "30-45 minutes", "1-2 hours")
 
-**attention_span:** Scale 1-10 (1=easily distracted, 10=very focused)
+def repair_invalid_fields(profile, invalid_fields, responses, original_prompt):
+    """
+    Re-extract only the invalid fields with a small follow-up request.
 
-**recovery_strategy:**
-- "short-break" = takes brief breaks
-- "task-switch" = changes to different task
-- "goal-review" = reminds themselves of goals
-- "external-reminder" = uses external prompts/tools
+    Args:
+        profile: Validated profile from validate_profile
+        invalid_fields: List of "section.field" (and/or "summary")
+        responses: Full interview responses
+        original_prompt: The extraction prompt a full retry would resend
 
-**mistake_handling:**
-- "immediate-fix" = wants to fix mistakes right away
-- "deferred" = moves on and revisits later
+    Returns:
+        tuple: (profile, still_invalid, stats)
+    """
+    fields = [tuple(name.split(".", 1)) for name in invalid_fields if name != "summary"]
+    include_summary = "summary" in invalid_fields
+    prompt = build_field_repair_prompt(profile, fields, responses, include_summary)
+
+    response = get_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format=build_response_format(fields, include_summary=include_summary),
+    )
+    patch, _ = loads_with_repair(extract_text(response))
+    patch = patch.get("learning_profile", patch) if isinstance(patch, dict) else {}
+
+    data = profile["learning_profile"]
+    for section, field in fields:
+        section_patch = patch.get(section)
+        if isinstance(section_patch, dict) and field in section_patch:
+            data[section][field] = section_patch[field]
+    if include_summary and patch.get("summary"):
+        data["summary"] = patch["summary"]
+
+    profile, still_invalid = validate_profile(profile)
+
+    repair_tokens = estimate_tokens(prompt)
+    stats = {
+        "fields_requested": len(invalid_fields),
+        "prompt_tokens_est": repair_tokens,
+        # A repair that needs the transcript can cost more than it saves
+        "tokens_saved_est": max(0, estimate_tokens(original_prompt) - repair_tokens),
+        "still_invalid": still_invalid,
+    }
+    return profile, still_invalid, stats
+
+
+def extract_fields(responses, fields, context=None):
+    """
+    Extract a subset of fields from the answers linked to them.
 
-### For SCALE fields (1-10):
-- Extract the number if explicitly given in the response
-- If described qualitatively, estimate appropriately:
-  - "very low/never/minimal" = 1-3
-  - "moderate/sometimes/average" = 4-6
-  - "high/often/very" = 7-9
-  - "extremely/always" = 10
+    Used for per-section staging while the interview is still running, so
+    the final extraction only has to reconcile what is left.
 
-### For the SUMMARY field:
-Write a 2-3 sentence paragraph that captures the student's overall learning personality. Include their key strengths, preferences, and areas where they need support.
+    Args:
+        responses: Interview responses answered so far
+        fields: List of (section, field) pairs to extract
+        context: Optional {section: {field: value}} already known
 
-## INTERVIEW RESPONSES TO ANALYZE
-```json
-{json.dumps(responses, indent=2)}
-```
+    Returns:
+        dict: {section: {field: value}} for the fields that came back valid
+    """
+    profile = {"learning_profile": context or {}}
+    prompt = build_field_repair_prompt(profile, fields, responses, include_summary=False)
+
+    response = get_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format=build_response_format(fields, include_summary=False),
+    )
+    patch, _ = loads_with_repair(extract_text(response))
+    validated, invalid = validate_profile(patch if isinstance(patch, dict) else {})
+
+    data = validated["learning_profile"]
+    extracted = {}
+    for section, field in fields:
+        if f"{section}.{field}" not in invalid:
+            extracted.setdefault(section, {})[field] = data[section][field]
+    return extracted
+
+
+def validated_section(section, value, resolved):
+    """Merge locally resolved fields into one streamed section and coerce it to the schema."""
+    if section == "summary":
+        return value
+    merged = dict(value) if isinstance(value, dict) else {}
+    merged.update(resolved.get(section, {}))
+    profile, _ = validate_profile({"learning_profile": {section: merged}})
+    return profile["learning_profile"][section]
+
+
+def stream_extraction(prompt, response_format, on_member):
+    """
+    Stream a completion and report each completed top-level profile member.
 
-## IMPORTANT NOTES
-- If information for a field is not available, use "N/A" for strings, null for numbers, or your best educated guess based on other responses
-- The situational questions (about planning a week, structuring study time, ideal environment) reveal a LOT about study behavior, attention span, and emotional patterns - analyze them carefully
-- Look for patterns across multiple answers that point to the same preference
-- The student's description of "good learning moments" vs "difficult moments" reveals their learning preferences
-- The comparison questions (A vs B) directly inform many categorical fields
-- Rating questions with 0-10 scales can be mapped directly to scale fields
+    Args:
+        prompt: Extraction prompt
+        response_format: Value for the response_format argument
+        on_member: Called with (name, value) as soon as a member is complete
 
-## OUTPUT FORMAT
-Return ONLY valid JSON that matches the schema structure. No markdown code fences, no explanations, just the JSON object.
-"""
-    return prompt
+    Returns:
+        str: The full completion text
+    """
+    parser = SectionStreamParser()
+    stream = get_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=[{"role": "user", "content": prompt}],
+        response_format=response_format,
+        stream=True,
+    )
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        for name, value in parser.feed(chunk.choices[0].delta.content or ""):
+            on_member(name, value)
+    return parser.text
 
 
 # ============================================================
 # CORE EXTRACTION FUNCTION (Can be imported silently)
 # ============================================================
 
-def extract_profile_silently(responses=None):
+def extract_profile_silently(responses=None, use_cache=True, user_id=extraction_cache.DEFAULT_USER,
+                             output_file=None, raise_errors=False, staged=None,
+                             on_section=None):
     """
     Core extraction function that can be called without Streamlit UI.
 
+    Results are cached by hash(responses, prompt version, MODEL), so calling
+    this again with unchanged responses returns instantly without an API call.
+
+    In "hybrid" mode the MCQ/rating answers are mapped locally by
+    deterministic_extractor and the LLM only receives the free-text answers
+    and the unresolved fields. Prompt size and latency are recorded in the
+    extraction history for comparison with "full" mode. Fields already
+    extracted section by section during the interview (staged) are treated
+    like locally resolved ones, so the final call only reconciles the rest.
+
     Args:
         responses: Dictionary of interview responses. If None, loads from file.
+        use_cache: If False, always call the API (the result is still cached).
+        user_id: Owner of the responses, the written profile and the history.
+        output_file: Where the extracted profile is written (default: the user's
+            extractedPreferences.json).
+        raise_errors: Re-raise exceptions instead of printing them (batch mode).
+        staged: Optional {section: {field: value}} from per-section extraction.
+        on_section: Optional callback (section, value). When given, the
+            completion is streamed and every section is reported as soon as
+            it is complete (sections filled entirely locally come first).
 
     Returns:
         Extracted profile dictionary, or None if failed
     """
     try:
+        start = time.perf_counter()
+        if output_file is None:
+            output_file = extracted_prefs_file(user_id)
         # Load responses if not provided
         if responses is None:
-            if not os.path.exists(RESPONSES_FILE):
+            if not os.path.exists(responses_file(user_id)):
                 return None
-            with open(RESPONSES_FILE, "r", encoding="utf-8") as f:
+            with open(responses_file(user_id), "r", encoding="utf-8") as f:
                 responses = json.load(f)
 
-        # Build the prompt
-        extraction_prompt = build_extraction_prompt(responses)
+        prompt_version = extraction_prompt_version()
+        cache_key = extraction_cache.make_cache_key(responses, prompt_version, MODEL)
 
-        # Call OpenAI API
-        response = client.chat.completions.create(
-            model="gpt-4o-mini",
-            messages=[{"role": "user", "content": extraction_prompt}]
-        )
+        # Serve unchanged responses from the cache
+        if use_cache:
+            cached = extraction_cache.get_cached_profile(cache_key)
+            if cached is not None:
+                write_json(output_file, cached)
+                extraction_cache.record_history(cache_key, prompt_version, MODEL, user_id)
+                return cached
 
-        # Extract text from response
-        ai_text = extract_text(response)
+        # Build the prompt
+        full_prompt = build_extraction_prompt(responses)
+        resolved = {}
+        unresolved = None
+        compile_rules()  # one-time compile, kept out of the per-call timing
+        rule_start = time.perf_counter()
+        if EXTRACTION_MODE == "hybrid":
+            resolved, unresolved = extract_structured_fields(responses)
+            rule_us = (time.perf_counter() - rule_start) * 1e6
+            fields_staged = 0
+            for section, fields in (staged or {}).items():
+                for field, value in fields.items():
+                    # Rule-engine values win over staged LLM values
+                    if (section, field) in unresolved:
+                        resolved.setdefault(section, {})[field] = value
+                        unresolved.remove((section, field))
+                        fields_staged += 1
+            extraction_prompt = build_partial_extraction_prompt(
+                llm_responses(responses, resolved), unresolved, resolved
+            )
+        else:
+            rule_us = 0.0
+            fields_staged = 0
+            extraction_prompt = full_prompt
+
+        # Call OpenAI API (structured output restricted to the fields we ask for)
+        first_section_seconds = None
+        llm_start = time.perf_counter()
+        if on_section:
+            def emit(section, value):
+                nonlocal first_section_seconds
+                if first_section_seconds is None:
+                    first_section_seconds = time.perf_counter() - start
+                on_section(section, validated_section(section, value, resolved))
+
+            # Sections the LLM will not return are complete already
+            pending = {section for section, _ in (unresolved if unresolved is not None else all_fields())}
+            for section in FIELDS_BY_SECTION:
+                if section not in pending:
+                    emit(section, {})
+
+            response = None
+            ai_text = stream_extraction(extraction_prompt, build_response_format(unresolved), emit)
+        else:
+            response = get_openai_client().chat.completions.create(
+                model=MODEL,
+                messages=[{"role": "user", "content": extraction_prompt}],
+                response_format=build_response_format(unresolved),
+            )
+            # Extract text from response
+            ai_text = extract_text(response)
+        llm_seconds = time.perf_counter() - llm_start
 
         if ai_text is None:
             return None
 
-        # Parse JSON
-        parsed = safe_json_loads(ai_text)
-
-        if parsed is None:
-            return None
-
+        # Parse JSON, repairing truncation / trailing commas / quotes locally
+        parsed, syntax_repaired = loads_with_repair(ai_text)
+        if not isinstance(parsed, dict):
+            parsed = {}
+
+        parsed = merge_resolved_fields(parsed, resolved)
+
+        # Normalize enums, clamp scales and collect what is still invalid
+        parsed, invalid_fields = validate_profile(parsed)
+
+        # Ask again for the invalid fields only, instead of a full retry
+        repair_stats = None
+        if invalid_fields:
+            parsed, invalid_fields, repair_stats = repair_invalid_fields(
+                parsed, invalid_fields, responses, extraction_prompt
+            )
+
+        stats = {
+            "mode": EXTRACTION_MODE,
+            "fields_resolved_locally": sum(len(f) for f in resolved.values()) - fields_staged,
+            "fields_staged": fields_staged,
+            "rule_engine_us": round(rule_us, 1),
+            "full_prompt_chars": len(full_prompt),
+            "full_prompt_tokens_est": estimate_tokens(full_prompt),
+            "prompt_chars": len(extraction_prompt),
+            "prompt_tokens_est": estimate_tokens(extraction_prompt),
+            "prompt_tokens": getattr(getattr(response, "usage", None), "prompt_tokens", None),
+            "llm_seconds": round(llm_seconds, 2),
+            "streamed": on_section is not None,
+            "first_section_seconds": round(first_section_seconds, 2) if first_section_seconds is not None else None,
+            "total_seconds": round(time.perf_counter() - start, 2),
+            "invalid_fields": invalid_fields,
+            "syntax_repaired": syntax_repaired,
+            "field_repair": repair_stats,
+        }
         # Save to file
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            json.dump(parsed, f, indent=4)
+        write_json(output_file, parsed)
+
+        extraction_cache.store_profile(cache_key, parsed, prompt_version, MODEL)
+        extraction_cache.record_history(cache_key, prompt_version, MODEL, user_id, stats=stats)
 
         return parsed
 
     except Exception as e:
+        if raise_errors:
+            raise
         print(f"Error in extraction: {str(e)}")
         return None
 
@@ -451,19 +672,21 @@ def extract_profile_silently(responses=None):
 # ============================================================
 
 def main():
+    import streamlit as st
     st.set_page_config(page_title="Preference Extraction", page_icon="🎯", layout="wide")
 
     st.title("🎯 Preference Extraction AI")
     st.markdown("*Transforming your interview responses into a personalized learning profile (37 fields)*")
 
     # --- Check if interview responses exist ---
-    if not os.path.exists(RESPONSES_FILE):
+    user_id = current_user_id()
+    if not os.path.exists(responses_file(user_id)):
         st.error("❌ No interview responses found!")
         st.info("Please complete the interview first. The system is looking for: `interviewResponse.json`")
         st.stop()
 
     # --- Load interview responses ---
-    with open(RESPONSES_FILE, "r", encoding="utf-8") as f:
+    with open(responses_file(user_id), "r", encoding="utf-8") as f:
         responses = json.load(f)
 
     # --- Show loaded responses in expandable section ---
@@ -478,7 +701,7 @@ def main():
         with st.spinner("🔍 Analyzing your responses... This may take a moment."):
 
             # Use the core extraction function
-            parsed = extract_profile_silently(responses)
+            parsed = extract_profile_silently(responses, user_id=user_id)
 
             if parsed is None:
                 st.error("❌ Could not parse AI response as JSON.")
@@ -497,7 +720,7 @@ def main():
             with st.expander("🔧 View Raw JSON", expanded=False):
                 st.json(parsed)
 
-            st.success(f"💾 Profile saved to `{OUTPUT_FILE}`")
+            st.success(f"💾 Profile saved to `{extracted_prefs_file(user_id)}`")
 
     # --- Footer ---
     st.markdown("---")
@@ -0,0 +1,200 @@
+"""
+extraction_cache.py - Content-Addressed Cache for Profile Extraction
+
+Every extraction result is stored under a key computed from:
+    hash(canonical interview responses, prompt template version, model)
+
+If the interview responses have not changed, regenerating the profile is
+a file read instead of a 10k-token LLM call. Each user also keeps a short
+history of past extractions so an earlier profile can be restored instantly.
+
+Usage:
+    from extraction_cache import make_cache_key, get_cached_profile, store_profile
+
+Layout (inside profiles/extraction_cache/, shared by all users):
+    entries/<ab>/<key>.json   - one cached extraction per key
+    stats.json                - hit/miss counters
+
+Each user's newest-first list of keys lives in their own namespace
+(user_storage.extraction_history_file).
+
+Last updated: January 2026
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+
+from shared_state import update_json, write_json
+from utils import write_json_atomic
+from user_storage import DEFAULT_USER, extraction_history_file
+
+# ----------------- Paths -----------------
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.path.join(BASE_DIR, "profiles", "extraction_cache")
+ENTRIES_DIR = os.path.join(CACHE_DIR, "entries")
+STATS_FILE = os.path.join(CACHE_DIR, "stats.json")
+
+MAX_HISTORY = 10
+
+
+# ============================================================
+# KEYS
+# ============================================================
+
+def canonical_json(data):
+    """Serialize data so that equal content always gives the same string."""
+    return json.dumps(data, sort_keys=True, separators=(",", ":"), ensure_ascii=False)
+
+
+def make_cache_key(responses, prompt_version, model):
+    """
+    Build the content address for one extraction.
+
+    Args:
+        responses: Dictionary of interview responses
+        prompt_version: Version string of the extraction prompt template
+        model: Model name used for extraction
+
+    Returns:
+        str: Hex SHA-256 digest
+    """
+    payload = "\n".join([canonical_json(responses), str(prompt_version), str(model)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _entry_path(key):
+    return os.path.join(ENTRIES_DIR, key[:2], f"{key}.json")
+
+
+def _history_path(user_id):
+    return extraction_history_file(user_id)
+
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return default
+
+
+# ============================================================
+# STATS
+# ============================================================
+
+def cache_stats():
+    """
+    Return the cache counters.
+
+    Returns:
+        dict: {"hits", "misses", "entries", "hit_rate"}
+    """
+    stats = _read_json(STATS_FILE, {})
+    hits = stats.get("hits", 0)
+    misses = stats.get("misses", 0)
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "entries": stats.get("entries", 0),
+        "hit_rate": hits / total if total else 0.0,
+    }
+
+
+def _bump_stat(name, amount=1):
+    def update(stats):
+        stats[name] = stats.get(name, 0) + amount
+    update_json(STATS_FILE, update, default={}, indent=4)
+
+
+# ============================================================
+# ENTRIES
+# ============================================================
+
+def get_cached_profile(key, count=True):
+    """
+    Look up a cached extraction.
+
+    Args:
+        key: Cache key from make_cache_key
+        count: Whether to record the lookup as a hit/miss
+
+    Returns:
+        dict: The cached profile, or None on a miss
+    """
+    entry = _read_json(_entry_path(key), None)
+    if count:
+        _bump_stat("hits" if entry else "misses")
+    if not entry:
+        return None
+    return entry.get("profile")
+
+
+def store_profile(key, profile, prompt_version, model):
+    """Store an extraction result under its cache key."""
+    path = _entry_path(key)
+    is_new = not os.path.exists(path)
+    write_json_atomic(path, {
+        "key": key,
+        "created_at": datetime.now().isoformat(),
+        "prompt_version": prompt_version,
+        "model": model,
+        "profile": profile,
+    })
+    if is_new:
+        _bump_stat("entries")
+
+
+# ============================================================
+# PER-USER HISTORY
+# ============================================================
+
+def load_history(user_id=DEFAULT_USER):
+    """Return the user's past extractions, newest first."""
+    return _read_json(_history_path(user_id), [])
+
+
+def record_history(key, prompt_version, model, user_id=DEFAULT_USER, stats=None):
+    """
+    Move key to the front of the user's history, keeping at most MAX_HISTORY.
+
+    Stats of a previous record for the same key are kept when none are given
+    (e.g. on a cache hit or a rollback).
+    """
+    def update(history):
+        previous = next((h for h in history if h.get("key") == key), {})
+        history[:] = [h for h in history if h.get("key") != key][:MAX_HISTORY - 1]
+        history.insert(0, {
+            "key": key,
+            "timestamp": datetime.now().isoformat(),
+            "prompt_version": prompt_version,
+            "model": model,
+            "stats": stats if stats is not None else previous.get("stats"),
+        })
+    update_json(_history_path(user_id), update, default=[], indent=4)
+
+
+def rollback(key, output_file, user_id=DEFAULT_USER):
+    """
+    Restore an earlier extraction as the user's active profile.
+
+    Args:
+        key: Cache key of the extraction to restore
+        output_file: Where the active profile lives (extractedPreferences.json)
+        user_id: Owner of the history
+
+    Returns:
+        dict: The restored profile, or None if the entry no longer exists
+    """
+    entry = _read_json(_entry_path(key), None)
+    if not entry:
+        return None
+
+    profile = entry["profile"]
+    write_json(output_file, profile)
+    record_history(key, entry.get("prompt_version"), entry.get("model"), user_id)
+    return profile
@@ -0,0 +1,159 @@
+"""
+fake_llm.py - Deterministic Offline Stand-In for the OpenAI Client
+
+Lets the app and the HTTP service run end to end without an API key or
+network access (local development, load tests, CI smoke runs). Enable it
+with an environment variable; utils.get_openai_client() then returns a
+FakeOpenAI instead of the real client:
+
+    PERSONA_FAKE_LLM=1 python src/api_server.py
+    PERSONA_FAKE_LLM=1 PERSONA_FAKE_LLM_DELAY=0.5 streamlit run src/app.py
+
+Only chat.completions.create is implemented, with the response shapes the
+code reads (choices[0].message.content, choices[0].delta.content when
+streaming, usage.prompt_tokens). Answers are filled from what the request
+asks for:
+
+    - response_format json_schema: every property of the schema (enums get
+      their first value, integers 5, booleans true, strings a placeholder)
+    - JSON templates in the prompt ({"key": "<description>", ...}): every key
+    - anything else: a short reply echoing the last user message
+
+PERSONA_FAKE_LLM_DELAY adds a fixed latency (seconds) per call.
+
+Last updated: January 2026
+"""
+
+import json
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from types import SimpleNamespace
+
+from utils import estimate_tokens
+
+STREAM_CHUNK_CHARS = 16
+
+_DATE = re.compile(r"\d{4}-\d{2}-\d{2}")
+_TEMPLATE_START = re.compile(r"\{\s*\n\s*\"")
+
+
+# ============================================================
+# ANSWER BUILDERS
+# ============================================================
+
+def _from_schema(schema, name="value"):
+    kind = schema.get("type")
+    types = kind if isinstance(kind, list) else [kind]
+    if "object" in types:
+        return {key: _from_schema(sub, key) for key, sub in schema.get("properties", {}).items()}
+    if schema.get("enum"):
+        return schema["enum"][0]
+    if "integer" in types or "number" in types:
+        return 5
+    if "boolean" in types:
+        return True
+    return f"Sample {name.replace('_', ' ')}"
+
+
+def _prompt_template(prompt):
+    """The first {"key": "<description>", ...} block of a prompt, or None."""
+    for match in _TEMPLATE_START.finditer(prompt):
+        depth = 0
+        for end in range(match.start(), len(prompt)):
+            depth += {"{": 1, "}": -1}.get(prompt[end], 0)
+            if depth == 0:
+                try:
+                    template = json.loads(prompt[match.start():end + 1])
+                except json.JSONDecodeError:
+                    break
+                if isinstance(template, dict):
+                    return template
+                break
+    return None
+
+
+def _fill_template(template, prompt):
+    dates = _DATE.findall(prompt)
+    answer = {}
+    for key, description in template.items():
+        description = str(description)
+        if "YYYY-MM-DD" in description:
+            answer[key] = dates[0] if dates else datetime.now().strftime("%Y-%m-%d")
+        elif "number" in description:
+            answer[key] = "7"
+        elif "minutes" in description:
+            answer[key] = "30 minutes"
+        else:
+            answer[key] = f"Sample {key.replace('_', ' ')}"
+    return answer
+
+
+def fake_answer(messages, response_format=None):
+    """The completion text for a request."""
+    prompt = "\n".join(str(m.get("content", "")) for m in messages)
+    if response_format and response_format.get("type") == "json_schema":
+        schema = response_format["json_schema"]["schema"]
+        return json.dumps(_from_schema(schema))
+
+    template = _prompt_template(prompt)
+    if template is not None:
+        return json.dumps(_fill_template(template, prompt), indent=2)
+    if response_format and response_format.get("type") == "json_object":
+        return "{}"
+
+    last_user = next((m.get("content", "") for m in reversed(messages) if m.get("role") == "user"), "")
+    return f"This is an offline reply to: {last_user}"
+
+
+# ============================================================
+# CLIENT
+# ============================================================
+
+class _Completions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model=None, messages=(), response_format=None, stream=False, **kwargs):
+        self._client.count_call()
+        if self._client.delay:
+            time.sleep(self._client.delay)
+        text = fake_answer(list(messages), response_format)
+        if stream:
+            return self._stream(text)
+
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        return SimpleNamespace(
+            model=model,
+            choices=[SimpleNamespace(message=SimpleNamespace(role="assistant", content=text),
+                                     finish_reason="stop")],
+            usage=SimpleNamespace(prompt_tokens=estimate_tokens(prompt),
+                                  completion_tokens=estimate_tokens(text)),
+        )
+
+    @staticmethod
+    def _stream(text):
+        for start in range(0, len(text), STREAM_CHUNK_CHARS):
+            piece = text[start:start + STREAM_CHUNK_CHARS]
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=piece),
+                                                           finish_reason=None)])
+
+
+class FakeOpenAI:
+    """Drop-in for openai.OpenAI as far as this project uses it."""
+
+    def __init__(self, delay=None):
+        self.delay = float(os.getenv("PERSONA_FAKE_LLM_DELAY", "0")) if delay is None else delay
+        self.calls = 0
+        self._lock = threading.Lock()
+        self.chat = SimpleNamespace(completions=_Completions(self))
+
+    def count_call(self):
+        with self._lock:
+            self.calls += 1
+
+
+def fake_llm_enabled():
+    return os.getenv("PERSONA_FAKE_LLM", "").lower() in ("1", "true", "yes")
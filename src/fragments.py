@@ -0,0 +1,77 @@
+"""
+fragments.py - Fragment Helpers and Rerun Timing
+
+Streamlit reruns the whole app script on every widget interaction. Parts
+of the UI that change on their own (a feedback button, one profile section
+editor) are wrapped in fragments instead: an interaction inside a fragment
+reruns only that fragment. State changes go through on_click callbacks, so
+no st.rerun() (which would rerun the whole app) is needed.
+
+Every full run and every fragment run is timed, so the cost per interaction
+can be compared before and after (see the "⏱ Rerun Timings" sidebar
+expander, or the "fragments" logger at DEBUG level).
+
+Usage:
+    from fragments import timed_fragment, set_state
+
+    @timed_fragment
+    def render_section(...):
+        st.button("Edit", on_click=set_state, args=("edit_background", True))
+
+Last updated: January 2026
+"""
+
+import functools
+import logging
+import time
+
+import streamlit as st
+
+MAX_TIMINGS = 50
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================
+# TIMING
+# ============================================================
+
+def record_timing(label, seconds):
+    """Keep the last MAX_TIMINGS durations per label in the session."""
+    timings = st.session_state.setdefault("rerun_timings", {})
+    samples = timings.setdefault(label, [])
+    samples.append(seconds)
+    del samples[:-MAX_TIMINGS]
+    logger.debug("[rerun] %s: %.1f ms", label, seconds * 1000)
+
+
+def render_timings():
+    """Sidebar expander with the average duration per full run / fragment."""
+    timings = st.session_state.get("rerun_timings", {})
+    if not timings:
+        return
+    with st.sidebar.expander("⏱ Rerun Timings", expanded=False):
+        for label, samples in sorted(timings.items()):
+            average = sum(samples) / len(samples) * 1000
+            st.caption(f"{label}: {average:.1f} ms avg · {samples[-1] * 1000:.1f} ms last · {len(samples)} runs")
+
+
+# ============================================================
+# FRAGMENTS
+# ============================================================
+
+def timed_fragment(func):
+    """Make func an independently rerunnable fragment that records its run time."""
+    @functools.wraps(func)
+    def run(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            record_timing(f"fragment {func.__name__}", time.perf_counter() - start)
+    return st.experimental_fragment(run)
+
+
+def set_state(key, value):
+    """on_click callback: set one session-state value before the (fragment) rerun."""
+    st.session_state[key] = value
@@ -1,29 +1,14 @@
-import os
 import streamlit as st
-from openai import OpenAI
 import json
-import utils
 from datetime import datetime
+import chat_store
+from fragments import timed_fragment
 
-CURRENT_DIR = os.path.dirname(os.path.abspath(__file__))
-BASE_DIR = os.path.dirname(CURRENT_DIR)
-EXTRACTED_PREFS_FILE = os.path.join(BASE_DIR, "profiles", "extractedPreferences.json")
-INTERVIEW_RESPONSES_FILE = os.path.join(BASE_DIR, "profiles", "interviewResponse.json")
-
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
 
 def load_user_profile():
     """Load extracted preferences with proper error handling."""
-    if not os.path.exists(EXTRACTED_PREFS_FILE):
-        return None
-
     try:
-        if os.path.getsize(EXTRACTED_PREFS_FILE) == 0:
-            return None
-
-        with open(EXTRACTED_PREFS_FILE, "r", encoding="utf-8") as f:
-            content = f.read()
-            return utils.safe_json_loads(content) if content.strip() else None
+        return chat_store.read_user_profile()
     except json.JSONDecodeError as e:
         st.error(f"⚠️ AI profile JSON is corrupted: {e}")
         return None
@@ -32,116 +17,14 @@ def load_user_profile():
         return None
 
 def load_subjects():
-    if not os.path.exists(INTERVIEW_RESPONSES_FILE):
-        return ["general"]
-
     try:
-        with open(INTERVIEW_RESPONSES_FILE, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        
-        # Assuming "SECTION 1 — Personal Background-1" contains topics
-        topics = data.get("SECTION 1 — Personal Background-1", "")
-        if topics:
-            # Split by comma and strip whitespace
-            subjects = [t.strip() for t in topics.split(",")]
-            return subjects
-        else:
-            return ["general"]
-
+        return chat_store.read_subjects()
     except Exception as e:
         st.error(f"❌ Could not load subjects: {e}")
         return ["general"]
-    
-def save_chat(subject, role, content, date=None, msg_index=None):
-    """
-    Save a chat message or update feedback in the chat JSON file.
-    
-    Args:
-        subject (str): Subject name.
-        role (str): 'user' or 'assistant'.
-        content (str): Message content.
-        date (str, optional): Date string 'YYYY-MM-DD'. Defaults to today.
-        msg_index (int, optional): Index of message to update (for feedback). If None, append new message.
-    """
-    folder = "profiles/chat_history"
-    os.makedirs(folder, exist_ok=True)
-    file_path = os.path.join(folder, f"{subject}.json")
-
-    if date is None:
-        date = datetime.now().strftime("%Y-%m-%d")
-
-    # Load existing data
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except:
-                data = {}
-    else:
-        data = {}
-
-    # Ensure today's list exists
-    if date not in data:
-        data[date] = []
-
-    # If msg_index is provided, update that message (feedback)
-    if msg_index is not None:
-        if 0 <= msg_index < len(data[date]):
-            data[date][msg_index] = content
-        else:
-            # Fallback: append if index is invalid
-            data[date].append(content)
-    else:
-        # Append new message
-        data[date].append({
-            "role": role,
-            "content": content,
-            "timestamp": datetime.now().isoformat(),
-            "feedback": {"thumbs_up": 0, "thumbs_down": 0} if role == "assistant" else {}
-        })
-
-    # Save back to file
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
 
 def load_chat(subject):
-    folder = "profiles/chat_history"
-    file_path = os.path.join(folder, f"{subject}.json")
-
-    if not os.path.exists(file_path):
-        return {}
-
-    try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return json.load(f)
-    except:
-        return {}
-
-def save_feedback(subject, date):
-    folder = "profiles/chat_history"
-    os.makedirs(folder, exist_ok=True)
-    file_path = os.path.join(folder, f"{subject}.json")
-
-    # Load existing data
-    if os.path.exists(file_path):
-        with open(file_path, "r", encoding="utf-8") as f:
-            try:
-                data = json.load(f)
-            except:
-                data = {}
-    else:
-        data = {}
-
-    # Ensure date entry exists
-    if date not in data:
-        data[date] = []
-
-    # Update counts for today
-    counts = st.session_state.feedback_summary[subject][date]
-    data[date + "_feedback"] = counts
-
-    with open(file_path, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
+    return chat_store.load_chat(subject)
 
 def generate_content():
     """
@@ -177,9 +60,13 @@ def generate_content():
     if "chat_history" not in st.session_state:
         st.session_state.chat_history = {}
 
-    # Load subject chat history (from file if first time)
-    if subject not in st.session_state.chat_history:
+    # Load subject chat history (from file if first time, or again when another
+    # session or app replica has written to it since)
+    versions = st.session_state.setdefault("chat_versions", {})
+    version = chat_store.chat_version(subject)
+    if subject not in st.session_state.chat_history or versions.get(subject) != version:
         st.session_state.chat_history[subject] = load_chat(subject)
+        versions[subject] = version
 
     chat_by_date = st.session_state.chat_history[subject]
     today = datetime.now().strftime("%Y-%m-%d")
@@ -207,83 +94,57 @@ def generate_content():
     # ---------------- Chat Send Logic ----------------
     if st.button("Send", key="send_button") and user_input.strip():
         # Append user message
-        chat_by_date[active_date].append({
-            "role": "user",
-            "content": user_input,
-            "timestamp": datetime.now().isoformat()
-        })
-        save_chat(subject, "user", user_input)
-
-        # Build system prompt
-        system_prompt = f"""
-        You are Persona AI, a personalized assistant.
-
-        Here is the user's profile data extracted from an interview:
-        {json.dumps(profile, indent=2)}
-
-        The topic we are dealing with is "{subject}".
-
-        Always use this information to tailor your responses.
-        Respond in a tone that the user prefers.
-        Generate the content according to their learning preferences.
-        """
+        user_message = chat_store.new_message("user", user_input)
+        chat_by_date[active_date].append(user_message)
+        chat_store.append_message(subject, user_message, date=active_date)
 
-        # Generate AI response
+        # Generate AI response (prompt building and the API call live in chat_store)
         try:
-            response = client.chat.completions.create(
-                model="gpt-4o-mini",
-                messages=[{"role": "system", "content": system_prompt}]
-                         + chat_by_date[active_date],
-                temperature=0.7,
-            )
-            ai_message =  response.choices[0].message.content
+            ai_message = chat_store.generate_reply(profile, subject, chat_by_date[active_date])
             print("AI Response:", ai_message)
-
-            chat_by_date[active_date].append({
-                "role": "assistant",
-                "content": ai_message,
-                "timestamp": datetime.now().isoformat(),
-                "feedback": {"thumbs_up": 0, "thumbs_down": 0}
-            })
-            save_chat(subject, "assistant", ai_message)
-
         except Exception as e:
-            ai_message = f"❌ Error generating response: {str(e)}"
-            st.error(ai_message)
-            chat_by_date[active_date].append({
-                "role": "assistant",
-                "content": 'Error generating response.',
-                "timestamp": datetime.now().isoformat(),
-                "feedback": {"thumbs_up": 0, "thumbs_down": 0}
-            })
-            save_chat(subject, "assistant", chat_by_date[active_date][-1])
+            st.error(f"❌ Error generating response: {str(e)}")
+            ai_message = "Error generating response."
+
+        assistant_message = chat_store.new_message("assistant", ai_message)
+        chat_by_date[active_date].append(assistant_message)
+        chat_store.append_message(subject, assistant_message, date=active_date)
 
     # ---------------- Display Chat ----------------
+    # Feedback controls are fragments: a click reruns only that message's
+    # buttons, not the whole chat page.
     messages = chat_by_date.get(active_date, [])
-    chat_container = st.container()
     for i, msg in enumerate(messages):
         if msg["role"] == "user":
             st.markdown(f"**You:** {msg['content']}")
         else:
             st.markdown(f"**Persona:** {msg['content']}")
+            render_feedback_buttons(subject, active_date, i)
 
-            # -------- Feedback Buttons per AI message --------
-            col_up, col_down, _ = st.columns([1, 1, 7])
-
-            thumbs_up_key = f"up_{active_date}_{i}"
-            thumbs_down_key = f"down_{active_date}_{i}"
-
-            # Render buttons with markdown and HTML
-            thumbs_up_clicked = col_up.button("👍", key=thumbs_up_key, help="Press to like", args=None)
-            thumbs_down_clicked = col_down.button("👎", key=thumbs_down_key, help="Press to dislike", args=None)
 
-            # Logic to handle clicks and highlight
-            if thumbs_up_clicked:
-                msg["feedback"]["thumbs_up"] = 1
-                msg["feedback"]["thumbs_down"] = 0
-                save_chat(subject, "assistant", msg, date=active_date, msg_index=i)
-
-            if thumbs_down_clicked:
-                msg["feedback"]["thumbs_down"] = 1
-                msg["feedback"]["thumbs_up"] = 0
-                save_chat(subject, "assistant", msg, date=active_date, msg_index=i)
+def set_feedback(subject, date, msg_index, thumbs_up):
+    """on_click callback for the 👍/👎 buttons of one assistant message."""
+    msg = st.session_state.chat_history[subject][date][msg_index]
+    try:
+        msg.update(chat_store.set_feedback(subject, date, msg_index, thumbs_up))
+    except IndexError:
+        # The stored chat changed under us; reload it on the next run
+        st.session_state.chat_versions.pop(subject, None)
+
+
+@timed_fragment
+def render_feedback_buttons(subject, date, msg_index):
+    """Feedback buttons per AI message; the selected one is highlighted."""
+    feedback = st.session_state.chat_history[subject][date][msg_index]["feedback"]
+    col_up, col_down, _ = st.columns([1, 1, 7])
+
+    col_up.button(
+        "👍", key=f"up_{date}_{msg_index}", help="Press to like",
+        type="primary" if feedback.get("thumbs_up") else "secondary",
+        on_click=set_feedback, args=(subject, date, msg_index, True)
+    )
+    col_down.button(
+        "👎", key=f"down_{date}_{msg_index}", help="Press to dislike",
+        type="primary" if feedback.get("thumbs_down") else "secondary",
+        on_click=set_feedback, args=(subject, date, msg_index, False)
+    )
@@ -1,231 +1,323 @@
 import streamlit as st
 import json
-import time
 import os
 
-# --------------------- Step 0: Define paths ---------------------
-BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))  # Project root
-QUESTIONS_FILE = os.path.join(BASE_DIR, "docs", "interviewQuestions.json")
-RESPONSES_FILE = os.path.join(BASE_DIR, "profiles", "interviewResponse.json")  # Save in profiles/
+import background_jobs
+from deterministic_extractor import skippable_questions
+from question_index import get_question_index
+from interview_autosave import append_answer, load_progress, clear_progress, resume_position, skipped_before_resume
+from utils import write_json_atomic, typing_html, estimate_tokens, load_env
+from user_storage import current_user_id, responses_file
+
+
+# --------------------- Answer / Navigation Helpers ---------------------
+def save_answer(response_key, value):
+    """Keep the answer in the session and append it to the autosave log if it changed."""
+    changed = st.session_state.responses.get(response_key, object()) != value
+    st.session_state.responses[response_key] = value
+    if changed:
+        append_answer(response_key, value)
+
+
+def next_question_position(section_idx, question_idx):
+    """Position after the current question; in adaptive mode questions with settled fields are passed over."""
+    question_index = get_question_index()
+    position = question_index.next_position(section_idx, question_idx)
+    if not st.session_state.adaptive_interview:
+        return position
+    skippable = skippable_questions(st.session_state.responses)
+    while position[0] < len(question_index.sections) and question_index.response_key(*position) in skippable:
+        key = question_index.response_key(*position)
+        if key not in st.session_state.skipped_questions:
+            st.session_state.skipped_questions.append(key)
+        position = question_index.next_position(*position)
+    return position
+
+
+def previous_question_position(section_idx, question_idx):
+    """Position before the current question, passing over skipped questions."""
+    question_index = get_question_index()
+    position = question_index.previous_position(section_idx, question_idx)
+    while position != (0, 0) and question_index.response_key(*position) in st.session_state.skipped_questions:
+        position = question_index.previous_position(*position)
+    return position
+
+
+def adaptive_savings():
+    """Questions skipped and an estimate of the prompt tokens their answers would have added."""
+    question_index = get_question_index()
+    skipped = st.session_state.skipped_questions
+    by_type = {}
+    for key, value in st.session_state.responses.items():
+        position = question_index.keys.get(key)
+        if position is not None:
+            q_type = question_index.questions[position]["type"]
+            by_type.setdefault(q_type, []).append(estimate_tokens(json.dumps({key: value})))
+    tokens = 0
+    for key in skipped:
+        sizes = by_type.get(question_index.questions[question_index.keys[key]]["type"], [])
+        tokens += sum(sizes) // len(sizes) if sizes else estimate_tokens(key)
+    return len(skipped), tokens
 
-# Ensure profiles folder exists
-os.makedirs(os.path.join(BASE_DIR, "profiles"), exist_ok=True)
-
-# --------------------- Step 1: Load Questions ---------------------
-with open(QUESTIONS_FILE, "r", encoding="utf-8") as f:
-    questions_data = json.load(f)
-
-sections = [key for key in questions_data.keys() if key not in ["OPENING SCRIPT", "CLOSING SCRIPT"]]
-
-# --------------------- Step 2: Initialize Session State ---------------------
-for key, default in {
-    "section_idx": -1,
-    "question_idx": 0,
-    "responses": {},
-    "opening_displayed": False,
-    "closing_displayed": False,
-    "rerun_flag": False,
-}.items():
-    if key not in st.session_state:
-        st.session_state[key] = default
 
 # --------------------- Step 3: Typing Effect ---------------------
 def typing_effect(text, speed=0.03):
-    placeholder = st.empty()
-    typed_text = ""
-    for char in text:
-        typed_text += char
-        placeholder.markdown(typed_text)
-        time.sleep(speed)
-
-# --------------------- Step 4: Handle Opening Script ---------------------
-if st.session_state.section_idx == -1:
-    if not st.session_state.opening_displayed:
-        typing_effect(questions_data["OPENING SCRIPT"]["script"])
-        st.session_state.opening_displayed = True
-    else:
-        st.markdown(questions_data["OPENING SCRIPT"]["script"])
+    # Animated in the browser: one message, no sleeping in the script thread
+    st.markdown(typing_html(text, speed), unsafe_allow_html=True)
+
+
+# --------------------- Page ---------------------
+def render_interview():
+    """Render the interview page (called by app.py on every rerun)."""
+    load_env()  # ADAPTIVE_INTERVIEW may come from .env
+
+    # --------------------- Step 1: Load Questions ---------------------
+    # Parsed once per process and reused across reruns (reloaded if the file changes)
+    question_index = get_question_index()
+    sections = question_index.sections
+
+    # --------------------- Step 2: Initialize Session State ---------------------
+    for key, default in {
+        "section_idx": -1,
+        "question_idx": 0,
+        "responses": {},
+        "opening_displayed": False,
+        "closing_displayed": False,
+        "rerun_flag": False,
+        "responses_saved": False,
+        "adaptive_interview": os.getenv("ADAPTIVE_INTERVIEW", "0") == "1",
+        "skipped_questions": [],
+    }.items():
+        if key not in st.session_state:
+            st.session_state[key] = default
+
+    # Resume a dropped session from the autosave log at the first unanswered question
+    if "progress_restored" not in st.session_state:
+        st.session_state.progress_restored = True
+        saved = load_progress()
+        if saved and not st.session_state.responses:
+            st.session_state.responses = saved
+            st.session_state.section_idx, st.session_state.question_idx = resume_position(question_index, saved)
+            st.session_state.opening_displayed = True
+            skipped, last_answered = skipped_before_resume(question_index, saved)
+            if skipped:
+                # The dropped session was adaptive: keep skipping, and do not land
+                # on (or step back into) the questions it had passed over
+                st.session_state.adaptive_interview = True
+                st.session_state.skipped_questions = skipped
+                st.session_state.section_idx, st.session_state.question_idx = next_question_position(*last_answered)
+
+    # --------------------- Step 4: Handle Opening Script ---------------------
+    if st.session_state.section_idx == -1:
+        if not st.session_state.opening_displayed:
+            typing_effect(question_index.scripts["OPENING SCRIPT"])
+            st.session_state.opening_displayed = True
+        else:
+            st.markdown(question_index.scripts["OPENING SCRIPT"])
+
+        st.markdown("""
+            <style>
+            div.stButton > button:first-child {
+                background-color: #4CAF50;
+                color: white;
+                padding: 12px 28px;
+                font-size: 18px;
+                border-radius: 10px;
+                transition: transform 0.3s;
+            }
+            div.stButton > button:first-child:hover {
+                background-color: #45a049;
+                transform: scale(1.05);
+            }
+            </style>
+        """, unsafe_allow_html=True)
+
+        adaptive = st.toggle(
+            "⚡ Adaptive interview (skip questions your earlier answers already settle)",
+            value=st.session_state.adaptive_interview,
+        )
+
+        if st.button("Start Interview 🚀", key="start_interview"):
+            st.session_state.adaptive_interview = adaptive
+            st.session_state.section_idx = 0
+            st.session_state.question_idx = 0
+            st.rerun()
+
+        st.stop()
+
+    # --------------------- Step 5: Display Questions ---------------------
+    if st.session_state.section_idx >= len(sections):
+        if not st.session_state.closing_displayed:
+            st.session_state.closing_displayed = True
+            typing_effect(question_index.scripts["CLOSING SCRIPT"])
+        else:
+            st.markdown(question_index.scripts["CLOSING SCRIPT"])
+
+        st.success("🎉 Interview Completed!")
+
+        if st.session_state.skipped_questions:
+            skipped, tokens_saved = adaptive_savings()
+            st.caption(f"⚡ Adaptive mode skipped {skipped} of {len(question_index)} questions "
+                       f"(~{tokens_saved:,} prompt tokens saved)")
+
+        # Save responses to JSON inside profiles folder (once; reruns of this screen skip it)
+        if not st.session_state.responses_saved:
+            write_json_atomic(responses_file(), st.session_state.responses)
+            clear_progress()
+            st.session_state.responses_saved = True
+            # Start extraction now so the profile is ready by the time the user opens it.
+            # Only here: answers edited later under "Your Profile" start their own job,
+            # and resubmitting these session responses would overwrite that profile.
+            background_jobs.submit_extraction(st.session_state.responses, user_id=current_user_id())
+        st.write("✅ Your interview responses have been saved to your profile!")
+
+        # Add button to generate AI profile
+        st.markdown("---")
+        st.markdown("<br>", unsafe_allow_html=True)
+
+        col1, col2, col3 = st.columns([1, 2, 1])
+        with col2:
+            if st.button("✨ Generate My AI Learning Profile", type="primary", use_container_width=True, key="generate_profile"):
+                st.session_state.page = "profile"
+                st.session_state.selected_profile_tab = 1  # Set to AI Learning Profile tab (index 1)
+                # The background job started above produces the profile
+                st.rerun()
+
+        st.stop()
+
+    current_section = sections[st.session_state.section_idx]
+    section_length = question_index.section_lengths[st.session_state.section_idx]
+    current_q = question_index.question(st.session_state.section_idx, st.session_state.question_idx)
+
+    st.title(current_section)
+    st.write(f"**Question {st.session_state.question_idx + 1} / {section_length}**")
+    st.progress((st.session_state.question_idx + 1) / section_length)
 
     st.markdown("""
         <style>
-        div.stButton > button:first-child {
-            background-color: #4CAF50;
-            color: white;
-            padding: 12px 28px;
-            font-size: 18px;
-            border-radius: 10px;
-            transition: transform 0.3s;
-        }
-        div.stButton > button:first-child:hover {
-            background-color: #45a049;
-            transform: scale(1.05);
+        .big-question {
+            font-size: 24px;
+            font-weight: bold;
+            color: #1f1f1f;
+            margin-bottom: 20px;
+            margin-top: 10px;
         }
         </style>
     """, unsafe_allow_html=True)
 
-    if st.button("Start Interview 🚀", key="start_interview"):
-        st.session_state.section_idx = 0
-        st.session_state.question_idx = 0
-        st.rerun()
-
-    st.stop()
-
-# --------------------- Step 5: Display Questions ---------------------
-if st.session_state.section_idx >= len(sections):
-    if not st.session_state.closing_displayed:
-        st.session_state.closing_displayed = True
-        typing_effect(questions_data["CLOSING SCRIPT"]["script"])
-    else:
-        st.markdown(questions_data["CLOSING SCRIPT"]["script"])
-
-    st.success("🎉 Interview Completed!")
-
-    # Save responses to JSON inside profiles folder
-    with open(RESPONSES_FILE, "w", encoding="utf-8") as json_file:
-        json.dump(st.session_state.responses, json_file, indent=4)
-    st.write("✅ Your interview responses have been saved to your profile!")
-
-    # Add button to generate AI profile
-    st.markdown("---")
+    # Show question based on type
+    response_key = f"{current_section}-{st.session_state.question_idx}"
+    existing_response = st.session_state.responses.get(response_key, None)
+
+    response = None
+    if current_q["type"] == "text":
+        st.markdown(f'<p class="big-question">{current_q["question"]}</p>', unsafe_allow_html=True)
+        response = st.text_area("", value=existing_response if existing_response else "", placeholder=current_q.get("placeholder", ""), label_visibility="collapsed")
+    elif current_q["type"] == "mcq":
+        st.markdown(f'<p class="big-question">{current_q["question"]}</p>', unsafe_allow_html=True)
+        options = current_q.get("options", [])
+        # Only set default_index if there's an existing response, otherwise use None
+        if existing_response and existing_response in options:
+            default_index = options.index(existing_response)
+            response = st.radio("", options, index=default_index, label_visibility="collapsed", key=f"mcq_{response_key}")
+        else:
+            # Use index=None to force user to make a selection
+            response = st.radio("", options, index=None, label_visibility="collapsed", key=f"mcq_{response_key}")
+    elif current_q["type"] == "rating":
+        st.markdown(f'<p class="big-question">{current_q["question"]}</p>', unsafe_allow_html=True)
+        # Use the existing response or default to the minimum value, with unique key
+        default_value = existing_response if existing_response is not None else 0
+        scale_labels = current_q.get("scale_labels", {})
+        min_label = scale_labels.get("0", "")
+        max_label = scale_labels.get("10", "") if current_q["scale"] == 10 else scale_labels.get(str(current_q["scale"]), "")
+        if min_label or max_label:
+            col_left, col_right = st.columns([1, 1])
+            with col_left:
+                st.caption(f"0 = {min_label}")
+            with col_right:
+                st.markdown(f"<div style='text-align: right;'><small>{current_q['scale']} = {max_label}</small></div>", unsafe_allow_html=True)
+        # Add unique key based on response_key to prevent value carryover
+        response = st.slider("", 0, current_q["scale"], value=default_value, label_visibility="collapsed", key=f"slider_{response_key}")
+
+    # Check if question is mandatory
+    is_mandatory = True
+    if st.session_state.section_idx == 0 and st.session_state.question_idx == section_length - 1:
+        is_mandatory = False
+
+    # --------------------- Step 6: Navigation Buttons ---------------------
     st.markdown("<br>", unsafe_allow_html=True)
 
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        if st.button("✨ Generate My AI Learning Profile", type="primary", use_container_width=True, key="generate_profile"):
-            st.session_state.page = "profile"
-            st.session_state.selected_profile_tab = 1  # Set to AI Learning Profile tab (index 1)
-            st.session_state.force_regenerate = True  # Force profile generation
-            st.rerun()
-
-    st.stop()
-
-current_section = sections[st.session_state.section_idx]
-section_questions = questions_data[current_section]
-current_q = section_questions[st.session_state.question_idx]
-
-st.title(current_section)
-st.write(f"**Question {st.session_state.question_idx + 1} / {len(section_questions)}**")
-st.progress((st.session_state.question_idx + 1) / len(section_questions))
-
-st.markdown("""
-    <style>
-    .big-question {
-        font-size: 24px;
-        font-weight: bold;
-        color: #1f1f1f;
-        margin-bottom: 20px;
-        margin-top: 10px;
-    }
-    </style>
-""", unsafe_allow_html=True)
-
-# Show question based on type
-response_key = f"{current_section}-{st.session_state.question_idx}"
-existing_response = st.session_state.responses.get(response_key, None)
-
-response = None
-if current_q["type"] == "text":
-    st.markdown(f'<p class="big-question">{current_q["question"]}</p>', unsafe_allow_html=True)
-    response = st.text_area("", value=existing_response if existing_response else "", placeholder=current_q.get("placeholder", ""), label_visibility="collapsed")
-elif current_q["type"] == "mcq":
-    st.markdown(f'<p class="big-question">{current_q["question"]}</p>', unsafe_allow_html=True)
-    options = current_q.get("options", [])
-    # Only set default_index if there's an existing response, otherwise use None
-    if existing_response and existing_response in options:
-        default_index = options.index(existing_response)
-        response = st.radio("", options, index=default_index, label_visibility="collapsed", key=f"mcq_{response_key}")
+    show_previous = st.session_state.section_idx > 0 or st.session_state.question_idx > 0
+    error_placeholder = st.empty()
+
+    if show_previous:
+        col1, col2, col3 = st.columns([1, 1, 1])
+
+        with col1:
+            if st.button("⬅️", key="prev_question", use_container_width=True):
+                save_answer(response_key, response)
+
+                st.session_state.section_idx, st.session_state.question_idx = previous_question_position(
+                    st.session_state.section_idx, st.session_state.question_idx
+                )
+                st.rerun()
+
+        with col3:
+            if st.button("➡️", key="next_question", use_container_width=True):
+                if is_mandatory:
+                    error_msg = None
+                    if current_q["type"] == "text" and (not response or response.strip() == ""):
+                        error_msg = "⚠️ Please answer this question before proceeding."
+                    elif current_q["type"] == "mcq" and not response:
+                        error_msg = "⚠️ Please select an option before proceeding."
+                    elif current_q["type"] == "rating" and response is None:
+                        error_msg = "⚠️ Please provide a rating before proceeding."
+
+                    if error_msg:
+                        error_placeholder.error(error_msg)
+                        st.stop()
+
+                save_answer(response_key, response)
+
+                previous_section = st.session_state.section_idx
+                st.session_state.section_idx, st.session_state.question_idx = next_question_position(
+                    st.session_state.section_idx, st.session_state.question_idx
+                )
+                # Stage fields of the finished section; the last one is left to the final pass
+                if previous_section < st.session_state.section_idx < len(sections):
+                    background_jobs.submit_section_extraction(st.session_state.responses, user_id=current_user_id())
+
+                st.rerun()
     else:
-        # Use index=None to force user to make a selection
-        response = st.radio("", options, index=None, label_visibility="collapsed", key=f"mcq_{response_key}")
-elif current_q["type"] == "rating":
-    st.markdown(f'<p class="big-question">{current_q["question"]}</p>', unsafe_allow_html=True)
-    # Use the existing response or default to the minimum value, with unique key
-    default_value = existing_response if existing_response is not None else 0
-    scale_labels = current_q.get("scale_labels", {})
-    min_label = scale_labels.get("0", "")
-    max_label = scale_labels.get("10", "") if current_q["scale"] == 10 else scale_labels.get(str(current_q["scale"]), "")
-    if min_label or max_label:
-        col_left, col_right = st.columns([1, 1])
-        with col_left:
-            st.caption(f"0 = {min_label}")
-        with col_right:
-            st.markdown(f"<div style='text-align: right;'><small>{current_q['scale']} = {max_label}</small></div>", unsafe_allow_html=True)
-    # Add unique key based on response_key to prevent value carryover
-    response = st.slider("", 0, current_q["scale"], value=default_value, label_visibility="collapsed", key=f"slider_{response_key}")
-
-# Check if question is mandatory
-is_mandatory = True
-if st.session_state.section_idx == 0 and st.session_state.question_idx == len(section_questions) - 1:
-    is_mandatory = False
-
-# --------------------- Step 6: Navigation Buttons ---------------------
-st.markdown("<br>", unsafe_allow_html=True)
-
-show_previous = st.session_state.section_idx > 0 or st.session_state.question_idx > 0
-error_placeholder = st.empty()
-
-if show_previous:
-    col1, col2, col3 = st.columns([1, 1, 1])
-
-    with col1:
-        if st.button("⬅️", key="prev_question", use_container_width=True):
-            st.session_state.responses[response_key] = response
-
-            if st.session_state.question_idx > 0:
-                st.session_state.question_idx -= 1
-            else:
-                st.session_state.section_idx -= 1
-                st.session_state.question_idx = len(questions_data[sections[st.session_state.section_idx]]) - 1
-            st.rerun()
-
-    with col3:
-        if st.button("➡️", key="next_question", use_container_width=True):
-            if is_mandatory:
-                error_msg = None
-                if current_q["type"] == "text" and (not response or response.strip() == ""):
-                    error_msg = "⚠️ Please answer this question before proceeding."
-                elif current_q["type"] == "mcq" and not response:
-                    error_msg = "⚠️ Please select an option before proceeding."
-                elif current_q["type"] == "rating" and response is None:
-                    error_msg = "⚠️ Please provide a rating before proceeding."
-
-                if error_msg:
-                    error_placeholder.error(error_msg)
-                    st.stop()
-
-            st.session_state.responses[response_key] = response
-
-            if st.session_state.question_idx < len(section_questions) - 1:
-                st.session_state.question_idx += 1
-            else:
-                st.session_state.section_idx += 1
-                st.session_state.question_idx = 0
-
-            st.rerun()
-else:
-    col1, col2, col3 = st.columns([2, 1, 2])
-
-    with col2:
-        if st.button("➡️", key="next_question", use_container_width=True):
-            if is_mandatory:
-                error_msg = None
-                if current_q["type"] == "text" and (not response or response.strip() == ""):
-                    error_msg = "⚠️ Please answer this question before proceeding."
-                elif current_q["type"] == "mcq" and not response:
-                    error_msg = "⚠️ Please select an option before proceeding."
-                elif current_q["type"] == "rating" and response is None:
-                    error_msg = "⚠️ Please provide a rating before proceeding."
-
-                if error_msg:
-                    error_placeholder.error(error_msg)
-                    st.stop()
-
-            st.session_state.responses[response_key] = response
-
-            if st.session_state.question_idx < len(section_questions) - 1:
-                st.session_state.question_idx += 1
-            else:
-                st.session_state.section_idx += 1
-                st.session_state.question_idx = 0
-
-            st.rerun()
+        col1, col2, col3 = st.columns([2, 1, 2])
+
+        with col2:
+            if st.button("➡️", key="next_question", use_container_width=True):
+                if is_mandatory:
+                    error_msg = None
+                    if current_q["type"] == "text" and (not response or response.strip() == ""):
+                        error_msg = "⚠️ Please answer this question before proceeding."
+                    elif current_q["type"] == "mcq" and not response:
+                        error_msg = "⚠️ Please select an option before proceeding."
+                    elif current_q["type"] == "rating" and response is None:
+                        error_msg = "⚠️ Please provide a rating before proceeding."
+
+                    if error_msg:
+                        error_placeholder.error(error_msg)
+                        st.stop()
+
+                save_answer(response_key, response)
+
+                previous_section = st.session_state.section_idx
+                st.session_state.section_idx, st.session_state.question_idx = next_question_position(
+                    st.session_state.section_idx, st.session_state.question_idx
+                )
+                # Stage fields of the finished section; the last one is left to the final pass
+                if previous_section < st.session_state.section_idx < len(sections):
+                    background_jobs.submit_section_extraction(st.session_state.responses, user_id=current_user_id())
+
+                st.rerun()
+
+
+if __name__ == "__main__":
+    render_interview()
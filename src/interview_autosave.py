@@ -0,0 +1,101 @@
+"""
+interview_autosave.py - Incremental Autosave for Interview Answers
+
+Every answer is appended to a small per-user JSONL log the moment the user moves
+on (one line per answer, last write wins). If the browser session drops,
+the next session replays the log and resumes at the first unanswered
+question instead of starting over.
+
+When the interview completes, interview.py writes interviewResponse.json
+once and clears the log.
+
+Usage:
+    from interview_autosave import append_answer, load_progress, resume_position, skipped_before_resume
+
+Last updated: January 2026
+"""
+
+import json
+import os
+from datetime import datetime
+
+from user_storage import progress_file
+
+
+def append_answer(response_key, value, path=None):
+    """Append one answer to the progress log (flushed to disk before returning)."""
+    path = path or progress_file()
+    record = {"key": response_key, "value": value, "timestamp": datetime.now().isoformat()}
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def load_progress(path=None):
+    """
+    Replay the progress log (default: the current user's).
+
+    Returns:
+        dict: {response_key: latest value}; empty if there is no log
+    """
+    path = path or progress_file()
+    responses = {}
+    if not os.path.exists(path):
+        return responses
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A dropped session can leave a half-written last line
+                continue
+            responses[record["key"]] = record["value"]
+    return responses
+
+
+def clear_progress(path=None):
+    """Remove the log once the full responses file has been written."""
+    path = path or progress_file()
+    if os.path.exists(path):
+        os.remove(path)
+
+
+def resume_position(question_index, responses):
+    """
+    Find the first unanswered question.
+
+    Args:
+        question_index: QuestionIndex from question_index.get_question_index
+        responses: Answers recovered so far
+
+    Returns:
+        tuple: (section_idx, question_idx); (len(sections), 0) if everything is answered
+    """
+    for section_idx, question_idx in question_index.positions:
+        if question_index.response_key(section_idx, question_idx) not in responses:
+            return section_idx, question_idx
+    return len(question_index.sections), 0
+
+
+def skipped_before_resume(question_index, responses):
+    """
+    Find the questions adaptive mode passed over before the session dropped.
+
+    Every unanswered question before the last answered one was skipped
+    (the interview only moves past a question by answering or skipping it).
+
+    Returns:
+        tuple: (skipped response keys in interview order, position of the
+            last answered question or None if nothing was answered)
+    """
+    answered = [question_index.keys[k] for k in responses if k in question_index.keys]
+    if not answered:
+        return [], None
+    last = max(answered)
+    skipped = [
+        question_index.response_key(*position)
+        for position in question_index.positions[:last]
+        if question_index.response_key(*position) not in responses
+    ]
+    return skipped, question_index.positions[last]
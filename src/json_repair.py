@@ -0,0 +1,180 @@
+"""
+json_repair.py - Local Repair of Malformed LLM JSON
+
+LLM output is sometimes *almost* JSON: cut off mid-object, trailing commas,
+single-quoted strings, Python literals (True/None). Re-running a whole
+extraction for that is wasteful, so this module first tries to fix the
+text locally:
+
+    1. strip Markdown fences / leading prose (same as safe_json_loads)
+    2. re-emit the text with a string-aware scanner that
+       - converts single-quoted strings to double-quoted ones
+       - escapes raw newlines inside strings
+       - maps True/False/None to true/false/null
+       - drops trailing commas before } and ]
+       - stops after the top-level value (ignores trailing prose)
+    3. close an unterminated string and any open brackets; if that is
+       still not valid, cut back to the last complete member and retry
+
+Only when fields are still missing or invalid after this do callers send a
+small follow-up request for those fields (see extract_preferences and
+analyze_chatbot).
+
+Usage:
+    from json_repair import loads_with_repair
+
+    data, repaired = loads_with_repair(ai_text)
+
+Last updated: January 2026
+"""
+
+import json
+
+from utils import safe_json_loads
+
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_CLOSERS = {"{": "}", "[": "]"}
+_MAX_CUTS = 20
+
+
+def _strip_wrapping(text):
+    """Remove code fences and any prose before the first bracket."""
+    cleaned = text.strip()
+    if cleaned.startswith("```"):
+        cleaned = cleaned.split("\n", 1)[-1] if "\n" in cleaned else cleaned[3:]
+    if cleaned.rstrip().endswith("```"):
+        cleaned = cleaned.rstrip()[:-3]
+    starts = [i for i in (cleaned.find("{"), cleaned.find("[")) if i >= 0]
+    return cleaned[min(starts):] if starts else cleaned
+
+
+def _drop_trailing_comma(out):
+    i = len(out) - 1
+    while i >= 0 and out[i].isspace():
+        i -= 1
+    if i >= 0 and out[i] == ",":
+        del out[i]
+
+
+def _scan(text):
+    """
+    Re-emit text as JSON-friendly characters.
+
+    Returns:
+        tuple: (out, stack, in_string, cut_points)
+            cut_points: (len(out), stack copy) after every top-level-safe comma,
+                        used to drop an incomplete trailing member
+    """
+    out = []
+    stack = []
+    cut_points = []
+    quote = None
+    i = 0
+    n = len(text)
+
+    while i < n:
+        ch = text[i]
+
+        if quote is not None:
+            if ch == "\\" and i + 1 < n:
+                # \' is valid in a single-quoted string but not in JSON
+                if text[i + 1] != "'":
+                    out.append(ch)
+                out.append(text[i + 1])
+                i += 2
+                continue
+            if ch == quote:
+                out.append('"')
+                quote = None
+            elif ch == '"':
+                out.append('\\"')
+            elif ch == "\n":
+                out.append("\\n")
+            else:
+                out.append(ch)
+            i += 1
+            continue
+
+        if ch in "\"'":
+            quote = ch
+            out.append('"')
+        elif ch in "{[":
+            stack.append(ch)
+            out.append(ch)
+        elif ch in "}]":
+            _drop_trailing_comma(out)
+            if stack and _CLOSERS[stack[-1]] == ch:
+                stack.pop()
+            out.append(ch)
+            if not stack:
+                # Top-level value is complete; ignore any trailing prose
+                break
+        elif ch == ",":
+            cut_points.append((len(out), list(stack)))
+            out.append(ch)
+        elif ch.isalpha():
+            j = i
+            while j < n and (text[j].isalnum() or text[j] == "_"):
+                j += 1
+            word = text[i:j]
+            out.append(_LITERALS.get(word, word))
+            i = j
+            continue
+        else:
+            out.append(ch)
+        i += 1
+
+    return out, stack, quote is not None, cut_points
+
+
+def _close(chars, stack):
+    text = "".join(chars).rstrip()
+    while text.endswith(","):
+        text = text[:-1].rstrip()
+    if text.endswith(":"):
+        text += " null"
+    return text + "".join(_CLOSERS[b] for b in reversed(stack))
+
+
+def repair_json_text(text):
+    """
+    Repair common syntax problems in LLM JSON.
+
+    Args:
+        text: Raw model output
+
+    Returns:
+        The parsed object, or None if the text could not be repaired
+    """
+    if text is None or not text.strip():
+        return None
+
+    out, stack, in_string, cut_points = _scan(_strip_wrapping(text))
+    if in_string:
+        out.append('"')
+
+    candidates = [(out, stack)]
+    candidates += [(out[:pos], cut_stack) for pos, cut_stack in reversed(cut_points[-_MAX_CUTS:])]
+
+    for chars, open_brackets in candidates:
+        try:
+            return json.loads(_close(chars, open_brackets))
+        except json.JSONDecodeError:
+            continue
+    return None
+
+
+def loads_with_repair(text):
+    """
+    Parse LLM JSON, falling back to local repair.
+
+    Returns:
+        tuple: (data, repaired)
+            data: Parsed object or None
+            repaired: True if local repair was needed
+    """
+    data = safe_json_loads(text)
+    if data is not None:
+        return data, False
+    data = repair_json_text(text)
+    return data, data is not None
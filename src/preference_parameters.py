@@ -7,9 +7,16 @@ This file serves as DOCUMENTATION for the team to understand:
 2. What valid values each field can have
 3. Which interview questions map to which profile fields
 
-NOTE: This file is NOT used by the extraction code!
-The LLM (GPT-4o-mini) reads interview responses and extracts values directly.
-This file is for HUMAN REFERENCE only - to help the team understand the system.
+NOTE: The LLM (GPT-4o-mini) still extracts most values from the free-text
+answers. The linked_questions below are also read by deterministic_extractor.py:
+structured answers (MCQ / rating) that carry a "value_map" or a range
+"extraction_hint" (e.g. "0-3 = explorer") are mapped to fields locally,
+without the LLM. Keep those entries in sync with docs/interviewQuestions.json.
+
+Structured-answer metadata on a linked question:
+- value_map: MCQ option prefix -> field value (e.g. {"Yes": True, "No": False})
+- extraction_hint "a-b = value, ...": rating range -> field value
+- a rating linked to a scale field without extraction_hint maps 1:1 (clamped to 1-10)
 
 STRUCTURE:
 - Part 1: Schema fields organized by section, each linked to interview questions
@@ -125,7 +132,9 @@ LEARNING_PREFERENCES_FIELDS = {
             {
                 "section": "Section 4 – Comparison Questions",
                 "question": "Which explanation structure feels more natural to you? (Narrative vs Formal)",
-                "type": "mcq"
+                "type": "mcq",
+                "value_map": {"B": "step-by-step"},
+                "extraction_hint": "Formal structured (B) = step-by-step; Narrative (A) needs the text answers"
             }
         ]
     },
@@ -176,7 +185,8 @@ LEARNING_PREFERENCES_FIELDS = {
             {
                 "section": "Section 4 – Comparison Questions",
                 "question": "Which type of examples do you prefer when practicing? (Real-world vs Abstract)",
-                "type": "mcq"
+                "type": "mcq",
+                "value_map": {"A": "real-world", "B": "mathematical"}
             }
         ]
     },
@@ -194,7 +204,8 @@ LEARNING_PREFERENCES_FIELDS = {
                 "section": "Section 3 – Content Preferences",
                 "question": "For examples, you prefer:",
                 "type": "mcq",
-                "options": ["Multiple examples", "One strong example"]
+                "options": ["Multiple examples", "One strong example"],
+                "value_map": {"Multiple": "multiple", "One strong": "one-strong"}
             }
         ]
     },
@@ -254,7 +265,7 @@ LEARNING_PREFERENCES_FIELDS = {
 
     "uses_analogies": {
         "type": "boolean",
-        "valid_values": [True, False],
+        "valid_values": [True, False, "sometimes"],
         "description": "Whether analogies and metaphors help them learn",
         "linked_questions": [
             {
@@ -299,14 +310,15 @@ LEARNING_PREFERENCES_FIELDS = {
 
     "practice_problems": {
         "type": "boolean",
-        "valid_values": [True, False],
+        "valid_values": [True, False, "sometimes"],
         "description": "Whether they want practice problems included in explanations",
         "linked_questions": [
             {
                 "section": "Section 3 – Content Preferences",
                 "question": "Should explanations include practice problems?",
                 "type": "mcq",
-                "options": ["Yes", "Maybe later", "No"]
+                "options": ["Yes", "Maybe later", "No"],
+                "value_map": {"Yes": True, "No": False}
             }
         ]
     },
@@ -325,7 +337,8 @@ LEARNING_PREFERENCES_FIELDS = {
                 "section": "Section 3 – Content Preferences",
                 "question": "For technical topics, do you want code examples?",
                 "type": "mcq",
-                "options": ["Yes", "Only if necessary", "No"]
+                "options": ["Yes", "Only if necessary", "No"],
+                "value_map": {"Yes": "yes", "Only if necessary": "if-necessary", "No": "no"}
             }
         ]
     },
@@ -427,12 +440,14 @@ COMMUNICATION_STYLE_FIELDS = {
                 "section": "Section 4 – Comparison Questions",
                 "question": "Which writing style helps you more?",
                 "type": "rating",
-                "scale": "0-10 (Formal academic to Friendly conversational)"
+                "scale": "0-10 (Formal academic to Friendly conversational)",
+                "extraction_hint": "0-4 = formal, 6-10 = conversational"
             },
             {
                 "section": "Section 4 – Comparison Questions",
                 "question": "Which explanation style helps you understand better? (Simple vs Technical)",
-                "type": "mcq"
+                "type": "mcq",
+                "value_map": {"A": "conversational", "B": "formal"}
             }
         ]
     },
@@ -451,7 +466,8 @@ COMMUNICATION_STYLE_FIELDS = {
                 "section": "Section 4 – Comparison Questions",
                 "question": "Which feedback style helps you improve faster? (Encouraging vs Direct)",
                 "type": "rating",
-                "scale": "0-10 (Encouraging & supportive to Direct & corrective)"
+                "scale": "0-10 (Encouraging & supportive to Direct & corrective)",
+                "extraction_hint": "0-3 = supportive-gentle, 4-6 = supportive-direct, 7-10 = direct-critical"
             },
             {
                 "section": "Section 4 – Comparison Questions",
@@ -475,14 +491,15 @@ COMMUNICATION_STYLE_FIELDS = {
                 "section": "Section 4 – Comparison Questions",
                 "question": "For answers, you prefer:",
                 "type": "mcq",
-                "options": ["Quick response", "Deep explanation"]
+                "options": ["Quick response", "Deep explanation"],
+                "value_map": {"Quick": "quick", "Deep": "detailed"}
             }
         ]
     },
 
     "question_engagement": {
         "type": "boolean",
-        "valid_values": [True, False],
+        "valid_values": [True, False, "sometimes"],
         "description": "Whether the AI should ask questions to engage thinking",
         "linked_questions": [
             {
@@ -496,14 +513,15 @@ COMMUNICATION_STYLE_FIELDS = {
 
     "summaries_after_explanation": {
         "type": "boolean",
-        "valid_values": [True, False],
+        "valid_values": [True, False, "sometimes"],
         "description": "Whether they want summaries after explanations",
         "linked_questions": [
             {
                 "section": "Section 3 – Content Preferences",
                 "question": "Do you want summaries after explanations?",
                 "type": "mcq",
-                "options": ["Yes", "Sometimes", "No"]
+                "options": ["Yes", "Sometimes", "No"],
+                "value_map": {"Yes": True, "Sometimes": "sometimes", "No": False}
             }
         ]
     }
@@ -797,6 +815,16 @@ STUDY_BEHAVIOR_FIELDS = {
 }
 
 
+# Schema section name -> field definitions (same order as USER_PROFILE_SCHEMA)
+FIELDS_BY_SECTION = {
+    "background": BACKGROUND_FIELDS,
+    "learning_preferences": LEARNING_PREFERENCES_FIELDS,
+    "communication_style": COMMUNICATION_STYLE_FIELDS,
+    "emotional_patterns": EMOTIONAL_PATTERNS_FIELDS,
+    "study_behavior": STUDY_BEHAVIOR_FIELDS,
+}
+
+
 # ============================================================================
 # PART 2: QUICK REFERENCE SUMMARY
 # ============================================================================
@@ -843,10 +871,10 @@ VALID_VALUES_SUMMARY = {
     # ===================
     # BOOLEAN FIELDS
     # ===================
-    "uses_analogies": [True, False],
-    "practice_problems": [True, False],
-    "question_engagement": [True, False],
-    "summaries_after_explanation": [True, False],
+    "uses_analogies": [True, False, "sometimes"],
+    "practice_problems": [True, False, "sometimes"],
+    "question_engagement": [True, False, "sometimes"],
+    "summaries_after_explanation": [True, False, "sometimes"],
 
     # ===================
     # STRING FIELDS
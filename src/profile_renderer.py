@@ -0,0 +1,263 @@
+"""
+profile_renderer.py - Schema-Driven AI Learning Profile Renderer
+
+The AI Learning Profile tab used to hand-write the widgets and HTML for all
+37 fields. This module builds the layout once from USER_PROFILE_SCHEMA
+(field types, allowed values, scale ranges) and preference_parameters
+(examples), and renders every section generically:
+
+    - display mode: one HTML block per section, cached by a hash of the
+      section's content, so reruns with an unchanged profile reuse it
+    - edit mode: one widget per field, chosen from the field type
+      (selectbox, slider, checkbox, number input, text input/area)
+
+Adding a field to the schema adds it to the page; nothing here needs to
+change.
+
+Usage:
+    from profile_renderer import profile_layout, section_html, render_section_editor, editor_values
+
+    for section in profile_layout():
+        st.markdown(section_html(section, lp.get(section.name)), unsafe_allow_html=True)
+
+Last updated: January 2026
+"""
+
+import hashlib
+import html
+import re
+import threading
+from functools import lru_cache
+from typing import NamedTuple
+
+import streamlit as st
+
+from extraction_cache import canonical_json
+from preference_parameters import FIELDS_BY_SECTION
+from profile_validator import BOOL_VALUES
+from user_profile_schema import USER_PROFILE_SCHEMA
+
+SUMMARY = "summary"
+
+SECTION_TITLES = {
+    "summary": "📌 Profile Summary",
+    "background": "📚 Background",
+    "learning_preferences": "📖 Learning Preferences",
+    "communication_style": "💬 Communication Style",
+    "emotional_patterns": "🧠 Emotional Patterns",
+    "study_behavior": "📅 Study Behavior",
+}
+
+SECTION_COLORS = {
+    "background": "#E3F2FD",
+    "learning_preferences": "#F5F5F5",
+    "communication_style": "#E8F5E9",
+    "emotional_patterns": "#FFEBEE",
+    "study_behavior": "#FFF8E1",
+}
+
+# String fields whose example answer is longer than this get a text area
+LONG_TEXT_CHARS = 50
+
+MAX_CACHED_HTML = 256
+
+_SCALE = re.compile(r"int\s*\((\d+)\s*-\s*(\d+)\)")
+_HTML_CACHE = {}   # (section, content hash) -> html
+_LOCK = threading.Lock()
+
+
+# ============================================================
+# LAYOUT
+# ============================================================
+
+class FieldSpec(NamedTuple):
+    name: str
+    label: str
+    kind: str            # "enum", "scale", "int", "bool", "text" or "long_text"
+    options: tuple = ()
+    low: int = 0
+    high: int = 10
+    default: object = None
+    widget_key: str = ""
+
+
+class SectionSpec(NamedTuple):
+    name: str
+    title: str
+    fields: tuple        # FieldSpec, in schema order; empty for the summary
+
+
+def _field_spec(section, name, schema_type):
+    params = FIELDS_BY_SECTION.get(section, {}).get(name, {})
+    label = name.replace("_", " ").title()
+    key = f"edit_{section}_{name}"
+    if isinstance(schema_type, list):
+        return FieldSpec(name, label, "enum", options=tuple(schema_type), default=schema_type[0], widget_key=key)
+    scale = _SCALE.match(schema_type)
+    if scale:
+        low, high = int(scale.group(1)), int(scale.group(2))
+        return FieldSpec(name, label, "scale", low=low, high=high, default=(low + high) // 2, widget_key=key)
+    if schema_type == "int":
+        return FieldSpec(name, label, "int", default=params.get("example", 0), widget_key=key)
+    if schema_type == "bool":
+        return FieldSpec(name, label, "bool", default=True, widget_key=key)
+    long_text = len(str(params.get("example", ""))) > LONG_TEXT_CHARS
+    return FieldSpec(name, label, "long_text" if long_text else "text", default="", widget_key=key)
+
+
+@lru_cache(maxsize=1)
+def profile_layout():
+    """
+    Compile the page layout from the schema (once per process).
+
+    Returns:
+        tuple: SectionSpec for the summary, then each schema section in order
+    """
+    sections = [SectionSpec(SUMMARY, SECTION_TITLES[SUMMARY], ())]
+    for section, fields in USER_PROFILE_SCHEMA["learning_profile"].items():
+        if not isinstance(fields, dict):
+            continue
+        specs = tuple(_field_spec(section, name, schema_type) for name, schema_type in fields.items())
+        title = SECTION_TITLES.get(section, section.replace("_", " ").title())
+        sections.append(SectionSpec(section, title, specs))
+    return tuple(sections)
+
+
+def section_spec(name):
+    return next(section for section in profile_layout() if section.name == name)
+
+
+# ============================================================
+# DISPLAY HTML (cached by content hash)
+# ============================================================
+
+def _display_value(value):
+    if isinstance(value, list):
+        value = ", ".join(str(v) for v in value)
+    if value is True:
+        return "Yes"
+    if value is False:
+        return "No"
+    if value == "sometimes":
+        return "Sometimes"
+    if value in (None, "", "N/A"):
+        return "N/A"
+    return html.escape(str(value))
+
+
+def _scale_html(field, value):
+    try:
+        number = int(float(value))
+    except (TypeError, ValueError):
+        return f"<div><b>{field.label}:</b> N/A</div>"
+    percent = max(0, min(100, round((number - field.low) / ((field.high - field.low) or 1) * 100)))
+    return (
+        f"<div><b>{field.label}:</b> {number}/{field.high}"
+        f"<div style='background-color:#DDD; border-radius:6px; height:8px; margin-top:4px;'>"
+        f"<div style='background-color:#4CAF50; width:{percent}%; height:8px; border-radius:6px;'></div>"
+        f"</div></div>"
+    )
+
+
+def _build_section_html(section, values):
+    if section.name == SUMMARY:
+        return f"""
+        <div style="background: linear-gradient(to right, #FFF3E0, #FFE0B2);
+                    padding: 20px; border-radius: 12px; box-shadow: 0 2px 6px rgba(0,0,0,0.1);">
+            <p style="margin-top: 10px;">{_display_value(values)}</p>
+        </div>
+        """
+
+    values = values if isinstance(values, dict) else {}
+    cells = []
+    for field in section.fields:
+        value = values.get(field.name)
+        if field.kind == "scale":
+            cells.append(_scale_html(field, value))
+        else:
+            cells.append(f"<div><b>{field.label}:</b> {_display_value(value)}</div>")
+    color = SECTION_COLORS.get(section.name, "#F5F5F5")
+    return f"""
+    <div style="background-color:{color}; padding:15px; border-radius:12px; margin-bottom:10px;
+                display:grid; grid-template-columns:1fr 1fr; gap:8px 24px;">
+        {"".join(cells)}
+    </div>
+    """
+
+
+def section_html(section, values):
+    """
+    Display HTML for one section, rebuilt only when its content changes.
+
+    Args:
+        section: SectionSpec from profile_layout()
+        values: The section's dict from the profile (the summary string for the summary)
+    """
+    digest = hashlib.sha256(canonical_json(values).encode("utf-8")).hexdigest()
+    key = (section.name, digest)
+    cached = _HTML_CACHE.get(key)
+    if cached is not None:
+        return cached
+
+    rendered = _build_section_html(section, values)
+    with _LOCK:
+        if len(_HTML_CACHE) >= MAX_CACHED_HTML:
+            _HTML_CACHE.clear()
+        _HTML_CACHE[key] = rendered
+    return rendered
+
+
+# ============================================================
+# EDITOR
+# ============================================================
+
+def _int_value(value, default):
+    try:
+        return int(float(value)) if value not in (None, "") else default
+    except (ValueError, TypeError):
+        return default
+
+
+def _render_field_editor(field, value):
+    if field.kind == "enum":
+        if isinstance(value, list) and value:
+            value = value[0]
+        index = field.options.index(value) if value in field.options else 0
+        st.selectbox(field.label, field.options, index=index, key=field.widget_key)
+    elif field.kind == "scale":
+        number = max(field.low, min(field.high, _int_value(value, field.default)))
+        st.slider(field.label, field.low, field.high, number, key=field.widget_key)
+    elif field.kind == "int":
+        st.number_input(field.label, value=_int_value(value, field.default), min_value=0, step=1,
+                        key=field.widget_key)
+    elif field.kind == "bool":
+        # Yes / Sometimes / No; a checkbox would turn "sometimes" into True on save
+        index = BOOL_VALUES.index(value) if value in BOOL_VALUES else BOOL_VALUES.index(field.default)
+        st.selectbox(field.label, BOOL_VALUES, index=index, format_func=_display_value, key=field.widget_key)
+    elif field.kind == "long_text":
+        st.text_area(field.label, value="" if value in (None, "N/A") else str(value), height=80,
+                     key=field.widget_key)
+    else:
+        st.text_input(field.label, value="" if value in (None, "N/A") else str(value),
+                      key=field.widget_key)
+
+
+def render_section_editor(section, values):
+    """Render one widget per field of the section, in two columns."""
+    if section.name == SUMMARY:
+        st.text_area("Summary", value=values or "", height=150, key=f"edit_{SUMMARY}_input")
+        return
+
+    values = values if isinstance(values, dict) else {}
+    columns = st.columns(2)
+    half = (len(section.fields) + 1) // 2
+    for i, field in enumerate(section.fields):
+        with columns[0 if i < half else 1]:
+            _render_field_editor(field, values.get(field.name))
+
+
+def editor_values(section):
+    """Read the edited section back from the widgets' session state."""
+    if section.name == SUMMARY:
+        return st.session_state[f"edit_{SUMMARY}_input"]
+    return {field.name: st.session_state[field.widget_key] for field in section.fields}
@@ -0,0 +1,296 @@
+"""
+profile_validator.py - Compiled Validator / Coercer for Extracted Profiles
+
+USER_PROFILE_SCHEMA describes every field with a small type language:
+    "string", "int", "int (1-10)", "bool" or a list of allowed values.
+
+This module compiles that description ONCE into one coercer function per
+field. Validating a profile is then a flat loop over 37 precompiled
+closures, fast enough for thousands of profiles per second in batch.
+
+Coercion rules:
+    - enums: near-miss values are normalized ("Step by step" -> "step-by-step",
+      "conversation" -> "conversational"); a list picks its first valid item
+    - scales: "7/10", "7", 7.6 -> 7, clamped to the declared range
+    - ints: "4th semester" -> 4
+    - bools: "yes"/"no"/"true"/"false", plus "sometimes" for the middle
+      answer (BOOL_VALUES: yes / sometimes / no)
+    - missing or unusable values are reported as invalid
+
+The same compiled schema also produces the JSON schema passed to the API
+as a structured-output response_format.
+
+Usage:
+    from profile_validator import validate_profile, build_response_format
+
+    profile, invalid_fields = validate_profile(parsed)
+
+Last updated: January 2026
+"""
+
+import difflib
+import re
+
+from user_profile_schema import USER_PROFILE_SCHEMA
+
+_NUMBER = re.compile(r"-?\d+(?:\.\d+)?")
+_SCALE = re.compile(r"int\s*\((\d+)\s*-\s*(\d+)\)")
+
+_TRUE_WORDS = {"true", "yes", "y", "1", "always"}
+# "Sometimes" is the middle MCQ option: "bool" fields are yes / sometimes / no
+BOOL_VALUES = (True, "sometimes", False)
+_MIDDLE_WORDS = {"sometimes"}
+_FALSE_WORDS = {"false", "no", "n", "0", "never"}
+_EMPTY_WORDS = {"", "n/a", "na", "none", "null", "unknown"}
+
+
+# ============================================================
+# FIELD COERCERS
+# ============================================================
+# Each coercer returns (value, ok). ok=False marks the field invalid.
+
+def _normalize_token(text):
+    return re.sub(r"[\s_]+", "-", str(text).strip().strip("\"'").lower())
+
+
+def _enum_coercer(options):
+    allowed = frozenset(options)
+    lookup = {_normalize_token(o): o for o in options}
+    memo = {}
+
+    def resolve(text):
+        token = _normalize_token(text)
+        if token in lookup:
+            return lookup[token]
+        close = difflib.get_close_matches(token, list(lookup), n=1, cutoff=0.75)
+        if close:
+            return lookup[close[0]]
+        # "slow and thorough" / "mixed approach": accept a unique prefix match
+        prefixed = [o for key, o in lookup.items() if token.startswith(key) or key.startswith(token)]
+        return prefixed[0] if len(prefixed) == 1 else None
+
+    def coerce(value):
+        if isinstance(value, str) and value in allowed:
+            return value, True
+        if isinstance(value, list):
+            for item in value:
+                coerced, ok = coerce(item)
+                if ok:
+                    return coerced, True
+            return None, False
+        if not isinstance(value, str):
+            return None, False
+        if value in memo:
+            match = memo[value]
+        else:
+            match = resolve(value)
+            if len(memo) < 4096:
+                memo[value] = match
+        return match, match is not None
+    return coerce
+
+
+def _to_number(value):
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return value
+    if isinstance(value, str):
+        match = _NUMBER.search(value)
+        return float(match.group()) if match else None
+    return None
+
+
+def _int_coercer(low=None, high=None):
+    def coerce(value):
+        if value is None or (isinstance(value, str) and value.strip().lower() in _EMPTY_WORDS):
+            return None, True
+        number = _to_number(value)
+        if number is None:
+            return None, False
+        number = int(round(number))
+        if low is not None:
+            number = max(low, min(high, number))
+        return number, True
+    return coerce
+
+
+def _bool_coerce(value):
+    if isinstance(value, bool):
+        return value, True
+    if isinstance(value, str):
+        word = value.strip().lower()
+        if word in _TRUE_WORDS:
+            return True, True
+        if word in _FALSE_WORDS:
+            return False, True
+        if word in _MIDDLE_WORDS:
+            return word, True
+    if isinstance(value, (int, float)):
+        return bool(value), True
+    return None, False
+
+
+def _string_coerce(value):
+    if value is None:
+        return "N/A", True
+    if isinstance(value, str):
+        return value, True
+    if isinstance(value, list):
+        return ", ".join(str(v) for v in value), True
+    return str(value), True
+
+
+def _compile_field(spec):
+    """Turn one schema type description into a coercer."""
+    if isinstance(spec, list):
+        return _enum_coercer(spec)
+    scale = _SCALE.match(spec)
+    if scale:
+        return _int_coercer(int(scale.group(1)), int(scale.group(2)))
+    if spec == "int":
+        return _int_coercer()
+    if spec == "bool":
+        return _bool_coerce
+    return _string_coerce
+
+
+# ============================================================
+# COMPILED VALIDATOR
+# ============================================================
+
+class ProfileValidator:
+    """
+    Validator compiled from a profile schema.
+
+    Attributes:
+        sections: {section: ((field, coercer), ...)} in schema order
+    """
+
+    def __init__(self, schema=USER_PROFILE_SCHEMA):
+        body = schema["learning_profile"]
+        self.schema = body
+        self.sections = {
+            section: tuple((field, _compile_field(spec)) for field, spec in fields.items())
+            for section, fields in body.items()
+            if isinstance(fields, dict)
+        }
+
+    def validate(self, profile):
+        """
+        Coerce a profile to the schema.
+
+        Args:
+            profile: Parsed LLM output, with or without the "learning_profile" wrapper
+
+        Returns:
+            tuple: (profile, invalid_fields)
+                profile: {"learning_profile": {...}} with only schema fields
+                invalid_fields: list of "section.field" that were missing or unusable
+        """
+        data = profile.get("learning_profile", profile) if isinstance(profile, dict) else {}
+        result = {}
+        invalid = []
+
+        for section, fields in self.sections.items():
+            source = data.get(section)
+            if not isinstance(source, dict):
+                source = {}
+            target = result[section] = {}
+            for field, coerce in fields:
+                if field not in source:
+                    target[field] = None
+                    invalid.append(f"{section}.{field}")
+                    continue
+                value, ok = coerce(source[field])
+                target[field] = value
+                if not ok:
+                    invalid.append(f"{section}.{field}")
+
+        summary = data.get("summary")
+        if isinstance(summary, str) and summary.strip():
+            result["summary"] = summary
+        else:
+            result["summary"] = "N/A"
+            invalid.append("summary")
+
+        return {"learning_profile": result}, invalid
+
+    def validate_many(self, profiles):
+        """Validate a batch of profiles; returns a list of (profile, invalid_fields)."""
+        validate = self.validate
+        return [validate(p) for p in profiles]
+
+
+_VALIDATOR = ProfileValidator()
+
+
+def validate_profile(profile):
+    """Validate one profile with the validator compiled from USER_PROFILE_SCHEMA."""
+    return _VALIDATOR.validate(profile)
+
+
+def validate_many(profiles):
+    """Validate a batch of profiles with the compiled validator."""
+    return _VALIDATOR.validate_many(profiles)
+
+
+# ============================================================
+# STRUCTURED OUTPUT SCHEMA
+# ============================================================
+
+def _json_type(spec):
+    if isinstance(spec, list):
+        return {"type": "string", "enum": list(spec)}
+    if spec.startswith("int"):
+        return {"type": ["integer", "null"]}
+    if spec == "bool":
+        return {"enum": list(BOOL_VALUES)}
+    return {"type": "string"}
+
+
+def _object(properties):
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def build_response_format(fields=None, schema=USER_PROFILE_SCHEMA, include_summary=True):
+    """
+    Build a strict JSON-schema response_format for the chat completions API.
+
+    Args:
+        fields: Optional list of (section, field) to restrict the schema to.
+                None means every field.
+        schema: Profile schema (defaults to USER_PROFILE_SCHEMA)
+        include_summary: Whether the summary string is requested
+
+    Returns:
+        dict: Value for the response_format argument
+    """
+    body = schema["learning_profile"]
+    wanted = None if fields is None else set(fields)
+    sections = {}
+    for section, section_fields in body.items():
+        if not isinstance(section_fields, dict):
+            continue
+        props = {
+            field: _json_type(spec) for field, spec in section_fields.items()
+            if wanted is None or (section, field) in wanted
+        }
+        if props:
+            sections[section] = _object(props)
+    if include_summary:
+        sections["summary"] = {"type": "string"}
+
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": "learning_profile",
+            "strict": True,
+            "schema": _object({"learning_profile": _object(sections)}),
+        },
+    }
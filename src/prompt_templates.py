@@ -0,0 +1,273 @@
+"""
+prompt_templates.py - Precompiled Extraction Prompt
+
+The full extraction prompt is ~6k characters of static instructions plus
+the schema, with only the interview responses changing per user. This
+module renders the static part ONCE per schema/prompt version and keeps it
+as two strings around the responses slot, so building a prompt is a
+single json.dumps plus a concatenation.
+
+The compiled template carries a version hash of everything that shapes
+the extraction (prompt text, schema, field rules, and the text of the
+other extraction prompts passed as extra_texts). Caches key on it, so
+editing a prompt or the schema invalidates cached profiles without a
+manual PROMPT_VERSION bump.
+
+Usage:
+    from prompt_templates import extraction_template
+
+    template = extraction_template()
+    prompt = template.render(responses)
+    cache_version = template.version
+
+Last updated: January 2026
+"""
+
+import hashlib
+import json
+from functools import lru_cache
+
+from user_profile_schema import USER_PROFILE_SCHEMA
+from preference_parameters import FIELDS_BY_SECTION
+
+# Bump whenever the extraction prompts change, so cached results are not reused
+PROMPT_VERSION = "2026-01-37fields"
+
+_RESPONSES_SLOT = "\x00RESPONSES\x00"
+
+
+# ============================================================
+# TEMPLATE TEXT
+# ============================================================
+
+def _template_text(schema_json):
+    """The full extraction prompt with a slot for the responses JSON."""
+    return f"""You are an expert educational psychologist analyzing a student's interview responses to build their personalized learning profile.
+
+## YOUR TASK
+Carefully read all interview responses and extract the student's learning preferences into the JSON schema provided below. You must interpret open-ended answers intelligently and infer the best matching values.
+
+## TARGET SCHEMA
+```json
+{schema_json}
+```
+
+## EXTRACTION RULES
+
+### SECTION 1: BACKGROUND (5 fields)
+Extract directly from interview responses:
+- **academic_program**: Student's degree/program
+- **semester**: Current semester number (integer)
+- **current_focus**: Current subjects they're studying
+- **goals**: Their academic goals for the semester
+- **age**: Student's age (optional, may be null)
+
+### SECTION 2: LEARNING PREFERENCES (14 fields)
+
+**explanation_preference:** 
+- "step-by-step" = wants detailed, sequential explanations
+- "high-level" = prefers overview/big picture first
+- "mixed" = depends on topic or wants both
+
+**examples_preference:**
+- "examples-first" = learns better seeing examples before theory
+- "theory-first" = wants concepts explained before examples
+- "mixed" = likes both approaches
+
+**example_type:**
+- "real-world" = practical, relatable scenarios
+- "mathematical" = formal, numerical examples
+- "code-based" = programming examples
+- "analogies" = metaphors and comparisons
+- "diagrams" = visual representations
+- "mixed" = multiple types depending on topic
+
+**example_quantity:**
+- "multiple" = prefers seeing several examples
+- "one-strong" = prefers one well-explained comprehensive example
+
+**detail_level:** Scale 1-10 (1=brief, 10=very detailed)
+
+**guidance_preference:**
+- "structured" = wants clear guidance and direction
+- "independent" = prefers to explore on their own
+- "balanced" = mix of both
+
+**focus_style:**
+- "explorer" = enjoys exploring tangents and related topics
+- "focused" = prefers staying on track with main objective
+- "balanced" = mix depending on context
+
+**uses_analogies:** true, false or "sometimes" - whether analogies help them learn
+
+**presentation_style:**
+- "visual" = prefers diagrams, charts, visual aids
+- "verbal" = prefers text-based, written explanations
+- "mixed" = comfortable with both
+
+**practice_problems:** true, false or "sometimes" - whether they want practice problems included
+
+**code_examples:**
+- "yes" = always wants code examples
+- "if-necessary" = only when relevant
+- "no" = prefers conceptual explanations
+
+**pacing:**
+- "fast" = quick pace, hit key points
+- "moderate" = balanced pace
+- "slow-thorough" = take time, ensure deep understanding
+
+**learner_type:**
+- "analytical" = breaks down problems logically, wants to understand 'why'
+- "intuitive" = grasps concepts quickly, comfortable with ambiguity
+- "example-driven" = learns best through concrete examples
+- "pattern-based" = looks for patterns and connections
+- "sequential" = prefers linear, step-by-step progression
+
+**repetition_preference:**
+- "spaced-repetition" = review at intervals over time
+- "repeated-summaries" = multiple summaries in one session
+- "minimal-repetition" = understand once, move on
+
+### SECTION 3: COMMUNICATION STYLE (5 fields)
+
+**tone:**
+- "formal" = academic, professional style
+- "conversational" = friendly, casual style
+
+**feedback_style:**
+- "supportive-gentle" = encouraging, soft corrections with praise
+- "supportive-direct" = kind but clear about what's wrong
+- "direct-critical" = straightforward, no sugarcoating
+
+**response_depth:**
+- "quick" = brief, to-the-point answers
+- "detailed" = thorough, comprehensive explanations
+
+**question_engagement:** true, false or "sometimes" - whether AI should ask questions back
+
+**summaries_after_explanation:** true, false or "sometimes" - whether they want summaries after explanations
+
+### SECTION 4: EMOTIONAL PATTERNS (8 fields)
+
+**stress_response:**
+- "push-through" = keeps working despite stress
+- "pause" = takes breaks to reset
+- "avoid" = tends to avoid stressful tasks
+- "depends" = varies by situation
+
+**overwhelm_support:**
+- "encouragement" = needs emotional support
+- "step-by-step" = needs tasks broken down
+- "break" = needs to step away
+
+**confidence_level:** Scale 1-10 (1=not confident, 10=very confident)
+
+**mood_sharing_comfort:** Scale 1-10 (1=very uncomfortable, 10=very comfortable sharing mood)
+
+**help_seeking_comfort:** Scale 1-10 (1=very uncomfortable, 10=very comfortable asking for help)
+
+**motivation_drivers:** String - what motivates them (summarize in 1-2 sentences)
+
+**common_blockers:** String - what blocks their progress (summarize in 1-2 sentences)
+
+**learning_challenges:** String - specific challenges they face (summarize in 1-2 sentences)
+
+### SECTION 5: STUDY BEHAVIOR (5 fields)
+
+**study_rhythm:**
+- "regular" = consistent study throughout semester
+- "cramming" = intensive study near deadlines
+- "mixed" = combination of both
+
+**focus_duration:** String - how long they can focus (e.g., "30-45 minutes", "1-2 hours")
+
+**attention_span:** Scale 1-10 (1=easily distracted, 10=very focused)
+
+**recovery_strategy:**
+- "short-break" = takes brief breaks
+- "task-switch" = changes to different task
+- "goal-review" = reminds themselves of goals
+- "external-reminder" = uses external prompts/tools
+
+**mistake_handling:**
+- "immediate-fix" = wants to fix mistakes right away
+- "deferred" = moves on and revisits later
+
+### For SCALE fields (1-10):
+- Extract the number if explicitly given in the response
+- If described qualitatively, estimate appropriately:
+  - "very low/never/minimal" = 1-3
+  - "moderate/sometimes/average" = 4-6
+  - "high/often/very" = 7-9
+  - "extremely/always" = 10
+
+### For the SUMMARY field:
+Write a 2-3 sentence paragraph that captures the student's overall learning personality. Include their key strengths, preferences, and areas where they need support.
+
+## INTERVIEW RESPONSES TO ANALYZE
+```json
+{_RESPONSES_SLOT}
+```
+
+## IMPORTANT NOTES
+- If information for a field is not available, use "N/A" for strings, null for numbers, or your best educated guess based on other responses
+- The situational questions (about planning a week, structuring study time, ideal environment) reveal a LOT about study behavior, attention span, and emotional patterns - analyze them carefully
+- Look for patterns across multiple answers that point to the same preference
+- The student's description of "good learning moments" vs "difficult moments" reveals their learning preferences
+- The comparison questions (A vs B) directly inform many categorical fields
+- Rating questions with 0-10 scales can be mapped directly to scale fields
+
+## OUTPUT FORMAT
+Return ONLY valid JSON that matches the schema structure. No markdown code fences, no explanations, just the JSON object.
+"""
+
+
+# ============================================================
+# COMPILED TEMPLATE
+# ============================================================
+
+class PromptTemplate:
+    """
+    Extraction prompt with the static text pre-rendered.
+
+    Attributes:
+        head: Everything before the responses JSON
+        tail: Everything after it
+        version: PROMPT_VERSION plus a short hash of the prompt, schema and field rules
+    """
+
+    def __init__(self, head, tail, version):
+        self.head = head
+        self.tail = tail
+        self.version = version
+
+    def render(self, responses):
+        """Splice one user's responses into the prompt."""
+        return self.head + json.dumps(responses, indent=2) + self.tail
+
+
+@lru_cache(maxsize=4)
+def extraction_template(prompt_version=PROMPT_VERSION, extra_texts=()):
+    """
+    Compile the full extraction prompt for USER_PROFILE_SCHEMA.
+
+    Compiled once per prompt version and process.
+
+    Args:
+        extra_texts: Tuple of the static text of other prompts whose output
+            is cached with this version (hybrid and field-repair prompts)
+
+    Returns:
+        PromptTemplate
+    """
+    text = _template_text(json.dumps(USER_PROFILE_SCHEMA, indent=2))
+    head, tail = text.split(_RESPONSES_SLOT)
+
+    digest = hashlib.sha256()
+    digest.update(text.encode("utf-8"))
+    # The hybrid prompt is built from the field rules, so they are part of the version too
+    digest.update(json.dumps(FIELDS_BY_SECTION, sort_keys=True, default=str).encode("utf-8"))
+    for extra in extra_texts:
+        digest.update(extra.encode("utf-8"))
+    return PromptTemplate(head, tail, f"{prompt_version}-{digest.hexdigest()[:12]}")
@@ -0,0 +1,141 @@
+"""
+question_index.py - Cached, Pre-Indexed Interview Questions
+
+interviewQuestions.json used to be read and parsed on every Streamlit
+rerun. This module parses it once per process into an immutable index and
+only reloads it when the file's modification time changes.
+
+The index holds:
+    - section order and section lengths
+    - every question (type, options, scale, ...) in one flat tuple
+    - flat global positions, so moving to the next/previous question and
+      looking up a response key are O(1) without touching the file
+
+Usage:
+    from question_index import get_question_index
+
+    index = get_question_index()
+    question = index.question(section_idx, question_idx)
+    text = index.question_text("SECTION 2 — Learning Preferences-3")
+
+Last updated: January 2026
+"""
+
+import json
+import os
+import threading
+from types import MappingProxyType
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUESTIONS_FILE = os.path.join(BASE_DIR, "docs", "interviewQuestions.json")
+
+SCRIPT_KEYS = ("OPENING SCRIPT", "CLOSING SCRIPT")
+
+_CACHE = {}   # path -> (mtime_ns, QuestionIndex)
+_LOCK = threading.Lock()
+
+
+# ============================================================
+# INDEX
+# ============================================================
+
+def _freeze_question(question):
+    frozen = dict(question)
+    if "options" in frozen:
+        frozen["options"] = tuple(frozen["options"])
+    if "scale_labels" in frozen:
+        frozen["scale_labels"] = MappingProxyType(dict(frozen["scale_labels"]))
+    return MappingProxyType(frozen)
+
+
+class QuestionIndex:
+    """
+    Immutable view of the interview questions.
+
+    Attributes:
+        sections: Section names in interview order
+        section_lengths: Number of questions per section
+        questions: Every question, flattened in interview order
+        scripts: {"OPENING SCRIPT": text, "CLOSING SCRIPT": text}
+    """
+
+    def __init__(self, data):
+        self.scripts = MappingProxyType({
+            key: data[key]["script"] for key in SCRIPT_KEYS if key in data
+        })
+        self.sections = tuple(key for key in data if key not in SCRIPT_KEYS)
+        self.section_lengths = tuple(len(data[s]) for s in self.sections)
+
+        offsets = []
+        questions = []
+        positions = []
+        keys = {}
+        for s, section in enumerate(self.sections):
+            offsets.append(len(questions))
+            for q, question in enumerate(data[section]):
+                keys[f"{section}-{q}"] = len(questions)
+                positions.append((s, q))
+                questions.append(_freeze_question(question))
+
+        self.section_offsets = tuple(offsets)
+        self.questions = tuple(questions)
+        self.positions = tuple(positions)
+        self.keys = MappingProxyType(keys)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def global_index(self, section_idx, question_idx):
+        return self.section_offsets[section_idx] + question_idx
+
+    def question(self, section_idx, question_idx):
+        return self.questions[self.global_index(section_idx, question_idx)]
+
+    def section_questions(self, section_idx):
+        start = self.section_offsets[section_idx]
+        return self.questions[start:start + self.section_lengths[section_idx]]
+
+    def response_key(self, section_idx, question_idx):
+        """Key used in interviewResponse.json, e.g. "SECTION 1 — Personal Background-0"."""
+        return f"{self.sections[section_idx]}-{question_idx}"
+
+    def next_position(self, section_idx, question_idx):
+        """(section_idx, question_idx) after this one; (len(sections), 0) after the last question."""
+        i = self.global_index(section_idx, question_idx) + 1
+        return self.positions[i] if i < len(self.positions) else (len(self.sections), 0)
+
+    def previous_position(self, section_idx, question_idx):
+        """(section_idx, question_idx) before this one; the first question stays put."""
+        i = self.global_index(section_idx, question_idx) - 1
+        return self.positions[max(i, 0)]
+
+    def question_text(self, response_key, default="Question not found"):
+        """Look up the question text for a response key."""
+        i = self.keys.get(response_key)
+        return self.questions[i].get("question", default) if i is not None else default
+
+
+# ============================================================
+# CACHED LOADING
+# ============================================================
+
+def get_question_index(path=QUESTIONS_FILE):
+    """
+    Return the question index, parsing the file only when it changed.
+
+    Raises:
+        OSError / json.JSONDecodeError if the file is missing or corrupted
+    """
+    mtime = os.stat(path).st_mtime_ns
+    cached = _CACHE.get(path)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    with _LOCK:
+        cached = _CACHE.get(path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+        with open(path, "r", encoding="utf-8") as f:
+            index = QuestionIndex(json.load(f))
+        _CACHE[path] = (mtime, index)
+        return index
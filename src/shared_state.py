@@ -0,0 +1,171 @@
+"""
+shared_state.py - Cross-Process Locking and Version Counters for JSON Files
+
+Several app replicas (Streamlit workers, api_server processes) can serve
+the same data directory. Thread locks only protect writers inside one
+process, so read-modify-write updates of a shared JSON file (a chat, the
+progress tracker, the extraction history) could still lose updates between
+processes. This module coordinates them through the file system:
+
+    - every update runs under an exclusive lock on <file>.lock, held with
+      flock (fcntl) on POSIX or msvcrt.locking on Windows
+    - every update increments a counter in <file>.version, so a replica can
+      tell cheaply whether its in-memory copy (e.g. the chat cached in
+      st.session_state) is stale and must be reloaded
+
+Files are still replaced atomically (utils.write_json_atomic), so plain
+readers never see a half-written file and need no lock.
+
+Usage:
+    from shared_state import update_json, version
+
+    def add(data):
+        data.setdefault(date, []).append(message)
+
+    update_json(path, add, default={})
+    if version(path) != cached_version:
+        reload()
+
+Last updated: January 2026
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from utils import write_json_atomic
+
+try:
+    import fcntl
+except ImportError:          # Windows
+    fcntl = None
+    import msvcrt
+
+LOCK_SUFFIX = ".lock"
+VERSION_SUFFIX = ".version"
+
+_THREAD_LOCKS = {}
+_GUARD = threading.Lock()
+
+
+# ============================================================
+# LOCKING
+# ============================================================
+
+def _thread_lock(path):
+    with _GUARD:
+        return _THREAD_LOCKS.setdefault(path, threading.Lock())
+
+
+def _acquire(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        return
+    f.seek(0)
+    while True:
+        try:
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+            return
+        except OSError:      # LK_LOCK gives up after ~10 s; keep waiting
+            time.sleep(0.05)
+
+
+def _release(f):
+    if fcntl:
+        fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+    else:
+        f.seek(0)
+        msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def locked(path):
+    """Hold the exclusive lock of path, across threads and processes."""
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    with _thread_lock(path):
+        with open(path + LOCK_SUFFIX, "a+b") as f:
+            _acquire(f)
+            try:
+                yield
+            finally:
+                _release(f)
+
+
+# ============================================================
+# VERSIONS
+# ============================================================
+
+def version(path):
+    """Number of updates made to path through this module (0 if none)."""
+    try:
+        with open(path + VERSION_SUFFIX, "r", encoding="utf-8") as f:
+            return int(f.read().strip() or 0)
+    except (OSError, ValueError):
+        return 0
+
+
+def _bump_version(path):
+    new_version = version(path) + 1
+    tmp_path = path + VERSION_SUFFIX + ".tmp"   # only the lock holder writes it
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        f.write(str(new_version))
+    os.replace(tmp_path, path + VERSION_SUFFIX)
+    return new_version
+
+
+# ============================================================
+# JSON DOCUMENTS
+# ============================================================
+
+def _read_json(path, default):
+    if not os.path.exists(path):
+        return default
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (json.JSONDecodeError, OSError):
+        return default
+
+
+def read_json(path, default=None):
+    """
+    Read a document together with the version it was read at.
+
+    Returns:
+        tuple: (data, version) - data is default if the file is missing or corrupt
+    """
+    while True:
+        before = version(path)
+        data = _read_json(path, default)
+        if version(path) == before:
+            return data, before
+
+
+def update_json(path, update, default=None, indent=2):
+    """
+    Read-modify-write a JSON document under its lock.
+
+    Args:
+        path: The JSON file
+        update: Called with the current data, which it mutates in place
+        default: Factory value used when the file is missing or corrupt
+            (copied, so a shared literal is never mutated)
+        indent: json indentation of the written file
+
+    Returns:
+        tuple: (result of update, new version)
+    """
+    with locked(path):
+        data = _read_json(path, json.loads(json.dumps(default)))
+        result = update(data)
+        write_json_atomic(path, data, indent=indent)
+        return result, _bump_version(path)
+
+
+def write_json(path, data, indent=4):
+    """Replace a whole document under its lock (so it cannot interleave with update_json)."""
+    with locked(path):
+        write_json_atomic(path, data, indent=indent)
+        return _bump_version(path)
@@ -0,0 +1,126 @@
+"""
+streaming_json.py - Incremental Parser for Streamed Profile JSON
+
+When the extraction is streamed, the profile arrives a few characters at a
+time. Waiting for the whole object before showing anything means the user
+stares at a spinner for the full LLM latency. This parser is fed each
+chunk as it arrives and reports every top-level profile member
+(background, learning_preferences, ..., summary) as soon as its value is
+complete, i.e. when its closing brace (or closing quote) is seen.
+
+It understands both {"learning_profile": {...}} and an unwrapped profile
+object. It only tracks structure (strings, escapes, nesting); each
+completed member is decoded with json.loads.
+
+Usage:
+    from streaming_json import SectionStreamParser
+
+    parser = SectionStreamParser()
+    for chunk in stream:
+        for name, value in parser.feed(chunk):
+            show(name, value)
+
+Last updated: January 2026
+"""
+
+import json
+
+_WRAPPER = "learning_profile"
+
+
+class SectionStreamParser:
+    """
+    Emits (member name, decoded value) for each completed profile member.
+
+    Attributes:
+        text: Everything fed so far
+        completed: Names of members already emitted
+    """
+
+    def __init__(self):
+        self.text = ""
+        self.completed = []
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._string_start = None
+        self._last_string = None
+        self._keys = {}            # depth -> key of the member being read
+        self._profile_depth = 1    # becomes 2 once the wrapper key is seen
+        self._value_start = None
+
+    def feed(self, chunk):
+        """
+        Add a chunk of model output.
+
+        Returns:
+            list: (name, value) pairs completed by this chunk
+        """
+        self.text += chunk or ""
+        emitted = []
+        text = self.text
+
+        while self._pos < len(text):
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    self._last_string = text[self._string_start:i + 1]
+                    if self._depth == self._profile_depth and self._value_start is not None:
+                        self._emit(i, emitted)
+                continue
+
+            if ch == '"':
+                self._in_string = True
+                self._string_start = i
+                self._begin_value(i)
+            elif ch == ":":
+                key = json.loads(self._last_string) if self._last_string else None
+                self._keys[self._depth] = key
+                if self._depth == 1 and key == _WRAPPER:
+                    self._profile_depth = 2
+            elif ch in "{[":
+                self._begin_value(i)
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == self._profile_depth and self._value_start is not None:
+                    # Scalar value ended by the closing brace of the profile
+                    self._emit(i - 1, emitted)
+                self._depth -= 1
+                if self._depth == self._profile_depth and self._value_start is not None:
+                    self._emit(i, emitted)
+            elif ch == ",":
+                if self._depth == self._profile_depth and self._value_start is not None:
+                    self._emit(i - 1, emitted)
+            elif not ch.isspace():
+                self._begin_value(i)
+
+        return emitted
+
+    def _begin_value(self, i):
+        """Remember where a member value starts (strings here are values, not keys)."""
+        if (self._depth == self._profile_depth and self._value_start is None
+                and self._keys.get(self._depth) is not None):
+            self._value_start = i
+
+    def _emit(self, end, emitted):
+        name = self._keys.get(self._profile_depth)
+        raw = self.text[self._value_start:end + 1].strip()
+        self._value_start = None
+        self._keys[self._profile_depth] = None
+        if name is None or name == _WRAPPER:
+            return
+        try:
+            value = json.loads(raw)
+        except json.JSONDecodeError:
+            return
+        self.completed.append(name)
+        emitted.append((name, value))
@@ -0,0 +1,486 @@
+"""
+study_analysis.py - Study Behavior Analysis of One Chat Day (no Streamlit)
+
+The analysis shared by the Feedback page (analyze_chatbot.py) and the HTTP
+service (api_server.py):
+
+    - turns one day of a subject's chat into a transcript
+    - measures the study time locally from the message timestamps
+      (study_sessions.py: active minutes, sessions, longest focus block)
+    - asks the LLM only for the qualitative JSON study-behavior analysis
+    - repairs broken JSON locally and re-requests only missing fields
+    - stores the result in the user's progress tracker
+    - caches every result by a hash of that day's messages, so a day is
+      only sent to the LLM again when its conversation changed
+    - re-analyzes a day incrementally: each result carries a watermark (the
+      messages it covers), and when messages were only appended since, the
+      LLM gets the previous analysis plus the new messages, not the whole day
+    - analyzes many days concurrently (bounded by MAX_WORKERS per process)
+
+Usage:
+    from study_analysis import analyze_day_cached, unanalyzed_days, analyze_days
+
+    analysis, repair_stats, mode = analyze_day_cached(subject, chat_data, "2026-01-15")
+    # mode: "cached", "incremental" or "full"
+    pending = unanalyzed_days(subject, chat_data, user_id)
+    for date, analysis, error in analyze_days(subject, chat_data, pending, user_id):
+        ...
+
+Last updated: January 2026
+"""
+
+import hashlib
+import json
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from extraction_cache import canonical_json
+from json_repair import loads_with_repair
+from shared_state import read_json, update_json
+from study_sessions import READING_MINUTES, SESSION_GAP_MINUTES, day_sessions, format_minutes, user_sessions
+from utils import estimate_tokens, get_openai_client
+from user_storage import analysis_cache_dir, progress_tracker_dir
+
+MODEL = "gpt-4o-mini"
+
+# Concurrent day analyses per process (shared by all sessions, so a burst of
+# "analyze all" clicks cannot exceed the API rate limit)
+MAX_WORKERS = 4
+
+_EXECUTOR = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="analysis")
+
+# Keys the study-behavior analysis must return, with what each one means
+# (the study time is measured locally and added afterwards)
+ANALYSIS_FIELDS = {
+    "date": "<YYYY-MM-DD>",
+    "summary": "<concise summary>",
+    "topics_covered": "<comma-separated topics>",
+    "confidence_level": "<number out of 10>",
+    "satisfaction_level": "<number out of 10>",
+    "mood": "<short description>",
+    "improvements": "<specific suggestions>",
+}
+
+
+# ============================================================
+# PROMPTS
+# ============================================================
+
+def build_chat_text(chat_data, date):
+    """
+    Convert chat history of a given date into a readable text
+    for LLM analysis (without timestamps; the study time is measured
+    locally, see study_sessions.py).
+    """
+    messages = chat_data.get(date, [])
+    lines = []
+
+    for msg in messages:
+        role = msg.get("role", "")
+        content = msg.get("content", "")
+
+        if role == "user":
+            lines.append(f"User: {content}")
+        elif role == "assistant":
+            lines.append(f"Assistant: {content}")
+
+    return "\n".join(lines)
+
+
+def build_analysis_prompt(date, chat_text, sessions):
+    return f"""
+You are an educational analyst AI.
+
+Below is a full chat conversation between a student and a tutor
+on {date}.
+
+The study time was measured from the message timestamps:
+{format_minutes(sessions["active_minutes"])} of active study in {sessions["sessions"]} session(s),
+longest focus block {format_minutes(sessions["longest_session_minutes"])}.
+Do NOT estimate the study time yourself; you may refer to these numbers.
+
+Your task:
+Analyze the student's study behavior in 2-4 concise sentences. You are talking to the student directly, so use "you" and "your".
+
+Return ONLY valid JSON.
+Do NOT include markdown.
+Do NOT include explanations.
+Do NOT include extra text.
+
+The JSON must follow EXACTLY this schema:
+
+{json.dumps(ANALYSIS_FIELDS, indent=2)}
+
+Conversation:
+{chat_text}
+"""
+
+
+def build_update_prompt(date, previous, new_text, sessions):
+    return f"""
+You are an educational analyst AI, updating the study-behavior analysis of
+a student's chat with a tutor on {date}. The student continued the chat
+after the analysis was written.
+
+Return ONLY valid JSON.
+Do NOT include markdown.
+Do NOT include explanations.
+
+The JSON must follow EXACTLY this schema and describe the WHOLE day
+(the previous analysis merged with the new messages):
+
+{json.dumps(ANALYSIS_FIELDS, indent=2)}
+
+The study time was measured from the message timestamps:
+{format_minutes(sessions["active_minutes"])} of active study in {sessions["sessions"]} session(s),
+longest focus block {format_minutes(sessions["longest_session_minutes"])}.
+Do NOT estimate the study time yourself; you may refer to these numbers.
+
+Previous analysis:
+{json.dumps(previous, ensure_ascii=False)}
+
+New messages:
+{new_text}
+"""
+
+
+# ============================================================
+# ANALYSIS
+# ============================================================
+
+def missing_analysis_fields(analysis):
+    """Return the analysis keys that are absent or empty."""
+    return [k for k in ANALYSIS_FIELDS if analysis.get(k) in (None, "")]
+
+
+def repair_analysis_fields(analysis, missing, chat_text, original_prompt):
+    """
+    Ask only for the missing analysis fields instead of re-running the analysis.
+
+    The partial analysis is sent as context; the transcript is only included
+    when there is no summary to build on.
+
+    Returns:
+        tuple: (analysis, stats)
+    """
+    target = {k: ANALYSIS_FIELDS[k] for k in missing}
+    context = f"Partial analysis:\n{json.dumps(analysis, ensure_ascii=False)}"
+    if not analysis.get("summary"):
+        context += f"\n\nConversation:\n{chat_text}"
+
+    prompt = f"""
+You are completing a study-behavior analysis of a student's chat session.
+Some fields are missing. Return ONLY valid JSON with exactly these keys:
+
+{json.dumps(target, indent=2)}
+
+{context}
+"""
+    response = get_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": "You analyze study behavior."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.4,
+        response_format={"type": "json_object"},
+    )
+    patch, _ = loads_with_repair(response.choices[0].message.content)
+    if isinstance(patch, dict):
+        analysis.update({k: patch[k] for k in missing if patch.get(k) not in (None, "")})
+
+    repair_tokens = estimate_tokens(prompt)
+    return analysis, {
+        "fields_requested": len(missing),
+        "prompt_tokens_est": repair_tokens,
+        # A repair that needs the transcript can cost more than it saves
+        "tokens_saved_est": max(0, estimate_tokens(original_prompt) - repair_tokens),
+    }
+
+
+def add_session_fields(analysis, sessions):
+    """Add the locally measured study time to an analysis."""
+    analysis.update(sessions)
+    analysis["estimated_study_time"] = format_minutes(sessions["active_minutes"])
+    return analysis
+
+
+def analyze_day(chat_data, date):
+    """
+    Analyze the study behavior of one chat day: the LLM writes the
+    qualitative part, the study time comes from day_sessions.
+
+    Args:
+        chat_data: {date: [messages]} of one subject
+        date: The day to analyze
+
+    Returns:
+        tuple: (analysis, repair_stats) - repair_stats is None when no repair was needed
+
+    Raises:
+        ValueError if the day has no messages or the LLM result stays incomplete
+    """
+    chat_text = build_chat_text(chat_data, date)
+    if not chat_text.strip():
+        raise ValueError(f"No chat content found for {date}")
+
+    sessions = day_sessions(chat_data.get(date, []))
+    prompt = build_analysis_prompt(date, chat_text, sessions)
+    analysis, repair_stats = _request_analysis(prompt, date, chat_text)
+    return add_session_fields(analysis, sessions), repair_stats
+
+
+def compact_state(analysis):
+    """The qualitative fields of an analysis: all an incremental update needs to know."""
+    return {k: analysis[k] for k in ANALYSIS_FIELDS if analysis.get(k) not in (None, "")}
+
+
+def update_day(chat_data, date, previous, analyzed):
+    """
+    Update a previous analysis of a day with the messages after it.
+
+    Only the previous analysis (compact_state) and the new messages are
+    sent, so the prompt grows with the new activity, not with the day.
+
+    Args:
+        previous: The analysis of the day's first `analyzed` messages
+
+    Returns:
+        tuple: (analysis, repair_stats)
+    """
+    messages = chat_data.get(date, [])
+    sessions = day_sessions(messages)
+    state = compact_state(previous)
+    new_text = build_chat_text({date: messages[analyzed:]}, date)
+    if not new_text.strip():
+        return add_session_fields(state, sessions), None
+
+    prompt = build_update_prompt(date, state, new_text, sessions)
+    analysis, repair_stats = _request_analysis(prompt, date, new_text, base=state)
+    return add_session_fields(analysis, sessions), repair_stats
+
+
+def _request_analysis(prompt, date, chat_text, base=None):
+    """
+    Send an analysis prompt and parse the JSON answer.
+
+    Fields the answer leaves empty are taken from base (the previous
+    analysis of an incremental update); what is still missing is
+    re-requested on its own.
+    """
+    response = get_openai_client().chat.completions.create(
+        model=MODEL,
+        messages=[
+            {"role": "system", "content": "You analyze study behavior."},
+            {"role": "user", "content": prompt}
+        ],
+        temperature=0.4,
+    )
+    analysis_text = response.choices[0].message.content.strip()
+
+    # Fix broken JSON locally, then re-request only missing fields
+    analysis, _ = loads_with_repair(analysis_text)
+    if not isinstance(analysis, dict):
+        analysis = {}
+    if base:
+        analysis = {**base, **{k: v for k, v in analysis.items() if v not in (None, "")}}
+    if not analysis.get("date"):
+        analysis["date"] = date
+
+    repair_stats = None
+    missing = missing_analysis_fields(analysis)
+    if missing:
+        analysis, repair_stats = repair_analysis_fields(analysis, missing, chat_text, prompt)
+        if missing_analysis_fields(analysis):
+            raise ValueError(f"LLM did not return valid JSON:\n{analysis_text}")
+    return analysis, repair_stats
+
+
+def session_entry(sessions):
+    """The measured study time as progress tracker fields."""
+    return {
+        "Time spent on the subject": format_minutes(sessions["active_minutes"]),
+        "Active minutes": sessions["active_minutes"],
+        "Study sessions": sessions["sessions"],
+        "Longest focus block (minutes)": sessions["longest_session_minutes"],
+    }
+
+
+def progress_entry(analysis):
+    """The part of an analysis that goes into the progress tracker."""
+    return {
+        "Summary": analysis["summary"],
+        "Topics covered": analysis["topics_covered"],
+        **session_entry(analysis),
+        "Mood": analysis["mood"],
+        "Satisfaction level": analysis["satisfaction_level"]
+    }
+
+
+# ============================================================
+# PROGRESS TRACKER
+# ============================================================
+
+def progress_path(subject, user_id=None):
+    return os.path.join(progress_tracker_dir(user_id), f"{subject}.json")
+
+
+def load_progress(subject, user_id=None):
+    """Return {date: entry} for a subject ({} if missing or corrupted)."""
+    data, _ = read_json(progress_path(subject, user_id), default={})
+    return data
+
+
+def save_progress(subject, date, entry, user_id=None):
+    # Save ONE object per date (fields overwritten, others kept); merged
+    # under the file's lock so analyses saved by other replicas are kept
+    def update(data):
+        data[date] = {**data.get(date, {}), **entry}
+    update_json(progress_path(subject, user_id), update, default={})
+
+
+def save_session_progress(user_id=None, sessions=None):
+    """
+    Store the measured study time of every chat day in the progress
+    trackers, without any LLM call (one locked write per subject).
+
+    Args:
+        sessions: {subject: {date: stats}} (default: study_sessions.user_sessions)
+    """
+    if sessions is None:
+        sessions = user_sessions(user_id)
+
+    for subject, days in sessions.items():
+        def update(data, days=days):
+            for date, stats in days.items():
+                data[date] = {**data.get(date, {}), **session_entry(stats)}
+        update_json(progress_path(subject, user_id), update, default={})
+
+
+# ============================================================
+# PER-DAY CACHE
+# ============================================================
+
+def analysis_cache_path(subject, user_id=None):
+    return os.path.join(analysis_cache_dir(user_id), f"{subject}.json")
+
+
+def day_hash(messages):
+    """
+    Hash of what the analysis sees of one day (role, content, timestamp) plus
+    the prompt fields, model and session rules, so feedback clicks do not
+    invalidate it.
+    """
+    transcript = [
+        [m.get("role", ""), m.get("content", ""), m.get("timestamp", "")]
+        for m in messages if m.get("role") in ("user", "assistant")
+    ]
+    payload = {"model": MODEL, "fields": ANALYSIS_FIELDS, "messages": transcript,
+               "sessions": [SESSION_GAP_MINUTES, READING_MINUTES]}
+    return hashlib.sha256(canonical_json(payload).encode("utf-8")).hexdigest()
+
+
+def watermark(messages):
+    """How far an analysis of these messages reaches: message count and last timestamp."""
+    return {"messages": len(messages), "timestamp": messages[-1].get("timestamp") if messages else None}
+
+
+def _cache_entry(subject, date, user_id):
+    cache, _ = read_json(analysis_cache_path(subject, user_id), default={})
+    return cache.get(date)
+
+
+def analyzed_prefix(entry, messages):
+    """
+    Number of leading messages a cached analysis already covers, if the
+    day only grew since (its first messages still hash to the cached
+    hash); None when the day has to be analyzed from scratch.
+    """
+    analyzed = (entry or {}).get("watermark", {}).get("messages", 0)
+    if 0 < analyzed < len(messages) and day_hash(messages[:analyzed]) == entry["hash"]:
+        return analyzed
+    return None
+
+
+def _store_analysis(subject, date, messages, analysis, user_id):
+    mark = watermark(messages)
+
+    def update(cache):
+        cache[date] = {"hash": day_hash(messages), "watermark": mark, "analysis": analysis}
+    update_json(analysis_cache_path(subject, user_id), update, default={})
+    save_progress(subject, analysis["date"], {
+        **progress_entry(analysis),
+        "Analyzed messages": mark["messages"],
+        "Analyzed up to": mark["timestamp"],
+    }, user_id)
+
+
+def analyze_day_cached(subject, chat_data, date, user_id=None):
+    """
+    analyze_day, but only as much as needed: served from the cache when
+    the day did not change, updated incrementally when messages were only
+    appended, analyzed in full otherwise. New results are cached and
+    saved to the progress tracker.
+
+    Returns:
+        tuple: (analysis, repair_stats, mode) - mode is "cached",
+            "incremental" or "full"
+    """
+    messages = chat_data.get(date, [])
+    entry = _cache_entry(subject, date, user_id)
+    if entry and entry.get("hash") == day_hash(messages):
+        return entry["analysis"], None, "cached"
+
+    analyzed = analyzed_prefix(entry, messages)
+    if analyzed:
+        analysis, repair_stats = update_day(chat_data, date, entry["analysis"], analyzed)
+        mode = "incremental"
+    else:
+        analysis, repair_stats = analyze_day(chat_data, date)
+        mode = "full"
+    _store_analysis(subject, date, messages, analysis, user_id)
+    return analysis, repair_stats, mode
+
+
+def unanalyzed_days(subject, chat_data, user_id=None):
+    """Chat days with messages whose current conversation has no cached analysis, newest first."""
+    cache, _ = read_json(analysis_cache_path(subject, user_id), default={})
+    return sorted(
+        (date for date, messages in chat_data.items()
+         if isinstance(messages, list) and messages
+         and cache.get(date, {}).get("hash") != day_hash(messages)),
+        reverse=True,
+    )
+
+
+def analyze_days(subject, chat_data, dates, user_id):
+    """
+    Analyze several days concurrently (at most MAX_WORKERS LLM calls at a time).
+
+    Each day goes through analyze_day_cached (so grown days are updated
+    incrementally) and is cached and saved to the progress tracker as soon
+    as it finishes. Returns an iterator of (date, analysis, error) in
+    completion order; error is None on success, analysis is None on failure.
+
+    user_id is required: the worker threads have no Streamlit session, so
+    None would silently resolve to the default user there.
+    """
+    if user_id is None:
+        raise ValueError("analyze_days needs an explicit user_id")
+    futures = {
+        _EXECUTOR.submit(analyze_day_cached, subject, chat_data, date, user_id): date
+        for date in dates
+    }
+    return _in_completion_order(futures)
+
+
+def _in_completion_order(futures):
+    """Yield (date, analysis, error) of {future: date} as the futures finish."""
+    for future in as_completed(futures):
+        date = futures[future]
+        try:
+            analysis, _, _ = future.result()
+        except Exception as e:
+            yield date, None, e
+            continue
+        yield date, analysis, None
@@ -0,0 +1,219 @@
+"""
+study_sessions.py - Study Sessions from Message Timestamps (no LLM)
+
+Every chat message carries an ISO timestamp, so how long a student studied
+does not have to be guessed by the LLM from the transcript. The messages of
+each day are split into study sessions wherever the student was inactive
+for longer than SESSION_GAP_MINUTES, giving per day:
+
+    active_minutes            sum of the session lengths (first to last
+                              message, plus READING_MINUTES for reading the
+                              last reply of the session)
+    sessions                  number of sessions
+    longest_session_minutes   longest uninterrupted focus block
+
+All days of all of a user's subjects are sessionized together with a few
+vectorized NumPy operations (one sort, no per-message Python loop).
+
+Usage:
+    python src/study_sessions.py --user default
+    python src/study_sessions.py --user default --save     (write into the progress trackers)
+
+    from study_sessions import day_sessions, user_sessions
+    day_sessions(chat_data["2026-01-15"])
+    -> {"active_minutes": 47, "sessions": 3, "longest_session_minutes": 25}
+
+Last updated: January 2026
+"""
+
+import argparse
+import os
+import sys
+import warnings
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from shared_state import read_json
+from user_storage import chat_dir
+
+# A pause longer than this ends a study session
+SESSION_GAP_MINUTES = 30
+
+# Credited after the last message of a session (reading the final reply)
+READING_MINUTES = 2
+
+SESSION_FIELDS = ("active_minutes", "sessions", "longest_session_minutes")
+
+
+# ============================================================
+# TIMESTAMPS
+# ============================================================
+
+def epoch_seconds(timestamp):
+    """Epoch seconds of one ISO timestamp, floored (None if unparseable)."""
+    try:
+        # Naive timestamps are local wall-clock time; keep them as such
+        moment = datetime.fromisoformat(timestamp)
+        return int(moment.replace(tzinfo=timezone.utc).timestamp())
+    except (TypeError, ValueError):
+        return None
+
+
+def parse_timestamps(timestamps):
+    """
+    Epoch seconds of ISO timestamps as an int64 array (-1 where unparseable).
+
+    NumPy parses the usual naive "YYYY-MM-DDTHH:MM:SS[.ffffff]" strings in one
+    call (at microsecond resolution, as datetime.now().isoformat() writes
+    them, then floored to seconds); anything else (offsets, garbage) falls
+    back to datetime per value.
+    """
+    import numpy as np  # loaded on first use, not at app startup
+
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")   # timezone-aware strings only warn
+            parsed = np.array(timestamps, dtype="datetime64[us]")
+        seconds = parsed.astype(np.int64) // 1_000_000
+        seconds[np.isnat(parsed)] = -1
+        return seconds
+    except (TypeError, ValueError, DeprecationWarning):
+        values = [epoch_seconds(t) for t in timestamps]
+        return np.array([-1 if v is None else v for v in values], dtype=np.int64)
+
+
+# ============================================================
+# SESSIONIZATION
+# ============================================================
+
+def sessionize(groups, seconds, size, gap_minutes=SESSION_GAP_MINUTES, reading_minutes=READING_MINUTES):
+    """
+    Split the messages of every group (one chat day) into sessions.
+
+    Args:
+        groups: int array, the group code (0..size-1) of every message
+        seconds: int64 array, the message times in epoch seconds
+        size: Number of groups
+
+    Returns:
+        dict: SESSION_FIELDS -> int array of length size (0 for empty groups)
+    """
+    import numpy as np
+
+    result = {field: np.zeros(size, dtype=np.int64) for field in SESSION_FIELDS}
+    if not len(seconds):
+        return result
+
+    order = np.lexsort((seconds, groups))
+    groups, seconds = groups[order], seconds[order]
+
+    # A session starts at a group's first message and after every long pause
+    starts = np.ones(len(seconds), dtype=bool)
+    starts[1:] = (groups[1:] != groups[:-1]) | (np.diff(seconds) > gap_minutes * 60)
+    first = np.flatnonzero(starts)
+    last = np.append(first[1:], len(seconds)) - 1
+    lengths = seconds[last] - seconds[first] + reading_minutes * 60
+    session_groups = groups[first]
+
+    # Sessions are ordered by group, so each group's sessions are one run
+    runs = np.flatnonzero(np.append(True, session_groups[1:] != session_groups[:-1]))
+    result["active_minutes"] = np.rint(np.bincount(session_groups, weights=lengths, minlength=size) / 60)
+    result["sessions"] = np.bincount(session_groups, minlength=size)
+    result["longest_session_minutes"][session_groups[runs]] = np.rint(np.maximum.reduceat(lengths, runs) / 60)
+    return {field: values.astype(np.int64) for field, values in result.items()}
+
+
+def _collect(chats):
+    """
+    Flatten {key: {date: [messages]}} into group codes and times.
+
+    Returns:
+        tuple: (groups, seconds, [(key, date) per group code])
+    """
+    import numpy as np
+
+    keys, groups, timestamps = [], [], []
+    for key, chat in chats.items():
+        for date, messages in chat.items():
+            if not isinstance(messages, list) or not messages:
+                continue
+            group = len(keys)
+            keys.append((key, date))
+            for message in messages:
+                if isinstance(message, dict) and message.get("timestamp"):
+                    groups.append(group)
+                    timestamps.append(message["timestamp"])
+
+    groups = np.array(groups, dtype=np.int64)
+    seconds = parse_timestamps(timestamps)
+    valid = seconds >= 0
+    return groups[valid], seconds[valid], keys
+
+
+def sessions_by_chat(chats, gap_minutes=SESSION_GAP_MINUTES):
+    """{key: {date: stats}} for several chats ({key: {date: [messages]}}) in one pass."""
+    groups, seconds, keys = _collect(chats)
+    result = sessionize(groups, seconds, len(keys), gap_minutes=gap_minutes)
+    by_chat = {key: {} for key in chats}
+    for group, (key, date) in enumerate(keys):
+        by_chat[key][date] = {field: int(result[field][group]) for field in SESSION_FIELDS}
+    return by_chat
+
+
+def subject_sessions(chat_data, gap_minutes=SESSION_GAP_MINUTES):
+    """{date: stats} for every chat day of one subject."""
+    return sessions_by_chat({None: chat_data}, gap_minutes=gap_minutes)[None]
+
+
+def day_sessions(messages, gap_minutes=SESSION_GAP_MINUTES):
+    """Session stats of one day's messages."""
+    stats = subject_sessions({"day": messages}, gap_minutes=gap_minutes)
+    return stats.get("day", {field: 0 for field in SESSION_FIELDS})
+
+
+def user_sessions(user_id=None, gap_minutes=SESSION_GAP_MINUTES):
+    """{subject: {date: stats}} over the user's whole chat history."""
+    folder = chat_dir(user_id)
+    chats = {}
+    for name in sorted(os.listdir(folder)):
+        if name.endswith(".json"):
+            chats[name[:-len(".json")]], _ = read_json(os.path.join(folder, name), default={})
+    return sessions_by_chat(chats, gap_minutes=gap_minutes)
+
+
+def format_minutes(minutes):
+    """47 -> "47 min", 85 -> "1 h 25 min"."""
+    hours, minutes = divmod(int(minutes), 60)
+    if not hours:
+        return f"{minutes} min"
+    return f"{hours} h {minutes} min" if minutes else f"{hours} h"
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Study time per chat day, from message timestamps")
+    parser.add_argument("--user", default=None, help="User id (default: the default user)")
+    parser.add_argument("--gap", type=int, default=SESSION_GAP_MINUTES,
+                        help="Minutes of inactivity that end a session")
+    parser.add_argument("--save", action="store_true", help="Store the numbers in the progress trackers")
+    args = parser.parse_args()
+
+    sessions = user_sessions(args.user, gap_minutes=args.gap)
+    for subject, days in sessions.items():
+        print(f"\n{subject}:")
+        for date, stats in sorted(days.items()):
+            print(f"  {date}  {format_minutes(stats['active_minutes']):>12} active  "
+                  f"{stats['sessions']:>3} session(s)  longest {format_minutes(stats['longest_session_minutes'])}")
+
+    if args.save:
+        from study_analysis import save_session_progress
+        save_session_progress(args.user, sessions)
+        print(f"\n✅ Saved to {sum(len(days) for days in sessions.values())} progress tracker entries")
+
+
+if __name__ == "__main__":
+    main()
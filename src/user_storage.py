@@ -0,0 +1,273 @@
+"""
+user_storage.py - Per-User Namespaced Storage
+
+Every learner artifact (interview answers, extracted profile, review, chat
+history, progress tracker, ...) lives in that learner's own directory, so
+one deployment can serve many learners without them overwriting each other.
+
+Layout (inside profiles/users/):
+    <h0h1>/<h2h3>/<user dir>/interviewResponse.json
+                             interviewProgress.jsonl
+                             extractedPreferences.json
+                             profileReview.json
+                             extraction_history.json
+                             chat_history/<subject>.json
+                             feedback_counts/<subject>.json
+                             progress_tracker/<subject>.json
+                             analysis_cache/<subject>.json
+
+h0..h3 are the first hex digits of sha256(user_id). The two fan-out levels
+(256 x 256 directories) keep every directory small, so lookups stay fast
+with 100k users. The user directory is the user id itself when it is
+filesystem-safe, otherwise a sanitized id plus a short hash.
+
+The user is resolved from the Streamlit session: st.session_state.user_id,
+else the logged-in user's email (st.experimental_user), else a signed
+?user=<id>&sig=<hmac> link, else a new anonymous id ("anon-<uuid>") for
+this session. The anonymous id is written back into the URL as a signed
+link, so reloading the page keeps the learner's data; an unsigned or
+tampered ?user= is ignored. The signing key is PERSONA_LINK_SECRET, or a
+random key kept in profiles/.link_secret. "default" is only used outside
+a Streamlit session (CLI, scripts); worker threads have no session, so
+callers resolve the user on the script thread and pass user_id
+explicitly.
+
+Signed links for course participants (or for the default user, whose
+data includes the files of the old single-user layout):
+
+    python src/user_storage.py link student-42
+
+Usage:
+    from user_storage import current_user_id, responses_file, chat_dir
+
+    path = responses_file()                # current session's user
+    path = responses_file("student-42")    # explicit user
+
+Last updated: January 2026
+"""
+
+import argparse
+import hashlib
+import hmac
+import os
+import re
+import secrets
+import shutil
+import uuid
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROFILES_DIR = os.path.join(BASE_DIR, "profiles")
+USERS_DIR = os.path.join(PROFILES_DIR, "users")
+
+DEFAULT_USER = "default"
+
+LINK_SECRET_FILE = os.path.join(PROFILES_DIR, ".link_secret")
+
+# What st.experimental_user.email returns locally and under AppTest (nobody logged in)
+_PLACEHOLDER_EMAILS = {"test@example.com", "test@test.com"}
+
+_SAFE_ID = re.compile(r"^[A-Za-z0-9][\w.@-]{0,63}$")
+
+# Files that used to be shared by everyone; adopted by the default user
+_LEGACY_PATHS = {
+    "interviewResponse.json": os.path.join(PROFILES_DIR, "interviewResponse.json"),
+    "interviewProgress.jsonl": os.path.join(PROFILES_DIR, "interviewProgress.jsonl"),
+    "extractedPreferences.json": os.path.join(PROFILES_DIR, "extractedPreferences.json"),
+    "profileReview.json": os.path.join(PROFILES_DIR, "profileReview.json"),
+    "chat_history": os.path.join(PROFILES_DIR, "chat_history"),
+    "progress_tracker": os.path.join(PROFILES_DIR, "progress_tracker"),
+    "extraction_history.json": os.path.join(PROFILES_DIR, "extraction_cache", "history", f"{DEFAULT_USER}.json"),
+}
+
+
+# ============================================================
+# SESSION IDENTITY
+# ============================================================
+
+def current_user_id():
+    """Resolve the user of the current Streamlit session (DEFAULT_USER outside a session)."""
+    try:
+        import streamlit as st
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+    except ImportError:
+        return DEFAULT_USER
+    if get_script_run_ctx() is None:
+        return DEFAULT_USER
+
+    user_id = st.session_state.get("user_id")
+    if not user_id:
+        user_id = _logged_in_email(st) or _linked_user(st) or _new_session_user(st)
+        st.session_state.user_id = user_id
+    return user_id
+
+
+def _logged_in_email(st):
+    try:
+        email = st.experimental_user.email
+    except Exception:
+        return None
+    return email if email not in _PLACEHOLDER_EMAILS else None
+
+
+def _linked_user(st):
+    user_id = st.query_params.get("user")
+    signature = st.query_params.get("sig", "")
+    if user_id and hmac.compare_digest(signature, sign_user_id(user_id)):
+        return user_id
+    return None
+
+
+def _new_session_user(st):
+    user_id = f"anon-{uuid.uuid4().hex}"
+    # Keep the identity across page reloads (the link is this learner's key)
+    st.query_params.update(link_params(user_id))
+    return user_id
+
+
+# ============================================================
+# SIGNED LINKS
+# ============================================================
+
+def _link_secret():
+    secret = os.getenv("PERSONA_LINK_SECRET")
+    if secret:
+        return secret.encode("utf-8")
+    if not os.path.exists(LINK_SECRET_FILE):
+        os.makedirs(PROFILES_DIR, exist_ok=True)
+        try:
+            # O_EXCL: the first process creates the key, everyone else reads it
+            fd = os.open(LINK_SECRET_FILE, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(secrets.token_hex(32))
+        except FileExistsError:
+            pass
+    with open(LINK_SECRET_FILE, "r", encoding="utf-8") as f:
+        return f.read().strip().encode("utf-8")
+
+
+def sign_user_id(user_id):
+    return hmac.new(_link_secret(), str(user_id).encode("utf-8"), hashlib.sha256).hexdigest()[:32]
+
+
+def link_params(user_id):
+    """Query parameters that open the app as user_id."""
+    return {"user": str(user_id), "sig": sign_user_id(user_id)}
+
+
+# ============================================================
+# PATHS
+# ============================================================
+
+def _dir_name(user_id):
+    user_id = str(user_id)
+    if _SAFE_ID.match(user_id):
+        return user_id
+    digest = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+    safe = re.sub(r"[^\w.@-]+", "_", user_id).strip("._")[:48] or "user"
+    return f"{safe}-{digest[:12]}"
+
+
+def user_dir(user_id=None):
+    """Return the user's directory (not created)."""
+    user_id = current_user_id() if user_id is None else str(user_id)
+    digest = hashlib.sha256(user_id.encode("utf-8")).hexdigest()
+    return os.path.join(USERS_DIR, digest[:2], digest[2:4], _dir_name(user_id))
+
+
+def user_path(user_id, *parts):
+    """Path of an artifact inside the user's directory (parent directories created)."""
+    path = os.path.join(user_dir(user_id), *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
+
+
+def responses_file(user_id=None):
+    return user_path(user_id, "interviewResponse.json")
+
+
+def progress_file(user_id=None):
+    return user_path(user_id, "interviewProgress.jsonl")
+
+
+def extracted_prefs_file(user_id=None):
+    return user_path(user_id, "extractedPreferences.json")
+
+
+def profile_review_file(user_id=None):
+    return user_path(user_id, "profileReview.json")
+
+
+def extraction_history_file(user_id=None):
+    return user_path(user_id, "extraction_history.json")
+
+
+def chat_dir(user_id=None):
+    path = os.path.join(user_dir(user_id), "chat_history")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def feedback_counts_dir(user_id=None):
+    path = os.path.join(user_dir(user_id), "feedback_counts")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def progress_tracker_dir(user_id=None):
+    path = os.path.join(user_dir(user_id), "progress_tracker")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+def analysis_cache_dir(user_id=None):
+    path = os.path.join(user_dir(user_id), "analysis_cache")
+    os.makedirs(path, exist_ok=True)
+    return path
+
+
+# ============================================================
+# MIGRATION
+# ============================================================
+
+def adopt_legacy_files(user_id=DEFAULT_USER):
+    """
+    Copy the old shared profiles/* artifacts into user_id's namespace.
+
+    Only copies what the user does not have yet, so it is safe to call on
+    every start. The originals are left in place but no longer read.
+
+    Returns:
+        list: Names of the artifacts that were copied
+    """
+    copied = []
+    for name, legacy in _LEGACY_PATHS.items():
+        target = os.path.join(user_dir(user_id), name)
+        if not os.path.exists(legacy) or os.path.exists(target):
+            continue
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        if os.path.isdir(legacy):
+            shutil.copytree(legacy, target)
+        else:
+            shutil.copy2(legacy, target)
+        copied.append(name)
+    return copied
+
+
+# ============================================================
+# MAIN
+# ============================================================
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-user storage helpers")
+    commands = parser.add_subparsers(dest="command", required=True)
+    link = commands.add_parser("link", help="Print the signed query string that opens the app as a user")
+    link.add_argument("user_id")
+    args = parser.parse_args()
+
+    if args.command == "link":
+        params = link_params(args.user_id)
+        print(f"?user={params['user']}&sig={params['sig']}")
+
+
+if __name__ == "__main__":
+    main()
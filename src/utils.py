@@ -9,9 +9,53 @@ in the project. Import them like:
 Functions:
     - extract_text: Safely extracts text from OpenAI API responses
     - safe_json_loads: Cleans and parses JSON from LLM outputs
+    - write_json_atomic: Writes a JSON file without leaving partial content
+    - estimate_tokens: Rough token count of a prompt
+    - typing_html: HTML/CSS for a client-side typing animation
+    - load_env / get_openai_client: Lazily load .env and the OpenAI SDK
 """
 
+import html
 import json
+import os
+import tempfile
+
+_ENV_LOADED = False
+_OPENAI_CLIENT = None
+
+
+def load_env():
+    """
+    Load variables from .env once per process.
+
+    python-dotenv is imported here rather than at module level so pages that
+    never need configuration do not pay for it at startup.
+    """
+    global _ENV_LOADED
+    if not _ENV_LOADED:
+        from dotenv import load_dotenv
+        load_dotenv()
+        _ENV_LOADED = True
+
+
+def get_openai_client():
+    """
+    Return the shared OpenAI client, importing the SDK on first use.
+
+    The openai package is the slowest import in the app; creating the client
+    lazily keeps it off the startup path of pages that never call the API.
+    With PERSONA_FAKE_LLM=1 the offline stand-in from fake_llm is returned.
+    """
+    global _OPENAI_CLIENT
+    if _OPENAI_CLIENT is None:
+        load_env()
+        from fake_llm import FakeOpenAI, fake_llm_enabled
+        if fake_llm_enabled():
+            _OPENAI_CLIENT = FakeOpenAI()
+        else:
+            from openai import OpenAI
+            _OPENAI_CLIENT = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+    return _OPENAI_CLIENT
 
 
 def extract_text(resp):
@@ -108,6 +152,83 @@ def safe_json_loads(text):
     except json.JSONDecodeError:
         return None
 
+def write_json_atomic(path, data, indent=4):
+    """
+    Writes JSON to a file atomically (temp file + rename).
+
+    Readers never see a half-written file, even if the process dies
+    in the middle of the write.
+
+    Args:
+        path: Destination file path
+        data: JSON-serializable object
+        indent: Indentation passed to json.dump (default 4)
+    """
+    folder = os.path.dirname(path) or "."
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=folder, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, indent=indent, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def estimate_tokens(text):
+    """
+    Rough token count for prompt-size metrics (~4 characters per token).
+
+    Args:
+        text: Prompt or completion text
+
+    Returns:
+        int: Estimated number of tokens
+    """
+    return len(text or "") // 4
+
+
+def typing_html(text, speed=0.03):
+    """
+    Build HTML that reveals text word by word in the browser.
+
+    The whole text is sent once; a CSS animation delay per word (based on
+    its character offset) reproduces the old server-side typing effect
+    without sleeping in the script thread.
+
+    Args:
+        text: Plain text; blank lines separate paragraphs
+        speed: Seconds per character, as in the old typing effect
+
+    Returns:
+        str: HTML for st.markdown(..., unsafe_allow_html=True)
+    """
+    paragraphs = []
+    offset = 0
+    for paragraph in text.split("\n\n"):
+        lines = []
+        for line in paragraph.split("\n"):
+            words = []
+            for word in line.split(" "):
+                words.append(
+                    f'<span class="typing-word" style="animation-delay:{offset * speed:.2f}s">'
+                    f"{html.escape(word)}</span>"
+                )
+                offset += len(word) + 1
+            lines.append(" ".join(words))
+        paragraphs.append(f"<p>{'<br>'.join(lines)}</p>")
+
+    style = (
+        "<style>"
+        ".typing-word{opacity:0;animation:typing-reveal 0.05s forwards;}"
+        "@keyframes typing-reveal{to{opacity:1;}}"
+        "</style>"
+    )
+    return style + "".join(paragraphs)
+
+
 def format_bool(value):
     """Format boolean values nicely for display."""
     if value is True: